@@ -0,0 +1,112 @@
+"""Compares the skill listings read as models or as rows of columns.
+
+The validated path is the one FastAPI takes for a route declaring
+``response_model=Sequence[models.Skill]``: the skills are loaded as ORM
+objects, validated against the response field, dumped to Python objects and
+encoded by JSONResponse. The fast path is the one of the listing routes:
+the columns are read as Core rows and encoded by the pre-built serializer.
+Both produce the same objects, their keys in another order; the timings
+include the query.
+
+Usage:
+    python -m benchmarks.list_serialization --sizes 15 100 1000 --repeat 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import Callable, Sequence
+
+import fastapi as fa
+import sqlmodel
+from fastapi import responses, routing, utils
+from sqlalchemy import pool
+
+from skillventory.data import crud, pagination
+from skillventory.models import models
+from skillventory.routers import serializers
+
+RESPONSE_FIELD = utils.create_model_field(
+    name="Response_get_skills", type_=Sequence[models.Skill], mode="serialization"
+)
+FIELDS = list(models.SkillField)
+LEVELS = list(models.LevelOfConfidence)
+# serialize_response is a coroutine, a single loop keeps its setup out of
+# the timings.
+LOOP = asyncio.new_event_loop()
+
+
+def make_session(number_of_skills: int) -> sqlmodel.Session:
+    engine = sqlmodel.create_engine("sqlite://", poolclass=pool.StaticPool)
+    sqlmodel.SQLModel.metadata.create_all(engine)
+    session = sqlmodel.Session(engine)
+    session.add_all(
+        models.Skill(
+            skill_name=f"skill_{skill_id}",
+            level_of_confidence=LEVELS[skill_id % len(LEVELS)],
+        )
+        for skill_id in range(1, number_of_skills + 1)
+    )
+    session.commit()
+    return session
+
+
+def validated_path(session: sqlmodel.Session, size: int) -> bytes:
+    skills, _ = crud.get_skills(
+        session, limit=size, total=pagination.TotalCountMode.NONE
+    )
+    content = LOOP.run_until_complete(
+        routing.serialize_response(field=RESPONSE_FIELD, response_content=skills)
+    )
+    # The loaded objects aren't kept, as in a request.
+    session.expunge_all()
+    return responses.JSONResponse(content).body
+
+
+def fast_path(session: sqlmodel.Session, size: int) -> bytes:
+    rows, _ = crud.get_skill_rows(
+        session, FIELDS, limit=size, total=pagination.TotalCountMode.NONE
+    )
+    return serializers.skill_rows_json_response(rows, FIELDS, fa.Response()).body
+
+
+def measure(
+    read: Callable[[sqlmodel.Session, int], bytes],
+    session: sqlmodel.Session,
+    size: int,
+    repeat: int,
+) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read(session, size)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'skills':>8} {'validated (ms)':>15} {'fast (ms)':>10} {'speedup':>8}")
+    for size in args.sizes:
+        with make_session(size) as session:
+            if json.loads(validated_path(session, size)) != json.loads(
+                fast_path(session, size)
+            ):
+                msg = "Both paths must produce the same skills"
+                raise AssertionError(msg)
+            validated = measure(validated_path, session, size, args.repeat)
+            fast = measure(fast_path, session, size, args.repeat)
+        print(
+            f"{size:>8} {validated * 1000:>15.3f} {fast * 1000:>10.3f} "
+            f"{validated / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""Drives a mixed read/write load against the service running under uvicorn.
+
+The service is started in a subprocess on a fresh database, seeded with
+skills through the batch route, then loaded for a duration with a weighted
+mix of operations:
+
+    list: GET /v1/skills/ at a random offset.
+    get_id: GET /v1/skills/id/{skill_id} of a seeded skill.
+    get_name: GET /v1/skills/name/{skill_name} of a seeded skill.
+    post: POST /v1/skills/ of a new skill, or of an existing one for the
+        share given by --conflict-ratio, which answers 409.
+    patch: PATCH /v1/skills/{skill_id} of the level of a seeded skill.
+
+With --rate, the requests are sent at that rate whatever the answers, up to
+--concurrency at a time, and their latency counts from the time they were
+due, so a saturated service shows in the percentiles. Without it,
+--concurrency clients send their next request as soon as they get an answer.
+
+The report has the throughput, the latency percentiles, the error, 409 and
+500 rates of each operation, and the "database is locked" errors found in
+the service logs. The settings of the service are passed with --env, e.g.
+--env SQLITE_PROFILE=production --env POOL_SIZE=10, to tune them against
+the numbers. --url loads a service already running on an empty database
+instead, whose logs then aren't read.
+
+Usage:
+    python -m benchmarks.load_test --duration 30 --concurrency 32
+    python -m benchmarks.load_test --rate 500 --mix list=50 get_id=30 post=20
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import http
+import json
+import os
+import pathlib
+import random
+import socket
+import statistics
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, Optional
+
+import httpx
+
+from skillventory.models import models
+
+LEVELS = [level.value for level in models.LevelOfConfidence]
+LOCKED_MESSAGE = "database is locked"
+SEED_CHUNK_SIZE = 1000
+STARTUP_TIMEOUT = 30.0
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+DEFAULT_MIX = {"list": 30, "get_id": 25, "get_name": 25, "post": 10, "patch": 10}
+
+Request = tuple[str, str, dict[str, Any]]
+
+
+def seed_name(skill_id: int) -> str:
+    return f"seeded skill {skill_id}"
+
+
+class Workload:
+    """Builds the requests of the operations of the mix.
+
+    Args:
+        mix: The weight of each operation.
+        seed_skills: The number of skills seeded, with ids from 1.
+        conflict_ratio: The share of the posts of an existing skill.
+        rng: The random generator, seeded for reproducible runs.
+    """
+
+    def __init__(
+        self,
+        mix: dict[str, int],
+        seed_skills: int,
+        conflict_ratio: float,
+        rng: random.Random,
+    ) -> None:
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.seed_skills = seed_skills
+        self.conflict_ratio = conflict_ratio
+        self.rng = rng
+        self._new_skills = 0
+        self._builders: dict[str, Callable[[], Request]] = {
+            "list": self._list,
+            "get_id": self._get_id,
+            "get_name": self._get_name,
+            "post": self._post,
+            "patch": self._patch,
+        }
+
+    def next_request(self) -> tuple[str, Request]:
+        """Picks the next operation of the mix.
+
+        Returns:
+            The operation and its method, URL and httpx arguments.
+        """
+        operation = self.rng.choices(self.operations, self.weights)[0]
+        return operation, self._builders[operation]()
+
+    def _seeded_id(self) -> int:
+        return self.rng.randint(1, self.seed_skills)
+
+    def _list(self) -> Request:
+        offset = self.rng.randrange(self.seed_skills)
+        return "GET", "/v1/skills/", {"params": {"offset": offset}}
+
+    def _get_id(self) -> Request:
+        return "GET", f"/v1/skills/id/{self._seeded_id()}", {}
+
+    def _get_name(self) -> Request:
+        return "GET", f"/v1/skills/name/{seed_name(self._seeded_id())}", {}
+
+    def _post(self) -> Request:
+        if self.rng.random() < self.conflict_ratio:
+            skill_name = seed_name(self._seeded_id())
+        else:
+            self._new_skills += 1
+            skill_name = f"posted skill {os.getpid()} {self._new_skills}"
+        skill = {"skill_name": skill_name, "level_of_confidence": LEVELS[0]}
+        return "POST", "/v1/skills/", {"json": skill}
+
+    def _patch(self) -> Request:
+        skill = {"level_of_confidence": self.rng.choice(LEVELS)}
+        return "PATCH", f"/v1/skills/{self._seeded_id()}", {"json": skill}
+
+
+@dataclasses.dataclass
+class OperationStats:
+    """Outcomes of the requests of an operation."""
+
+    latencies: list[float] = dataclasses.field(default_factory=list)
+    statuses: collections.Counter[str] = dataclasses.field(
+        default_factory=collections.Counter
+    )
+
+    def record(self, latency: float, outcome: str) -> None:
+        self.latencies.append(latency)
+        self.statuses[outcome] += 1
+
+    def summary(self, duration: float) -> dict[str, Any]:
+        requests = len(self.latencies)
+        errors = sum(
+            count
+            for outcome, count in self.statuses.items()
+            if not outcome.isdigit() or int(outcome) >= http.HTTPStatus.BAD_REQUEST
+        )
+        percentiles = (
+            statistics.quantiles(self.latencies, n=100, method="inclusive")
+            if requests > 1
+            else [self.latencies[0] if requests else 0.0] * 99
+        )
+        return {
+            "requests": requests,
+            "throughput_per_s": round(requests / duration, 2),
+            "p50_ms": round(percentiles[49] * 1000, 3),
+            "p90_ms": round(percentiles[89] * 1000, 3),
+            "p99_ms": round(percentiles[98] * 1000, 3),
+            "max_ms": round(max(self.latencies, default=0) * 1000, 3),
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "conflict_rate": round(self.statuses["409"] / requests, 4)
+            if requests
+            else 0.0,
+            "server_error_rate": round(self.statuses["500"] / requests, 4)
+            if requests
+            else 0.0,
+            "statuses": dict(self.statuses),
+        }
+
+
+class LoadGenerator:
+    """Sends the requests of a workload and records their outcomes.
+
+    Args:
+        client: The client of the service.
+        workload: The requests to send.
+        concurrency: The maximum number of requests in flight.
+    """
+
+    def __init__(
+        self, client: httpx.AsyncClient, workload: Workload, concurrency: int
+    ) -> None:
+        self.client = client
+        self.workload = workload
+        self.concurrency = concurrency
+        self.stats: dict[str, OperationStats] = collections.defaultdict(OperationStats)
+
+    async def _send(self, due: float) -> None:
+        operation, (method, url, kwargs) = self.workload.next_request()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            outcome = str(response.status_code)
+        except httpx.HTTPError as error:
+            outcome = type(error).__name__
+        self.stats[operation].record(time.perf_counter() - due, outcome)
+
+    async def run_closed(self, duration: float) -> None:
+        """Keeps every client busy until the end of the duration."""
+        deadline = time.perf_counter() + duration
+
+        async def client_loop() -> None:
+            while time.perf_counter() < deadline:
+                await self._send(time.perf_counter())
+
+        await asyncio.gather(*(client_loop() for _ in range(self.concurrency)))
+
+    async def run_open(self, duration: float, rate: float) -> None:
+        """Sends the requests at a fixed rate until the end of the duration."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        tasks = set()
+
+        async def send_when_allowed(due: float) -> None:
+            async with semaphore:
+                await self._send(due)
+
+        for sent in range(int(duration * rate)):
+            due = start + sent / rate
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            task = asyncio.create_task(send_when_allowed(due))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@contextlib.contextmanager
+def run_server(
+    work_dir: pathlib.Path, workers: int, env: dict[str, str]
+) -> Iterator[tuple[str, pathlib.Path]]:
+    """Runs the service under uvicorn on a fresh database.
+
+    Yields:
+        The URL of the service and the file its logs are written to.
+    """
+    port = free_port()
+    log_file = work_dir / "server.log"
+    server_env = {
+        **os.environ,
+        "SQLITE_URL": f"sqlite:///{work_dir / 'load_test.db'}",
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, (str(ROOT), os.environ.get("PYTHONPATH")))
+        ),
+        **env,
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "skillventory.main:app",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--no-access-log",
+    ]
+    with log_file.open("wb") as log:
+        process = subprocess.Popen(  # noqa: S603
+            command, cwd=work_dir, env=server_env, stdout=log, stderr=log
+        )
+        try:
+            yield f"http://127.0.0.1:{port}", log_file
+        finally:
+            process.terminate()
+            process.wait(timeout=STARTUP_TIMEOUT)
+
+
+async def wait_until_ready(client: httpx.AsyncClient) -> None:
+    deadline = time.perf_counter() + STARTUP_TIMEOUT
+    while True:
+        try:
+            await client.get("/")
+        except httpx.TransportError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+        else:
+            return
+
+
+async def seed(client: httpx.AsyncClient, seed_skills: int) -> None:
+    for start in range(1, seed_skills + 1, SEED_CHUNK_SIZE):
+        skills = [
+            {"skill_name": seed_name(skill_id), "level_of_confidence": LEVELS[0]}
+            for skill_id in range(start, min(start + SEED_CHUNK_SIZE, seed_skills + 1))
+        ]
+        response = await client.post("/v1/skills/batch", json=skills)
+        response.raise_for_status()
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadOptions:
+    duration: float
+    concurrency: int
+    rate: Optional[float]
+    seed_skills: int
+    workload: Workload
+
+
+async def load(url: str, options: LoadOptions) -> dict[str, OperationStats]:
+    limits = httpx.Limits(max_connections=options.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        await wait_until_ready(client)
+        await seed(client, options.seed_skills)
+        generator = LoadGenerator(client, options.workload, options.concurrency)
+        if options.rate is None:
+            await generator.run_closed(options.duration)
+        else:
+            await generator.run_open(options.duration, options.rate)
+    return generator.stats
+
+
+def report(
+    stats: dict[str, OperationStats], duration: float, locked: Optional[int]
+) -> dict[str, Any]:
+    overall = OperationStats()
+    for operation_stats in stats.values():
+        overall.latencies += operation_stats.latencies
+        overall.statuses.update(operation_stats.statuses)
+    summaries = {
+        operation: operation_stats.summary(duration)
+        for operation, operation_stats in sorted(stats.items())
+    }
+    summaries["all"] = overall.summary(duration)
+    print(
+        f"{'operation':<10} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+        f"{'max ms':>9} {'errors':>7} {'409':>7} {'500':>7}"
+    )
+    for operation, summary in summaries.items():
+        print(
+            f"{operation:<10} {summary['throughput_per_s']:>9.1f} "
+            f"{summary['p50_ms']:>9.2f} {summary['p90_ms']:>9.2f} "
+            f"{summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f} "
+            f"{summary['error_rate']:>7.2%} {summary['conflict_rate']:>7.2%} "
+            f"{summary['server_error_rate']:>7.2%}"
+        )
+    if locked is not None:
+        print(f"'{LOCKED_MESSAGE}' in the service logs: {locked}")
+    return {"operations": summaries, "database_locked": locked}
+
+
+def parse_pairs(pairs: list[str], value_type: Callable[[str], Any]) -> dict[str, Any]:
+    parsed = {}
+    for pair in pairs:
+        key, separator, value = pair.partition("=")
+        if not separator:
+            msg = f"Expected KEY=VALUE, got {pair!r}"
+            raise argparse.ArgumentTypeError(msg)
+        parsed[key] = value_type(value)
+    return parsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rate", type=float, help="Requests per second.")
+    parser.add_argument(
+        "--mix",
+        nargs="+",
+        default=[f"{operation}={weight}" for operation, weight in DEFAULT_MIX.items()],
+        help="Weights of the operations, OPERATION=WEIGHT.",
+    )
+    parser.add_argument("--conflict-ratio", type=float, default=0.1)
+    parser.add_argument("--seed-skills", type=int, default=10_000)
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--env", nargs="+", default=[], help="Settings of the service, KEY=VALUE."
+    )
+    parser.add_argument("--url", help="URL of a service already running.")
+    parser.add_argument("--output", type=pathlib.Path)
+    args = parser.parse_args()
+
+    mix = parse_pairs(args.mix, int)
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        parser.error(f"Unknown operations: {', '.join(sorted(unknown))}")
+    options = LoadOptions(
+        duration=args.duration,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        seed_skills=args.seed_skills,
+        workload=Workload(
+            mix,
+            args.seed_skills,
+            args.conflict_ratio,
+            random.Random(args.random_seed),  # noqa: S311
+        ),
+    )
+    locked: Optional[int] = None
+    if args.url is not None:
+        stats = asyncio.run(load(args.url, options))
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            with run_server(
+                pathlib.Path(work_dir), args.workers, parse_pairs(args.env, str)
+            ) as (url, log_file):
+                stats = asyncio.run(load(url, options))
+            locked = log_file.read_text(errors="replace").count(LOCKED_MESSAGE)
+    results = report(stats, args.duration, locked)
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
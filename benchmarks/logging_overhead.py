@@ -0,0 +1,113 @@
+"""Measures the cost of the CRUD hot-path logging on the request thread.
+
+Every scenario reads skills through `crud.get_skill_by_id`, half of them
+missing, with the skill lookups served from the cache, so the logging is
+most of what is left. The records are written to a temporary file.
+
+Scenarios:
+    no sink: nothing is written, the floor.
+    sync: the records are written by the calling thread, the previous
+        behaviour.
+    enqueued: the records are written by a background thread.
+    enqueued, rate limited: at most 10 info and warning records per second
+        per call site are let through.
+    hot path off: the hot-path records aren't even built.
+
+Usage:
+    python -m benchmarks.logging_overhead --calls 20000
+"""
+
+import argparse
+import dataclasses
+import pathlib
+import tempfile
+import time
+from typing import Optional
+
+import sqlmodel
+from loguru import logger
+from sqlalchemy import pool
+
+from skillventory import log_config
+from skillventory.data import crud
+from skillventory.database import config
+from skillventory.models import models
+
+
+def make_session() -> sqlmodel.Session:
+    engine = sqlmodel.create_engine(
+        "sqlite://",
+        poolclass=pool.StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    config.Base.metadata.create_all(engine)
+    session = sqlmodel.Session(engine)
+    crud.create_skill(
+        session=session,
+        skill=models.SkillBase(
+            skill_name="python", level_of_confidence=models.LevelOfConfidence.LEVEL_1
+        ),
+    )
+    return session
+
+
+@dataclasses.dataclass(frozen=True)
+class Scenario:
+    log_file: Optional[pathlib.Path]
+    enqueue: bool = False
+    rate_limit: float = 0
+    hot_path: bool = True
+
+
+def run_scenario(session: sqlmodel.Session, calls: int, scenario: Scenario) -> float:
+    logger.remove()
+    # As configure_logging, the hot path checks the limiter of the sink.
+    log_config._rate_limiter = (
+        log_config.CallSiteRateLimiter(scenario.rate_limit)
+        if scenario.rate_limit
+        else None
+    )
+    if scenario.log_file is not None:
+        logger.add(
+            scenario.log_file,
+            enqueue=scenario.enqueue,
+            filter=log_config._rate_limiter,
+        )
+    log_config.log_settings.LOG_HOT_PATH = scenario.hot_path
+    start = time.perf_counter()
+    for call in range(calls):
+        crud.get_skill_by_id(session=session, skill_id=1 + call % 2)
+    elapsed = time.perf_counter() - start
+    logger.complete()
+    logger.remove()
+    log_config._rate_limiter = None
+    return elapsed / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    session = make_session()
+    with tempfile.TemporaryDirectory() as directory:
+        log_file = pathlib.Path(directory) / "skillventory.log"
+        scenarios = {
+            "no sink": Scenario(log_file=None),
+            "sync (previous)": Scenario(log_file=log_file),
+            "enqueued": Scenario(log_file=log_file, enqueue=True),
+            "enqueued, rate limited": Scenario(
+                log_file=log_file, enqueue=True, rate_limit=10
+            ),
+            "hot path off": Scenario(log_file=log_file, enqueue=True, hot_path=False),
+        }
+        # Warms the cache and the statement caches up.
+        run_scenario(session, calls=100, scenario=Scenario(log_file=None))
+        print(f"{'scenario':<24} {'us/call':>8}")
+        for name, scenario in scenarios.items():
+            per_call = run_scenario(session, calls=args.calls, scenario=scenario)
+            print(f"{name:<24} {per_call * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measures the cold start of the service in fresh interpreters.
+
+Each run imports `skillventory.main` in a new Python process on a new
+database and runs the lifespan startup, which reports how long the import
+of the package and every startup step took. The medians of the runs are
+printed, the whole import is also timed from the interpreter start.
+
+Usage:
+    python -m benchmarks.startup --runs 10
+"""
+
+import argparse
+import collections
+import json
+import os
+import pathlib
+import statistics
+import subprocess  # noqa: S404
+import sys
+import tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+# Runs in the fresh interpreter, prints the timings of the startup as JSON.
+CHILD = """
+import asyncio, json, time
+start = time.perf_counter()
+from skillventory import main
+imported = time.perf_counter()
+
+async def run():
+    async with main.app.router.lifespan_context(main.app):
+        pass
+
+asyncio.run(run())
+timings = main.app.state.startup_timings
+timings["import_main"] = round((imported - start) * 1000, 3)
+print(json.dumps(timings))
+"""
+
+
+def run_once(work_dir: pathlib.Path) -> dict[str, float]:
+    env = {
+        **os.environ,
+        "SQLITE_URL": f"sqlite:///{work_dir / 'startup.db'}",
+        "LOG_LEVEL": "WARNING",
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, (str(ROOT), os.environ.get("PYTHONPATH")))
+        ),
+    }
+    (work_dir / "startup.db").unlink(missing_ok=True)
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", CHILD],
+        cwd=work_dir,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    timings: dict[str, float] = json.loads(output.splitlines()[-1])
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    samples: dict[str, list[float]] = collections.defaultdict(list)
+    with tempfile.TemporaryDirectory() as work_dir:
+        for _ in range(args.runs):
+            for step, duration in run_once(pathlib.Path(work_dir)).items():
+                samples[step].append(duration)
+    print(f"{'step':<16} {'median (ms)':>12} {'max (ms)':>10}")
+    for step, durations in samples.items():
+        print(
+            f"{step:<16} {statistics.median(durations):>12.1f} {max(durations):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
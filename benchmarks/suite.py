@@ -0,0 +1,730 @@
+"""Benchmarks the CRUD functions and the HTTP routes on generated datasets.
+
+For every size, a SQLite file with that many skills is generated once in the
+data directory and copied before the run, so the writes of a run don't leak
+into the next one. Every case is then timed `--repeat` times, the heavy ones
+(full export, iteration and import) `--heavy-repeat` times:
+
+    crud: the functions of `skillventory.data.crud`, a new session per call.
+    http: the routes of `skills_v1` and `skills_ui`, through the ASGI app with
+        its middlewares. The import route is timed with its background import,
+        which the ASGI transport runs before returning.
+
+The read cases run before the write ones. The pragmas are the ones of the
+database settings, so `SQLITE_PROFILE=production` benchmarks the production
+profile. The throughput, p50 and p99 latencies of each case are written to a
+JSON file, which can be given as the baseline of a later run: a case whose
+p50 is slower than the baseline one by more than the tolerance is reported
+as a regression and the run exits with status 1.
+
+Usage:
+    python -m benchmarks.suite --sizes 1000 100000 1000000 --output base.json
+    python -m benchmarks.suite --sizes 1000 100000 --baseline base.json
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import datetime
+import json
+import pathlib
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import httpx
+import sqlalchemy
+import sqlmodel
+
+from skillventory import log_config
+from skillventory import main as skillventory_main
+from skillventory.data import cache, crud, dependencies, pagination
+from skillventory.database import config
+from skillventory.models import models
+
+WORDS = (
+    "python",
+    "rust",
+    "docker",
+    "kubernetes",
+    "sql",
+    "fastapi",
+    "linux",
+    "git",
+    "pandas",
+    "terraform",
+)
+SEARCH_QUERY = "pyt"
+LEVELS = list(models.LevelOfConfidence)
+INSERT_CHUNK_SIZE = 50_000
+BATCH_SIZE = 100
+IMPORT_SIZE = 1000
+LOOKUP_SIZE = 100
+PAGE_SIZE = 15
+ALL_FIELDS = list(models.SkillField)
+NAME_FIELD = [models.SkillField.SKILL_NAME]
+
+
+def make_name(skill_id: int) -> str:
+    return f"{WORDS[skill_id % len(WORDS)]} {skill_id}"
+
+
+def make_level(skill_id: int) -> models.LevelOfConfidence:
+    return LEVELS[skill_id % len(LEVELS)]
+
+
+def make_engine(path: pathlib.Path) -> sqlalchemy.Engine:
+    engine = sqlmodel.create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    config.apply_pragmas(engine, config.db_settings.pragmas())
+    return engine
+
+
+def generate_dataset(path: pathlib.Path, size: int) -> None:
+    """Creates a database of skills with ids from 1 to size.
+
+    The rows go through the triggers, so the counters and the search index
+    are maintained as in production.
+    """
+    engine = make_engine(path)
+    config.Base.metadata.create_all(engine)
+    statement = sqlalchemy.insert(models.Skill)
+    with engine.begin() as connection:
+        for start in range(1, size + 1, INSERT_CHUNK_SIZE):
+            stop = min(start + INSERT_CHUNK_SIZE, size + 1)
+            connection.execute(
+                statement,
+                [
+                    {
+                        "skill_id": skill_id,
+                        "skill_name": make_name(skill_id),
+                        "level_of_confidence": make_level(skill_id),
+                    }
+                    for skill_id in range(start, stop)
+                ],
+            )
+    with engine.connect() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+
+def prepare_dataset(data_dir: pathlib.Path, size: int) -> pathlib.Path:
+    """Copies the dataset of a size, generating it the first time."""
+    dataset = data_dir / f"skills_{size}.db"
+    if not dataset.exists():
+        print(f"Generating {size} skills in {dataset}", file=sys.stderr)
+        generate_dataset(dataset.with_suffix(".tmp"), size)
+        dataset.with_suffix(".tmp").rename(dataset)
+    working_copy = data_dir / f"skills_{size}.run.db"
+    shutil.copyfile(dataset, working_copy)
+    return working_copy
+
+
+@dataclasses.dataclass(frozen=True)
+class Case:
+    """A benchmarked operation, called with the number of the iteration."""
+
+    kind: str
+    name: str
+    run: Callable[[int], Any]
+    heavy: bool = False
+    write: bool = False
+
+
+def crud_cases(engine: sqlalchemy.Engine, size: int) -> list[Case]:
+    def middle_id(iteration: int) -> int:
+        return size // 2 - iteration % (size // 2)
+
+    def with_session(function: Callable[..., Any], **kwargs: Any) -> Any:
+        with sqlmodel.Session(engine) as session:
+            return function(session=session, **kwargs)
+
+    def iterate_all(_iteration: int) -> None:
+        with sqlmodel.Session(engine) as session:
+            for _batch in crud.iter_skills(session=session):
+                pass
+
+    def delete(iteration: int) -> None:
+        with sqlmodel.Session(engine) as session:
+            skill = session.get(models.Skill, size - iteration)
+            crud.delete_skill(session=session, skill=skill)
+
+    cursor = pagination.encode_cursor(
+        sort_by=pagination.SortField.SKILL_ID, key=size // 2
+    )
+    exact = pagination.TotalCountMode.EXACT
+    by_name = pagination.SortField.SKILL_NAME
+    by_level = pagination.SortField.LEVEL_OF_CONFIDENCE
+    level_cursor = middle_level_cursor(size)
+    return [
+        Case(
+            "crud",
+            "get_skill_by_id",
+            lambda i: with_session(crud.get_skill_by_id, skill_id=spread_id(i, size)),
+        ),
+        Case(
+            "crud",
+            "get_skill_by_name",
+            lambda i: with_session(
+                crud.get_skill_by_name, skill_name=make_name(spread_id(i, size))
+            ),
+        ),
+        Case("crud", "count_skills", lambda _: with_session(crud.count_skills)),
+        Case(
+            "crud",
+            "count_skills?mode=cached",
+            lambda _: with_session(
+                crud.count_skills, mode=pagination.TotalCountMode.CACHED
+            ),
+        ),
+        Case(
+            "crud",
+            "get_skills_version",
+            lambda _: with_session(crud.get_skills_version),
+        ),
+        Case("crud", "get_skill_stats", lambda _: with_session(crud.get_skill_stats)),
+        Case(
+            "crud",
+            "get_skill_stats?exact=true",
+            lambda _: with_session(crud.get_skill_stats, exact=True),
+        ),
+        Case("crud", "get_skills", lambda _: with_session(crud.get_skills)),
+        Case(
+            "crud",
+            "get_skills?offset=last_page",
+            lambda _: with_session(crud.get_skills, offset=size - PAGE_SIZE),
+        ),
+        Case(
+            "crud",
+            "get_skills?total=exact",
+            lambda _: with_session(crud.get_skills, total=exact),
+        ),
+        Case(
+            "crud",
+            "get_skills_page?cursor=middle",
+            lambda _: with_session(crud.get_skills_page, cursor=cursor),
+        ),
+        Case(
+            "crud",
+            "get_skills?sort=name&order=desc",
+            lambda _: with_session(
+                crud.get_skills, sort_by=by_name, order=pagination.SortOrder.DESC
+            ),
+        ),
+        Case(
+            "crud",
+            "get_skills?sort=level&level=",
+            lambda _: with_session(crud.get_skills, sort_by=by_level, level=LEVELS[1]),
+        ),
+        Case(
+            "crud",
+            "get_skills_page?sort=level&cursor=",
+            lambda _: with_session(
+                crud.get_skills_page, cursor=level_cursor, sort_by=by_level
+            ),
+        ),
+        Case(
+            "crud",
+            "search_skills",
+            lambda _: with_session(crud.search_skills, query=SEARCH_QUERY),
+        ),
+        Case(
+            "crud",
+            "get_skill_rows",
+            lambda _: with_session(crud.get_skill_rows, fields=ALL_FIELDS),
+        ),
+        Case(
+            "crud",
+            "get_skill_rows?fields=skill_name",
+            lambda _: with_session(crud.get_skill_rows, fields=NAME_FIELD),
+        ),
+        Case(
+            "crud",
+            "get_skill_rows_page?cursor=middle",
+            lambda _: with_session(
+                crud.get_skill_rows_page, fields=ALL_FIELDS, cursor=cursor
+            ),
+        ),
+        Case(
+            "crud",
+            "search_skill_rows",
+            lambda _: with_session(
+                crud.search_skill_rows, fields=ALL_FIELDS, query=SEARCH_QUERY
+            ),
+        ),
+        Case(
+            "crud",
+            "get_skill_fields_by_id",
+            lambda i: with_session(
+                crud.get_skill_fields_by_id,
+                skill_id=spread_id(i, size),
+                fields=ALL_FIELDS,
+            ),
+        ),
+        Case(
+            "crud",
+            "get_skill_fields_by_name",
+            lambda i: with_session(
+                crud.get_skill_fields_by_name,
+                skill_name=make_name(spread_id(i, size)),
+                fields=ALL_FIELDS,
+            ),
+        ),
+        Case(
+            "crud",
+            "get_skill_fields_by_ids",
+            lambda i: with_session(
+                crud.get_skill_fields_by_ids,
+                skill_ids=lookup_ids(i, size),
+                fields=ALL_FIELDS,
+            ),
+        ),
+        Case(
+            "crud",
+            "get_skill_fields_by_names",
+            lambda i: with_session(
+                crud.get_skill_fields_by_names,
+                skill_names=[make_name(skill_id) for skill_id in lookup_ids(i, size)],
+                fields=ALL_FIELDS,
+            ),
+        ),
+        Case("crud", "iter_skills", iterate_all, heavy=True),
+        Case(
+            "crud",
+            "create_skill",
+            lambda i: with_session(
+                crud.create_skill,
+                skill=models.SkillBase(
+                    skill_name=f"crud skill {i}", level_of_confidence=LEVELS[0]
+                ),
+            ),
+            write=True,
+        ),
+        Case(
+            "crud",
+            "create_skills",
+            lambda i: with_session(
+                crud.create_skills, skills=new_skills(f"crud batch {i}", BATCH_SIZE)
+            ),
+            write=True,
+        ),
+        Case(
+            "crud",
+            "update_skill",
+            lambda i: with_session(
+                crud.update_skill,
+                skill_id=middle_id(i),
+                skill=models.SkillUpdate(level_of_confidence=make_level(i)),
+            ),
+            write=True,
+        ),
+        Case(
+            "crud",
+            "update_skill?skill_name",
+            lambda i: with_session(
+                crud.update_skill,
+                skill_id=middle_id(i),
+                skill=models.SkillUpdate(skill_name=f"crud renamed {i}"),
+            ),
+            write=True,
+        ),
+        Case("crud", "delete_skill", delete, write=True),
+    ]
+
+
+def middle_level_cursor(size: int) -> str:
+    """Gets the cursor of the skills sorted by level after the middle one."""
+    return pagination.encode_cursor(
+        sort_by=pagination.SortField.LEVEL_OF_CONFIDENCE,
+        key=(make_level(size // 2).name, make_name(size // 2)),
+    )
+
+
+def spread_id(iteration: int, size: int) -> int:
+    """Gets ids spread over the whole table, a different one per iteration."""
+    return 1 + (iteration * 7919) % size
+
+
+def lookup_ids(iteration: int, size: int) -> list[int]:
+    """Gets ids spread over the whole table, different ones per iteration."""
+    return [
+        spread_id(iteration * LOOKUP_SIZE + number, size)
+        for number in range(LOOKUP_SIZE)
+    ]
+
+
+def new_skills(prefix: str, number_of_skills: int) -> list[models.SkillBase]:
+    return [
+        models.SkillBase(
+            skill_name=f"{prefix} {number}", level_of_confidence=make_level(number)
+        )
+        for number in range(number_of_skills)
+    ]
+
+
+def http_cases(
+    client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop, size: int
+) -> list[Case]:
+    def request(method: str, url: str, **kwargs: Any) -> None:
+        response = loop.run_until_complete(client.request(method, url, **kwargs))
+        if response.is_error:
+            msg = f"{method} {url} answered {response.status_code}: {response.text}"
+            raise RuntimeError(msg)
+        last_responses[url] = response
+
+    def get(url: str, **kwargs: Any) -> Callable[[int], None]:
+        return lambda _: request("GET", url, **kwargs)
+
+    def import_skills(iteration: int) -> None:
+        ndjson = "\n".join(
+            skill.model_dump_json()
+            for skill in new_skills(f"imported {iteration}", IMPORT_SIZE)
+        )
+        request(
+            "POST",
+            "/v1/skills/import",
+            files={"file": ("skills.ndjson", ndjson.encode())},
+        )
+
+    def get_import_job(_iteration: int) -> None:
+        job_id = last_responses["/v1/skills/import"].json()["job_id"]
+        request("GET", f"/v1/skills/import/{job_id}")
+
+    last_responses: dict[str, httpx.Response] = {}
+    cursor = pagination.encode_cursor(
+        sort_by=pagination.SortField.SKILL_ID, key=size // 2
+    )
+    return [
+        Case("http", "GET /v1/skills/", get("/v1/skills/")),
+        Case(
+            "http",
+            "GET /v1/skills/?offset=last_page",
+            get("/v1/skills/", params={"offset": size - PAGE_SIZE}),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/?total=exact",
+            get("/v1/skills/", params={"total": "exact"}),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/?cursor=middle",
+            get("/v1/skills/", params={"cursor": cursor}),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/?sort=name&order=desc",
+            get("/v1/skills/", params={"sort": "skill_name", "order": "desc"}),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/?sort=level&level=",
+            get(
+                "/v1/skills/",
+                params={"sort": "level_of_confidence", "level": LEVELS[1].value},
+            ),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/?sort=level&cursor=",
+            get(
+                "/v1/skills/",
+                params={
+                    "sort": "level_of_confidence",
+                    "cursor": middle_level_cursor(size),
+                },
+            ),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/?fields=skill_name",
+            get("/v1/skills/", params={"fields": "skill_name"}),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/search?fields=",
+            get(
+                "/v1/skills/search",
+                params={"q": SEARCH_QUERY, "fields": "skill_name"},
+            ),
+        ),
+        Case("http", "GET /v1/skills/stats", get("/v1/skills/stats")),
+        Case(
+            "http",
+            "GET /v1/skills/stats?exact=true",
+            get("/v1/skills/stats", params={"exact": True}),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/search",
+            get("/v1/skills/search", params={"q": SEARCH_QUERY}),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/id/{skill_id}",
+            lambda i: request("GET", f"/v1/skills/id/{spread_id(i, size)}"),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/name/{skill_name}",
+            lambda i: request(
+                "GET", f"/v1/skills/name/{make_name(spread_id(i, size))}"
+            ),
+        ),
+        Case(
+            "http",
+            "GET /v1/skills/id/{id}?fields=",
+            lambda i: request(
+                "GET",
+                f"/v1/skills/id/{spread_id(i, size)}",
+                params={"fields": "skill_name"},
+            ),
+        ),
+        Case(
+            "http",
+            "POST /v1/skills/lookup/id",
+            lambda i: request("POST", "/v1/skills/lookup/id", json=lookup_ids(i, size)),
+        ),
+        Case(
+            "http",
+            "POST /v1/skills/lookup/name",
+            lambda i: request(
+                "POST",
+                "/v1/skills/lookup/name",
+                json=[make_name(skill_id) for skill_id in lookup_ids(i, size)],
+            ),
+        ),
+        Case("http", "GET /v1/skills/export", get("/v1/skills/export"), heavy=True),
+        Case(
+            "http",
+            "GET /v1/skills/export?format=csv",
+            get("/v1/skills/export", params={"format": "csv"}),
+            heavy=True,
+        ),
+        Case("http", "GET /api/skills/", get("/api/skills/")),
+        Case(
+            "http",
+            "GET /api/skills/?sort=level&level=",
+            get(
+                "/api/skills/",
+                params={"sort": "level_of_confidence", "level": LEVELS[1].value},
+            ),
+        ),
+        Case(
+            "http",
+            "GET /api/skills/?q=",
+            get("/api/skills/", params={"q": SEARCH_QUERY}),
+        ),
+        Case(
+            "http",
+            "POST /v1/skills/",
+            lambda i: request(
+                "POST",
+                "/v1/skills/",
+                json={
+                    "skill_name": f"http skill {i}",
+                    "level_of_confidence": LEVELS[0].value,
+                },
+            ),
+            write=True,
+        ),
+        Case(
+            "http",
+            "POST /v1/skills/batch",
+            lambda i: request(
+                "POST",
+                "/v1/skills/batch",
+                json=[
+                    skill.model_dump(mode="json")
+                    for skill in new_skills(f"http batch {i}", BATCH_SIZE)
+                ],
+            ),
+            write=True,
+        ),
+        Case("http", "POST /v1/skills/import", import_skills, heavy=True, write=True),
+        Case("http", "GET /v1/skills/import/{job_id}", get_import_job, write=True),
+        Case(
+            "http",
+            "PATCH /v1/skills/{skill_id}",
+            lambda i: request(
+                "PATCH",
+                f"/v1/skills/{spread_id(i, size // 2)}",
+                json={"level_of_confidence": make_level(i).value},
+            ),
+            write=True,
+        ),
+    ]
+
+
+def measure(case: Case, iterations: int) -> dict[str, Any]:
+    cache.skill_cache.clear()
+    timings = []
+    for iteration in range(iterations):
+        start = time.perf_counter()
+        case.run(iteration)
+        timings.append(time.perf_counter() - start)
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "kind": case.kind,
+        "case": case.name,
+        "iterations": iterations,
+        "throughput_per_s": round(iterations / sum(timings), 2),
+        "p50_ms": round(statistics.median(timings) * 1000, 4),
+        "p99_ms": round(percentiles[98] * 1000, 4),
+    }
+
+
+@dataclasses.dataclass(frozen=True)
+class RunOptions:
+    repeat: int
+    heavy_repeat: int
+    kinds: tuple[str, ...]
+
+
+def override_sessions(engine: sqlalchemy.Engine) -> None:
+    def get_session() -> Iterator[sqlmodel.Session]:
+        with sqlmodel.Session(engine) as session:
+            yield session
+
+    overrides = skillventory_main.app.dependency_overrides
+    overrides[dependencies.get_db_session] = get_session
+    overrides[dependencies.get_read_db_session] = get_session
+    overrides[dependencies.get_read_session_factory] = lambda: (
+        lambda: sqlmodel.Session(engine)
+    )
+    overrides[dependencies.get_job_session_factory] = lambda: (
+        lambda: sqlmodel.Session(engine)
+    )
+
+
+def run_size(
+    data_dir: pathlib.Path, size: int, options: RunOptions
+) -> list[dict[str, Any]]:
+    engine = make_engine(prepare_dataset(data_dir, size))
+    override_sessions(engine)
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=skillventory_main.app),
+        base_url="http://benchmark",
+    )
+    cases = []
+    if "crud" in options.kinds:
+        cases += crud_cases(engine, size)
+    if "http" in options.kinds:
+        cases += http_cases(client, loop, size)
+    results = []
+    try:
+        for case in sorted(cases, key=lambda case: case.write):
+            iterations = options.heavy_repeat if case.heavy else options.repeat
+            result = {"dataset": size, **measure(case, iterations)}
+            print(
+                f"{size:>8} {case.name:<36} {result['p50_ms']:>10.3f} "
+                f"{result['p99_ms']:>10.3f} {result['throughput_per_s']:>10.1f}"
+            )
+            results.append(result)
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+        skillventory_main.app.dependency_overrides.clear()
+        engine.dispose()
+    return results
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: dict[str, Any], tolerance: float
+) -> bool:
+    """Prints the p50 change of every case also in the baseline.
+
+    Returns:
+        True if a case regressed by more than the tolerance.
+    """
+    baseline_p50 = {
+        (result["dataset"], result["kind"], result["case"]): result["p50_ms"]
+        for result in baseline["results"]
+    }
+    regressed = False
+    print(f"\n{'dataset':>8} {'case':<36} {'base p50':>10} {'p50':>10} {'change':>8}")
+    for result in results:
+        key = (result["dataset"], result["kind"], result["case"])
+        if key not in baseline_p50:
+            continue
+        change = result["p50_ms"] / baseline_p50[key] - 1
+        flag = ""
+        if change > tolerance:
+            regressed = True
+            flag = "  REGRESSION"
+        print(
+            f"{result['dataset']:>8} {result['case']:<36} {baseline_p50[key]:>10.3f} "
+            f"{result['p50_ms']:>10.3f} {change:>+8.1%}{flag}"
+        )
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--heavy-repeat", type=int, default=5)
+    parser.add_argument(
+        "--kinds", nargs="+", choices=["crud", "http"], default=["crud", "http"]
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=pathlib.Path,
+        help="Directory keeping the generated datasets between runs, "
+        "a temporary one by default.",
+    )
+    parser.add_argument(
+        "--output", type=pathlib.Path, default=pathlib.Path("benchmark-results.json")
+    )
+    parser.add_argument("--baseline", type=pathlib.Path)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Slowdown of the p50 tolerated before a regression, 0.25 is 25%%.",
+    )
+    args = parser.parse_args()
+
+    # The hot-path records would be most of what the CRUD cases measure.
+    log_config.configure_logging(log_config.LogSettings(LOG_LEVEL="WARNING"))
+    options = RunOptions(
+        repeat=args.repeat, heavy_repeat=args.heavy_repeat, kinds=tuple(args.kinds)
+    )
+    results = []
+    print(
+        f"{'dataset':>8} {'case':<36} {'p50 (ms)':>10} {'p99 (ms)':>10} {'ops/s':>10}"
+    )
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        data_dir: pathlib.Path = args.data_dir or pathlib.Path(temporary_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for size in args.sizes:
+            results += run_size(data_dir, size, options)
+    report = {
+        "created_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "sqlite_pragmas": config.db_settings.pragmas(),
+        "repeat": args.repeat,
+        "heavy_repeat": args.heavy_repeat,
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {args.output}")
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import time
+
+# When the package started being imported, for the startup report.
+IMPORT_STARTED = time.perf_counter()
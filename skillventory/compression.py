@@ -0,0 +1,327 @@
+"""Compression of the HTTP responses.
+
+`CompressionMiddleware` negotiates the content encoding of every response
+with its Accept-Encoding header, brotli when the optional brotli package is
+installed (the compression extra) and gzip otherwise, and compresses the
+bodies above a size threshold. The responses carrying an ETag, the skill
+reads, are kept compressed by URL, ETag and encoding: the ETag changes with
+every write, so a repeated query is answered without compressing it again.
+Streaming responses, the exports, are sent as they are.
+
+`PrecompressedContent` holds a static body compressed ahead of time in every
+encoding, for the landing page.
+"""
+
+import collections
+import gzip
+import hashlib
+import threading
+from typing import Any, Optional
+
+import pydantic
+import pydantic_settings
+from fastapi import responses, status
+from starlette import datastructures, requests, types
+
+from skillventory.routers import http_cache
+
+try:
+    import brotli
+except ImportError:  # The compression extra isn't installed.
+    brotli = None
+
+COMPRESSIBLE_MEDIA_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "text/",
+)
+
+CacheKey = tuple[str, bytes, str, str]
+
+
+class CompressionSettings(pydantic_settings.BaseSettings):
+    """Compression settings model.
+
+    Attributes:
+        COMPRESSION_ENABLED: True to compress the responses. Default is True
+        COMPRESSION_MINIMUM_SIZE: Size in bytes under which a body is sent
+        uncompressed, it wouldn't shrink enough to pay off. Default is 1024
+        GZIP_LEVEL: Compression level of gzip, from 1 to 9. Default is 6
+        BROTLI_QUALITY: Quality of brotli, from 0 to 11. Default is 5
+        COMPRESSED_CACHE_SIZE: Number of compressed responses with an ETag
+        kept, 0 disables the cache. Default is 256
+        model_config: Configuration for Pydantic models loaded from .env file.
+    """
+
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = pydantic.Field(default=1024, ge=0)
+    GZIP_LEVEL: int = pydantic.Field(default=6, ge=1, le=9)
+    BROTLI_QUALITY: int = pydantic.Field(default=5, ge=0, le=11)
+    COMPRESSED_CACHE_SIZE: int = pydantic.Field(default=256, ge=0)
+
+    model_config = pydantic_settings.SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Gets the content encodings supported, the preferred first.
+
+    Returns:
+        br if brotli is installed, and gzip.
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Chooses the content encoding of a response.
+
+    Args:
+        accept_encoding: The Accept-Encoding header of the request.
+
+    Returns:
+        The accepted encoding with the highest weight, the preferred one
+        between equals, None for the identity.
+    """
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        weight = 1.0
+        name, _, value = parameters.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                continue
+        weights[coding.strip().lower()] = weight
+    wildcard = weights.get("*", 0.0)
+    candidates = [
+        (weights.get(encoding, wildcard), -preference, encoding)
+        for preference, encoding in enumerate(available_encodings())
+    ]
+    weight, _, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+
+def compress(
+    body: bytes, encoding: str, settings: Optional[CompressionSettings] = None
+) -> bytes:
+    """Compresses a body.
+
+    Args:
+        body: The body to compress.
+        encoding: The content encoding, br or gzip.
+        settings: The compression levels, the module ones by default.
+
+    Returns:
+        The compressed body.
+    """
+    settings = settings or compression_settings
+    if encoding == "br" and brotli is not None:
+        compressed: bytes = brotli.compress(body, quality=settings.BROTLI_QUALITY)
+        return compressed
+    return gzip.compress(body, compresslevel=settings.GZIP_LEVEL, mtime=0)
+
+
+class CompressedCache:
+    """Thread-safe LRU cache of compressed bodies.
+
+    Args:
+        size: Number of bodies kept, the least recently used are evicted.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._bodies: collections.OrderedDict[CacheKey, bytes] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        """Gets a compressed body, marking it as recently used.
+
+        Args:
+            key: The path, query string, ETag and encoding of the response.
+
+        Returns:
+            The compressed body, None if it isn't cached.
+        """
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+            return body
+
+    def put(self, key: CacheKey, body: bytes) -> None:
+        """Stores a compressed body, evicting the least recently used one.
+
+        Args:
+            key: The path, query string, ETag and encoding of the response.
+            body: The compressed body.
+        """
+        if self.size == 0:
+            return
+        with self._lock:
+            self._bodies[key] = body
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > self.size:
+                self._bodies.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes all the bodies."""
+        with self._lock:
+            self._bodies.clear()
+
+
+def _is_compressible(headers: datastructures.MutableHeaders) -> bool:
+    return "content-encoding" not in headers and headers.get(
+        "content-type", ""
+    ).startswith(COMPRESSIBLE_MEDIA_TYPES)
+
+
+def _add_vary_header(headers: datastructures.MutableHeaders) -> None:
+    if "accept-encoding" not in headers.get("vary", "").lower():
+        headers.add_vary_header("Accept-Encoding")
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing the responses in the negotiated encoding.
+
+    Args:
+        app: The ASGI application to wrap.
+    """
+
+    def __init__(self, app: types.ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self, scope: types.Scope, receive: types.Receive, send: types.Send
+    ) -> None:
+        if scope["type"] != "http" or not compression_settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        request_headers = datastructures.Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"))
+        start_message: Optional[types.Message] = None
+
+        async def send_wrapper(message: types.Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Held until the body tells whether the response is streamed.
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+            held, start_message = start_message, None
+            headers = datastructures.MutableHeaders(raw=held["headers"])
+            body = message.get("body", b"")
+            if held["status"] == status.HTTP_304_NOT_MODIFIED:
+                _set_not_modified_etag(headers, request_headers, encoding)
+            elif _is_compressible(headers):
+                # Compressed or not, the response depends on Accept-Encoding.
+                _add_vary_header(headers)
+                if (
+                    encoding is not None
+                    and not message.get("more_body", False)
+                    and len(body) >= compression_settings.COMPRESSION_MINIMUM_SIZE
+                ):
+                    body = self._compress(scope, headers, body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    message = {**message, "body": body}
+            await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compress(
+        scope: types.Scope,
+        headers: datastructures.MutableHeaders,
+        body: bytes,
+        encoding: str,
+    ) -> bytes:
+        etag = headers.get("etag")
+        if etag is None:
+            return compress(body, encoding)
+        headers["ETag"] = http_cache.representation_etag(etag, encoding)
+        key = (scope["path"], scope["query_string"], etag, encoding)
+        compressed = compressed_cache.get(key)
+        if compressed is None:
+            compressed = compress(body, encoding)
+            compressed_cache.put(key, compressed)
+        return compressed
+
+
+def _set_not_modified_etag(
+    headers: datastructures.MutableHeaders,
+    request_headers: datastructures.Headers,
+    encoding: Optional[str],
+) -> None:
+    # A 304 carries the ETag of the representation the client holds, the
+    # compressed one if that is what it revalidated.
+    etag = headers.get("etag")
+    if etag is None:
+        return
+    _add_vary_header(headers)
+    if encoding is None:
+        return
+    encoded_etag = http_cache.representation_etag(etag, encoding)
+    if encoded_etag in request_headers.get("if-none-match", ""):
+        headers["ETag"] = encoded_etag
+
+
+class PrecompressedContent:
+    """A static body compressed ahead of time in every available encoding.
+
+    Every representation has its own strong ETag, derived from the content.
+
+    Args:
+        content: The body.
+        media_type: The media type of the body.
+    """
+
+    def __init__(self, content: bytes, media_type: str) -> None:
+        self.media_type = media_type
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        best = CompressionSettings(GZIP_LEVEL=9, BROTLI_QUALITY=11)
+        self.variants: dict[Optional[str], bytes] = {
+            None: content,
+            **{
+                encoding: compress(content, encoding, best)
+                for encoding in available_encodings()
+            },
+        }
+
+    def response(self, request: requests.Request) -> responses.Response:
+        """Answers a request with the representation it accepts.
+
+        Args:
+            request: The incoming request.
+
+        Returns:
+            The body in the negotiated encoding, or a 304 if the client's copy
+            is current.
+        """
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        headers: dict[str, Any] = {
+            "ETag": http_cache.representation_etag(self.etag, encoding),
+            "Vary": "Accept-Encoding",
+        }
+        if http_cache.etag_matches(request.headers.get("if-none-match"), self.etag):
+            return responses.Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return responses.Response(
+            content=self.variants[encoding],
+            media_type=self.media_type,
+            headers=headers,
+        )
+
+
+compression_settings = CompressionSettings()
+compressed_cache = CompressedCache(compression_settings.COMPRESSED_CACHE_SIZE)
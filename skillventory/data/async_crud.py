@@ -0,0 +1,46 @@
+"""Async access to the CRUD functions.
+
+The CRUD functions are written once, against a sync session. `run` awaits
+them with either kind of session: an async session runs them on the event
+loop through `AsyncSession.run_sync`, while a sync session runs them on the
+threadpool so they never block the event loop.
+"""
+
+from collections.abc import Callable
+from typing import Concatenate, ParamSpec, TypeVar, cast
+
+import sqlmodel
+from sqlalchemy import orm
+from sqlmodel.ext.asyncio import session as sm_asyncio
+from starlette import concurrency
+
+from skillventory.data import dependencies as deps
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+async def run(
+    session: deps.AnySession,
+    operation: Callable[Concatenate[sqlmodel.Session, P], T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """Awaits a CRUD function.
+
+    Args:
+        session: The sync or async database session.
+        operation: The CRUD function, it receives the sync session as its
+            first argument.
+        *args: Positional arguments for the CRUD function.
+        **kwargs: Keyword arguments for the CRUD function.
+
+    Returns:
+        The value returned by the CRUD function.
+    """
+    if isinstance(session, sm_asyncio.AsyncSession):
+        # The sync session of a SQLModel AsyncSession is a SQLModel Session,
+        # run_sync is only typed for the SQLAlchemy one it derives from.
+        sync_operation = cast(Callable[Concatenate[orm.Session, P], T], operation)
+        return await session.run_sync(sync_operation, *args, **kwargs)
+    return await concurrency.run_in_threadpool(operation, session, *args, **kwargs)
@@ -0,0 +1,176 @@
+"""In-process cache for the skill lookups.
+
+The cache is bounded both by size, evicting the least recently used entry,
+and by age, so the entries written by other processes are eventually seen.
+The CRUD functions invalidate the entries of the skills they write. The
+reads answered with an ETag, the version of the skill table, only use the
+entries read at that version.
+"""
+
+import collections
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, NamedTuple, Optional, TypeVar
+
+import pydantic
+import pydantic_settings
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+MISSING: Any = object()
+
+
+class CacheSettings(pydantic_settings.BaseSettings):
+    """Cache settings model.
+
+    Attributes:
+        CACHE_MAX_SIZE: Maximum number of lookups kept, 0 disables the cache.
+        Default is 1024
+        CACHE_TTL: Seconds a lookup is served from the cache. Default is 60
+        model_config: Configuration for Pydantic models loaded from .env file.
+    """
+
+    CACHE_MAX_SIZE: int = pydantic.Field(default=1024, ge=0)
+    CACHE_TTL: float = pydantic.Field(default=60.0, gt=0)
+
+    model_config = pydantic_settings.SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+class CacheStats(pydantic.BaseModel):
+    """Counters of a cache since it was created."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+
+class LRUTTLCache(Generic[K, V]):
+    """Thread-safe cache evicting by least recent use and by age.
+
+    Args:
+        max_size: Maximum number of entries, 0 disables the cache.
+        ttl: Seconds an entry is served after being set.
+        clock: Monotonic clock, in seconds.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: collections.OrderedDict[K, tuple[float, V]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: K) -> V:
+        """Gets the value of a key.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            The cached value, MISSING if the key isn't cached or has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._evictions += 1
+            self._misses += 1
+            return MISSING
+
+    def set(self, key: K, value: V) -> None:
+        """Sets the value of a key, evicting the least recently used entry if full.
+
+        Args:
+            key: The key to set.
+            value: The value to cache, None included.
+        """
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def discard(self, *keys: K) -> None:
+        """Removes keys from the cache, the ones not cached are ignored.
+
+        Args:
+            *keys: The keys to remove.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def discard_if(self, predicate: Callable[[V], bool]) -> None:
+        """Removes the entries whose value matches a predicate.
+
+        Args:
+            predicate: Returns True for the values to remove.
+        """
+        with self._lock:
+            for key in [
+                key for key, (_, value) in self._entries.items() if predicate(value)
+            ]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Removes all the entries, the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Gets the counters of the cache.
+
+        Returns:
+            The hits, misses, evictions and current size.
+        """
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                max_size=self.max_size,
+            )
+
+
+class CachedSkill(NamedTuple):
+    """A skill lookup kept in the cache.
+
+    Attributes:
+        columns: The columns of the skill, None if it doesn't exist.
+        version: The version of the skill table the columns were read at,
+            None if it wasn't read with them.
+    """
+
+    columns: Optional[dict[str, Any]]
+    version: Optional[int] = None
+
+
+cache_settings = CacheSettings()
+
+# Keys are ("id", skill_id) or ("name", skill_name).
+skill_cache: LRUTTLCache[tuple[str, Any], CachedSkill] = LRUTTLCache(
+    max_size=cache_settings.CACHE_MAX_SIZE, ttl=cache_settings.CACHE_TTL
+)
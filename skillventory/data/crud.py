@@ -1,108 +1,924 @@
 """CRUD functions."""
 
-from collections.abc import Sequence
-from typing import Optional, Tuple
+import re
+from collections.abc import Iterator, Sequence
+from typing import Any, Dict, Optional, Tuple, TypeVar, Union
 
+import sqlalchemy
 import sqlmodel
 from loguru import logger
-from sqlalchemy import exc
+from sqlalchemy import exc, orm
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import expression
+from sqlmodel.sql import expression as sm_expression
 
+from skillventory import log_config
+from skillventory.data import cache, pagination
 from skillventory.models import models
 
+_SelectT = TypeVar("_SelectT", bound=sqlalchemy.Select[Any])
+
+# A skill, or a row of some of its columns read without the ORM.
+SkillRecord = Union[models.Skill, sqlalchemy.Row[Any]]
+
+
+def _cache_skill(skill: Optional[models.Skill], key: Tuple[str, Any]) -> None:
+    _cache_columns(None if skill is None else skill.model_dump(), key)
+
+
+def _cache_columns(
+    columns: Optional[Dict[str, Any]],
+    key: Tuple[str, Any],
+    version: Optional[int] = None,
+) -> None:
+    cached = cache.CachedSkill(columns, version)
+    if columns is None:
+        cache.skill_cache.set(key, cached)
+        return
+    cache.skill_cache.set(("id", columns["skill_id"]), cached)
+    cache.skill_cache.set(("name", columns["skill_name"]), cached)
+
+
+def _skill_from_cache(
+    session: sqlmodel.Session, columns: Optional[Dict[str, Any]]
+) -> Optional[models.Skill]:
+    if columns is None:
+        return None
+    skill = models.Skill(**columns)
+    # Attaches the cached skill to the session without querying the database.
+    orm.make_transient_to_detached(skill)
+    return session.merge(skill, load=False)
+
+
+def _invalidate_skill(
+    skill_id: Optional[int] = None, skill_name: Optional[str] = None
+) -> None:
+    if skill_name is not None:
+        cache.skill_cache.discard(("name", skill_name))
+    if skill_id is not None:
+        cache.skill_cache.discard(("id", skill_id))
+        # The skill may be cached under a name it no longer has.
+        cache.skill_cache.discard_if(
+            lambda cached: cached.columns is not None
+            and cached.columns["skill_id"] == skill_id
+        )
+
+
+def _invalidate_skill_keys(skills: Dict[str, int]) -> None:
+    # The skills kept their name, a new one can't be cached under another:
+    # discarding their keys, and the misses cached for them, is enough.
+    cache.skill_cache.discard(
+        *(("id", skill_id) for skill_id in skills.values()),
+        *(("name", skill_name) for skill_name in skills),
+    )
+
 
 def get_skill_by_id(session: sqlmodel.Session, skill_id: int) -> Optional[models.Skill]:
-    skill: Optional[models.Skill] = session.get(models.Skill, skill_id)
+    skill: Optional[models.Skill]
+    cached = cache.skill_cache.get(("id", skill_id))
+    if cached is cache.MISSING:
+        skill = session.get(models.Skill, skill_id)
+        _cache_skill(skill, ("id", skill_id))
+    else:
+        skill = _skill_from_cache(session, cached.columns)
     if skill is None:
-        logger.warning(f"The skill with id {skill_id} doesn't exists", stacklevel=2)
-    logger.info("Operation 'get_skill_by_id' ended successfully")
+        log_config.hot_path(
+            "WARNING", "The skill with id {} doesn't exists", skill_id, depth=1
+        )
+    log_config.hot_path("INFO", "Operation 'get_skill_by_id' ended successfully")
     return skill
 
 
 def get_skill_by_name(
     session: sqlmodel.Session, skill_name: str
 ) -> Optional[models.Skill]:
-    statement = sqlmodel.select(models.Skill).where(
-        sqlmodel.col(models.Skill.skill_name) == skill_name
-    )
-    results = session.exec(statement=statement)
-    skill: Optional[models.Skill] = results.first()
+    skill: Optional[models.Skill]
+    cached = cache.skill_cache.get(("name", skill_name))
+    if cached is cache.MISSING:
+        statement = sqlmodel.select(models.Skill).where(
+            sqlmodel.col(models.Skill.skill_name) == skill_name
+        )
+        results = session.exec(statement=statement)
+        skill = results.first()
+        _cache_skill(skill, ("name", skill_name))
+    else:
+        skill = _skill_from_cache(session, cached.columns)
     if skill is None:
-        logger.warning(f"The skill named {skill_name} doesn't exists", stacklevel=2)
-    logger.info("Operation 'get_skill_by_name' ended successfully")
+        log_config.hot_path(
+            "WARNING", "The skill named {} doesn't exists", skill_name, depth=1
+        )
+    log_config.hot_path("INFO", "Operation 'get_skill_by_name' ended successfully")
     return skill
 
 
-def create_skill(session: sqlmodel.Session, skill: models.SkillBase) -> None:
-    try:
-        skill_db: models.Skill = models.Skill(**skill.model_dump())
-        session.add(skill_db)
+def _key_column(kind: str) -> sqlalchemy.Column[Any]:
+    return sqlalchemy.inspect(models.Skill).columns[
+        "skill_id" if kind == "id" else "skill_name"
+    ]
+
+
+def _get_skill_fields(
+    session: sqlmodel.Session,
+    key: Tuple[str, Any],
+    fields: Sequence[models.SkillField],
+    version: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    cached = cache.skill_cache.get(key)
+    # An entry read at another version, by a request racing a write, may be
+    # older than the version the caller reports.
+    if cached is cache.MISSING or (version is not None and cached.version != version):
+        # All the columns are read, so the cached skill serves any fields.
+        statement = sqlalchemy.select(*sqlalchemy.inspect(models.Skill).columns).where(
+            _key_column(key[0]) == key[1]
+        )
+        row = session.execute(statement).first()
+        columns = None if row is None else row._asdict()
+        _cache_columns(columns, key, version)
+    else:
+        columns = cached.columns
+    if columns is None:
+        return None
+    return {field.value: columns[field.value] for field in fields}
+
+
+def _get_many_skill_fields(
+    session: sqlmodel.Session,
+    kind: str,
+    keys: Sequence[Any],
+    fields: Sequence[models.SkillField],
+    chunk_size: int,
+) -> Tuple[list[Dict[str, Any]], list[Any]]:
+    unique_keys = list(dict.fromkeys(keys))
+    found: Dict[Any, Optional[Dict[str, Any]]] = {}
+    for key in unique_keys:
+        cached = cache.skill_cache.get((kind, key))
+        if cached is not cache.MISSING:
+            found[key] = cached.columns
+    misses = [key for key in unique_keys if key not in found]
+    key_column = _key_column(kind)
+    for start in range(0, len(misses), chunk_size):
+        chunk = misses[start : start + chunk_size]
+        statement = sqlalchemy.select(*sqlalchemy.inspect(models.Skill).columns).where(
+            key_column.in_(chunk)
+        )
+        rows = {
+            row._mapping[key_column]: row._asdict()
+            for row in session.execute(statement)
+        }
+        for key in chunk:
+            found[key] = rows.get(key)
+            _cache_columns(found[key], (kind, key))
+    skills: list[Dict[str, Any]] = []
+    missing: list[Any] = []
+    for key in unique_keys:
+        columns = found[key]
+        if columns is None:
+            missing.append(key)
+        else:
+            skills.append({field.value: columns[field.value] for field in fields})
+    return skills, missing
+
+
+def get_skill_fields_by_id(
+    session: sqlmodel.Session,
+    skill_id: int,
+    fields: Sequence[models.SkillField],
+    version: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """Gets some columns of a skill by id, without the ORM.
+
+    Args:
+        session: The database session.
+        skill_id: The id of the skill.
+        fields: The columns to return.
+        version: The version of the skill table read in the same transaction,
+            the skill cached at another version is read again.
+
+    Returns:
+        The requested columns by name, None if the skill doesn't exist.
+    """
+    columns = _get_skill_fields(session, ("id", skill_id), fields, version)
+    if columns is None:
+        log_config.hot_path(
+            "WARNING", "The skill with id {} doesn't exists", skill_id, depth=1
+        )
+    log_config.hot_path("INFO", "Operation 'get_skill_fields_by_id' ended successfully")
+    return columns
+
+
+def get_skill_fields_by_name(
+    session: sqlmodel.Session,
+    skill_name: str,
+    fields: Sequence[models.SkillField],
+    version: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """Gets some columns of a skill by name, without the ORM.
+
+    Args:
+        session: The database session.
+        skill_name: The name of the skill.
+        fields: The columns to return.
+        version: The version of the skill table read in the same transaction,
+            the skill cached at another version is read again.
+
+    Returns:
+        The requested columns by name, None if the skill doesn't exist.
+    """
+    columns = _get_skill_fields(session, ("name", skill_name), fields, version)
+    if columns is None:
+        log_config.hot_path(
+            "WARNING", "The skill named {} doesn't exists", skill_name, depth=1
+        )
+    log_config.hot_path(
+        "INFO", "Operation 'get_skill_fields_by_name' ended successfully"
+    )
+    return columns
+
+
+def get_skill_fields_by_ids(
+    session: sqlmodel.Session,
+    skill_ids: Sequence[int],
+    fields: Sequence[models.SkillField],
+    chunk_size: int = 500,
+) -> Tuple[list[Dict[str, Any]], list[int]]:
+    """Gets some columns of many skills by id.
+
+    The skills in the lookup cache aren't queried; the rest are read with one
+    ``WHERE skill_id IN (...)`` query per chunk of ids and cached.
+
+    Args:
+        session: The database session.
+        skill_ids: The ids of the skills.
+        fields: The columns to return.
+        chunk_size: The maximum number of ids per query.
+
+    Returns:
+        The requested columns of the skills found and the ids without a skill,
+        both in the order of the ids, without repetitions.
+    """
+    skills, missing = _get_many_skill_fields(
+        session, "id", skill_ids, fields=fields, chunk_size=chunk_size
+    )
+    log_config.hot_path(
+        "INFO", "Operation 'get_skill_fields_by_ids' ended successfully"
+    )
+    return skills, missing
+
+
+def get_skill_fields_by_names(
+    session: sqlmodel.Session,
+    skill_names: Sequence[str],
+    fields: Sequence[models.SkillField],
+    chunk_size: int = 500,
+) -> Tuple[list[Dict[str, Any]], list[str]]:
+    """Gets some columns of many skills by name.
+
+    The skills in the lookup cache aren't queried; the rest are read with one
+    ``WHERE skill_name IN (...)`` query per chunk of names and cached.
+
+    Args:
+        session: The database session.
+        skill_names: The names of the skills.
+        fields: The columns to return.
+        chunk_size: The maximum number of names per query.
+
+    Returns:
+        The requested columns of the skills found and the names without a
+        skill, both in the order of the names, without repetitions.
+    """
+    skills, missing = _get_many_skill_fields(
+        session, "name", skill_names, fields=fields, chunk_size=chunk_size
+    )
+    log_config.hot_path(
+        "INFO", "Operation 'get_skill_fields_by_names' ended successfully"
+    )
+    return skills, missing
+
+
+def create_skill(
+    session: sqlmodel.Session,
+    skill: models.SkillBase,
+    on_conflict: models.OnConflict = models.OnConflict.IGNORE,
+) -> models.SkillCreationResult:
+    """Adds a skill to the database with a single INSERT ... ON CONFLICT.
+
+    Args:
+        session: The database session.
+        skill: The skill to add.
+        on_conflict: UPDATE overwrites the level of confidence of an existing
+            skill with the same name, the other policies leave it untouched.
+
+    Returns:
+        Whether the skill was created, updated or conflicted with an existing one.
+    """
+    statement = (
+        sqlite.insert(models.Skill)
+        .values(**skill.model_dump())
+        .on_conflict_do_nothing(index_elements=["skill_name"])
+        .returning(sqlmodel.col(models.Skill.skill_id))
+    )
+    skill_id: Optional[int] = session.execute(statement).scalar_one_or_none()
+    status = models.CreationStatus.CREATED
+    if skill_id is None and on_conflict is models.OnConflict.UPDATE:
+        # RETURNING can't tell an upserted row from an inserted one, so the
+        # update is only issued once the insert has conflicted.
+        update_statement = (
+            sqlalchemy.update(models.Skill)
+            .where(sqlmodel.col(models.Skill.skill_name) == skill.skill_name)
+            .values(level_of_confidence=skill.level_of_confidence)
+            .returning(sqlmodel.col(models.Skill.skill_id))
+        )
+        skill_id = session.execute(update_statement).scalar_one_or_none()
+        status = models.CreationStatus.UPDATED
+    session.commit()
+    if skill_id is not None:
+        _invalidate_skill_keys({skill.skill_name: skill_id})
+    if skill_id is None:
+        logger.error("Skill {} already exist", skill.skill_name)
+        status = models.CreationStatus.CONFLICT
+    else:
+        logger.info("Skill {} {} successfully", skill.skill_name, status.value)
+    return models.SkillCreationResult(
+        skill_name=skill.skill_name, status=status, skill_id=skill_id
+    )
+
+
+def count_skills(
+    session: sqlmodel.Session,
+    mode: pagination.TotalCountMode = pagination.TotalCountMode.EXACT,
+    level: Optional[models.LevelOfConfidence] = None,
+) -> Optional[int]:
+    """Counts the skills in the database.
+
+    Args:
+        session: The database session.
+        mode: EXACT scans the skill table, CACHED reads the maintained
+            counters and NONE skips the count.
+        level: Only count the skills with this level of confidence.
+
+    Returns:
+        The number of skills, None if the mode is NONE.
+    """
+    if mode is pagination.TotalCountMode.NONE:
+        return None
+    count_statement: sm_expression.SelectOfScalar[int]
+    if mode is pagination.TotalCountMode.CACHED:
+        count_statement = sqlmodel.select(
+            expression.func.coalesce(
+                expression.func.sum(models.SkillLevelCount.total), 0
+            )
+        )
+        if level is not None:
+            count_statement = count_statement.where(
+                models.SkillLevelCount.level_of_confidence == level
+            )
+    else:
+        count_statement = sqlmodel.select(expression.func.count()).select_from(
+            models.Skill
+        )
+        if level is not None:
+            count_statement = count_statement.where(
+                models.Skill.level_of_confidence == level
+            )
+    count: int = session.exec(count_statement).one()
+    return count
+
+
+def get_skills_version(session: sqlmodel.Session) -> int:
+    """Reads the version of the skill table, it changes whenever a skill does.
+
+    Args:
+        session: The database session.
+
+    Returns:
+        The current version.
+    """
+    statement = sqlmodel.select(models.SkillChangeCounter.version)
+    version: Optional[int] = session.exec(statement).first()
+    return version or 0
+
+
+def count_skills_by_level(
+    session: sqlmodel.Session, exact: bool = False
+) -> dict[models.LevelOfConfidence, int]:
+    """Counts the skills with each level of confidence.
+
+    Args:
+        session: The database session.
+        exact: Whether to group the skill table, an index-only scan of the
+            level of confidence index, instead of reading the counters
+            maintained by triggers.
+
+    Returns:
+        The number of skills per level, levels without skills map to 0.
+    """
+    counts = dict.fromkeys(models.LevelOfConfidence, 0)
+    if exact:
+        level = sqlmodel.col(models.Skill.level_of_confidence)
+        statement = sqlmodel.select(level, sqlmodel.func.count()).group_by(level)
+        counts.update(session.exec(statement).all())
+    else:
+        for level_count in session.exec(sqlmodel.select(models.SkillLevelCount)):
+            counts[level_count.level_of_confidence] = level_count.total
+    log_config.hot_path("INFO", "Operation 'count_skills_by_level' ended successfully")
+    return counts
+
+
+def get_skill_stats(
+    session: sqlmodel.Session, exact: bool = False
+) -> models.SkillStats:
+    """Gets the distribution of the skills by level of confidence.
+
+    Args:
+        session: The database session.
+        exact: Whether to count the skill table instead of reading the
+            maintained counters.
+
+    Returns:
+        The total number of skills and the number per level.
+    """
+    counts = count_skills_by_level(session=session, exact=exact)
+    return models.SkillStats(total=sum(counts.values()), by_level_of_confidence=counts)
+
+
+def create_skills(
+    session: sqlmodel.Session,
+    skills: Sequence[models.SkillBase],
+    chunk_size: int = 500,
+) -> list[models.SkillCreationResult]:
+    """Adds many skills to the database.
+
+    Each chunk of skills is inserted with a single executemany statement in its
+    own transaction, so a big batch doesn't hold the write lock for long.
+    The skills whose name already exists, in the database or earlier in the
+    batch, are reported as conflicts.
+
+    Args:
+        session: The database session.
+        skills: The skills to add.
+        chunk_size: The number of skills inserted per transaction.
+
+    Returns:
+        The outcome for each skill, in the same order as the skills.
+    """
+    results: list[models.SkillCreationResult] = []
+    statement = (
+        sqlite.insert(models.Skill)
+        .on_conflict_do_nothing(index_elements=["skill_name"])
+        .returning(
+            sqlmodel.col(models.Skill.skill_id), sqlmodel.col(models.Skill.skill_name)
+        )
+    )
+    for start in range(0, len(skills), chunk_size):
+        chunk = skills[start : start + chunk_size]
+        rows = session.execute(statement, [skill.model_dump() for skill in chunk])
+        created = {skill_name: skill_id for skill_id, skill_name in rows}
         session.commit()
-        session.refresh(skill_db)
-        logger.info(f"Skill {skill.skill_name} created successfully")
-    except exc.IntegrityError:
-        logger.error(f"Skill {skill.skill_name} already exist")
-        session.rollback()
+        _invalidate_skill_keys(created)
+        for skill in chunk:
+            skill_id = created.pop(skill.skill_name, None)
+            results.append(
+                models.SkillCreationResult(
+                    skill_name=skill.skill_name,
+                    status=models.CreationStatus.CONFLICT
+                    if skill_id is None
+                    else models.CreationStatus.CREATED,
+                    skill_id=skill_id,
+                )
+            )
+    logger.info("{} skills processed in batch", len(skills))
+    return results
+
+
+def _sort_columns(sort_by: pagination.SortField) -> list[sqlalchemy.Column[Any]]:
+    # The level of confidence isn't unique, the names break its ties; the
+    # composite index on both columns returns the rows in that order.
+    columns = sqlalchemy.inspect(models.Skill).columns
+    if sort_by is pagination.SortField.LEVEL_OF_CONFIDENCE:
+        return [columns["level_of_confidence"], columns["skill_name"]]
+    return [columns[sort_by.value]]
+
+
+def _sort_and_filter(
+    statement: _SelectT,
+    sort_by: pagination.SortField,
+    order: pagination.SortOrder,
+    level: Optional[models.LevelOfConfidence],
+) -> _SelectT:
+    statement = statement.order_by(
+        *(
+            column.desc() if order is pagination.SortOrder.DESC else column
+            for column in _sort_columns(sort_by)
+        )
+    )
+    if level is not None:
+        statement = statement.where(
+            sqlmodel.col(models.Skill.level_of_confidence) == level
+        )
+    return statement
+
+
+def _after_cursor(
+    statement: _SelectT,
+    cursor: str,
+    sort_by: pagination.SortField,
+    order: pagination.SortOrder,
+) -> _SelectT:
+    key = pagination.decode_cursor(cursor=cursor, sort_by=sort_by, order=order)
+    columns = _sort_columns(sort_by)
+    if isinstance(key, tuple):
+        level_name, skill_name = key
+        if level_name not in models.LevelOfConfidence.__members__:
+            msg = "Malformed cursor"
+            raise pagination.InvalidCursorError(msg)
+        sort_key: Any = sqlalchemy.tuple_(*columns)
+        key_value: Any = (models.LevelOfConfidence[level_name], skill_name)
+    else:
+        (sort_key,) = columns
+        key_value = key
+    return statement.where(
+        sort_key < key_value
+        if order is pagination.SortOrder.DESC
+        else sort_key > key_value
+    )
+
 
+def _field_columns(
+    fields: Sequence[models.SkillField],
+) -> list[sqlalchemy.Column[Any]]:
+    columns = sqlalchemy.inspect(models.Skill).columns
+    return [columns[field.value] for field in fields]
 
-def get_skills(
-    session: sqlmodel.Session, offset: int = 0, limit: int = 15
-) -> Tuple[Sequence[models.Skill], int]:
-    statement = sqlmodel.select(models.Skill).offset(offset).limit(limit)
-    results = session.exec(statement)
+
+def _skill_columns(
+    fields: Sequence[models.SkillField], sort_by: pagination.SortField
+) -> list[sqlalchemy.Column[Any]]:
+    # The requested columns come first, then the sort columns that weren't
+    # requested, the cursor of the next page is made of them.
+    requested = [field.value for field in fields]
+    return _field_columns(fields) + [
+        column for column in _sort_columns(sort_by) if column.key not in requested
+    ]
+
+
+def skill_cursor(
+    skill: SkillRecord,
+    sort_by: pagination.SortField,
+    order: pagination.SortOrder = pagination.SortOrder.ASC,
+) -> str:
+    """Creates the cursor of the page that follows a skill.
+
+    Args:
+        skill: The last skill of a page, or its row with the sort columns.
+        sort_by: The column the page is sorted by.
+        order: The direction of the sort.
+
+    Returns:
+        The opaque cursor.
+    """
+    key: pagination.CursorKey
+    if sort_by is pagination.SortField.LEVEL_OF_CONFIDENCE:
+        key = (skill.level_of_confidence.name, skill.skill_name)
+    else:
+        key = getattr(skill, sort_by.value)
+    return pagination.encode_cursor(sort_by=sort_by, key=key, order=order)
+
+
+def get_skills(  # noqa: PLR0913
+    session: sqlmodel.Session,
+    offset: int = 0,
+    limit: int = 15,
+    sort_by: pagination.SortField = pagination.SortField.SKILL_ID,
+    total: pagination.TotalCountMode = pagination.TotalCountMode.CACHED,
+    *,
+    order: pagination.SortOrder = pagination.SortOrder.ASC,
+    level: Optional[models.LevelOfConfidence] = None,
+) -> Tuple[Sequence[models.Skill], Optional[int]]:
+    statement = _sort_and_filter(
+        sqlmodel.select(models.Skill), sort_by=sort_by, order=order, level=level
+    )
+    results = session.exec(statement.offset(offset).limit(limit))
     skills = results.all()
-    count_statement = sqlmodel.select(expression.func.count()).select_from(models.Skill)
-    count_results = session.exec(count_statement)
-    count = count_results.one()
-    logger.info("Operation 'get_skills' ended successfully")
+    count = count_skills(session=session, mode=total, level=level)
+    log_config.hot_path("INFO", "Operation 'get_skills' ended successfully")
     return skills, count
 
 
-def delete_skill(session: sqlmodel.Session, skill: Optional[models.Skill]) -> None:
-    if skill:
-        session.delete(skill)
-        session.commit()
-        logger.info(f"Skill {skill.skill_name} deleted successfully")
+def get_skill_rows(  # noqa: PLR0913
+    session: sqlmodel.Session,
+    fields: Sequence[models.SkillField],
+    offset: int = 0,
+    limit: int = 15,
+    sort_by: pagination.SortField = pagination.SortField.SKILL_ID,
+    *,
+    total: pagination.TotalCountMode = pagination.TotalCountMode.CACHED,
+    order: pagination.SortOrder = pagination.SortOrder.ASC,
+    level: Optional[models.LevelOfConfidence] = None,
+) -> Tuple[Sequence[sqlalchemy.Row[Any]], Optional[int]]:
+    """Gets a page of skills as rows of some of their columns.
 
+    Unlike `get_skills`, only the requested columns are selected and the rows
+    aren't turned into ORM objects tracked by the session.
 
-def _update_skill_name(
-    session: sqlmodel.Session, skill: Optional[models.Skill], new_name: str
-) -> None:
-    if skill:
-        logger.info(f"Changing the name of {skill.skill_name} to {new_name}")
-        skill.skill_name = new_name
-        session.add(skill)
-        session.commit()
-        session.refresh(skill)
-        logger.info("Skill name changed successfully")
+    Args:
+        session: The database session.
+        fields: The columns to select.
+        offset: The number of skills skipped.
+        limit: The maximum number of skills in the page.
+        sort_by: The column used to sort the skills.
+        total: How the number of skills is counted.
+        order: The direction of the sort.
+        level: Only list the skills with this level of confidence.
 
+    Returns:
+        The rows, the requested columns followed by the sort columns that
+        weren't requested, and the number of skills.
+    """
+    statement = _sort_and_filter(
+        sqlalchemy.select(*_skill_columns(fields, sort_by)),
+        sort_by=sort_by,
+        order=order,
+        level=level,
+    )
+    rows = session.execute(statement.offset(offset).limit(limit)).all()
+    count = count_skills(session=session, mode=total, level=level)
+    log_config.hot_path("INFO", "Operation 'get_skill_rows' ended successfully")
+    return rows, count
+
+
+def iter_skills(
+    session: sqlmodel.Session, batch_size: int = 1000
+) -> Iterator[Sequence[sqlalchemy.Row[Tuple[int, str, models.LevelOfConfidence]]]]:
+    """Iterates over all the skills, ordered by id, in batches.
 
-def _update_skill_level_of_confidence(
+    The rows are fetched through a server-side cursor, so only one batch is
+    held in memory at a time. Nothing is queried until the first batch is
+    requested.
+
+    Args:
+        session: The database session.
+        batch_size: The number of rows fetched at a time.
+
+    Yields:
+        The rows of a batch: skill_id, skill_name and level_of_confidence.
+    """
+    statement = (
+        sqlalchemy.select(*sqlalchemy.inspect(models.Skill).columns)
+        .order_by(sqlmodel.col(models.Skill.skill_id))
+        .execution_options(yield_per=batch_size)
+    )
+    yield from session.execute(statement).partitions()
+    log_config.hot_path("INFO", "Operation 'iter_skills' ended successfully")
+
+
+def get_skills_page(  # noqa: PLR0913
     session: sqlmodel.Session,
-    skill: Optional[models.Skill],
-    new_level: models.LevelOfConfidence,
-) -> None:
-    if skill:
-        logger.info(f"Changing the level of {skill.skill_name} to {new_level}")
-        skill.level_of_confidence = new_level
-        session.add(skill)
-        session.commit()
-        session.refresh(skill)
-        logger.info("Skill level changed successfully")
+    cursor: Optional[str] = None,
+    limit: int = 15,
+    sort_by: pagination.SortField = pagination.SortField.SKILL_ID,
+    *,
+    order: pagination.SortOrder = pagination.SortOrder.ASC,
+    level: Optional[models.LevelOfConfidence] = None,
+) -> Tuple[Sequence[models.Skill], Optional[str]]:
+    """Gets a page of skills using keyset pagination.
+
+    Args:
+        session: The database session.
+        cursor: The cursor returned with the previous page, None for the first one.
+        limit: The maximum number of skills in the page.
+        sort_by: The column used to sort the skills.
+        order: The direction of the sort.
+        level: Only list the skills with this level of confidence.
 
+    Returns:
+        The skills in the page and the cursor of the next page, which is None
+        when there are no more skills.
 
-def update_skill_if_changed(
+    Raises:
+        InvalidCursorError: If the cursor can't be decoded.
+    """
+    statement = _sort_and_filter(
+        sqlmodel.select(models.Skill), sort_by=sort_by, order=order, level=level
+    )
+    if cursor is not None:
+        statement = _after_cursor(statement, cursor, sort_by=sort_by, order=order)
+    results = session.exec(statement.limit(limit + 1))
+    skills = results.all()
+    next_cursor: Optional[str] = None
+    if len(skills) > limit:
+        skills = skills[:limit]
+        if skills:
+            next_cursor = skill_cursor(skills[-1], sort_by=sort_by, order=order)
+    log_config.hot_path("INFO", "Operation 'get_skills_page' ended successfully")
+    return skills, next_cursor
+
+
+def get_skill_rows_page(  # noqa: PLR0913
     session: sqlmodel.Session,
-    skill: models.Skill,
-    skill_name: str,
-    skill_level: models.LevelOfConfidence,
-) -> None:
-    if skill is None:
-        logger.warning("The skill doesn't exist")
-    else:
-        if skill.skill_name != skill_name:
-            _update_skill_name(session=session, skill=skill, new_name=skill_name)
-        if skill.level_of_confidence != skill_level:
-            _update_skill_level_of_confidence(
-                session=session, skill=skill, new_level=skill_level
+    fields: Sequence[models.SkillField],
+    cursor: Optional[str] = None,
+    limit: int = 15,
+    sort_by: pagination.SortField = pagination.SortField.SKILL_ID,
+    *,
+    order: pagination.SortOrder = pagination.SortOrder.ASC,
+    level: Optional[models.LevelOfConfidence] = None,
+) -> Tuple[Sequence[sqlalchemy.Row[Any]], Optional[str]]:
+    """Gets a page of skills as rows of some of their columns, by keyset.
+
+    Args:
+        session: The database session.
+        fields: The columns to select.
+        cursor: The cursor returned with the previous page, None for the first one.
+        limit: The maximum number of skills in the page.
+        sort_by: The column used to sort the skills.
+        order: The direction of the sort.
+        level: Only list the skills with this level of confidence.
+
+    Returns:
+        The rows, the requested columns followed by the sort columns that
+        weren't requested, and the cursor of the next page, which is None
+        when there are no more skills.
+
+    Raises:
+        InvalidCursorError: If the cursor can't be decoded.
+    """
+    statement = _sort_and_filter(
+        sqlalchemy.select(*_skill_columns(fields, sort_by)),
+        sort_by=sort_by,
+        order=order,
+        level=level,
+    )
+    if cursor is not None:
+        statement = _after_cursor(statement, cursor, sort_by=sort_by, order=order)
+    rows = session.execute(statement.limit(limit + 1)).all()
+    next_cursor: Optional[str] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if rows:
+            next_cursor = skill_cursor(rows[-1], sort_by=sort_by, order=order)
+    log_config.hot_path("INFO", "Operation 'get_skill_rows_page' ended successfully")
+    return rows, next_cursor
+
+
+def _fts_query(query: str) -> Optional[str]:
+    # Every word of the query has to prefix a word of the name. The words are
+    # quoted, so nothing typed by the user is read as FTS5 syntax.
+    terms = re.findall(r"[^\W_]+", query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _search(
+    session: sqlmodel.Session,
+    columns: Sequence[Any],
+    query: str,
+    cursor: Optional[str],
+    limit: int,
+) -> Tuple[Sequence[sqlalchemy.Row[Any]], Optional[str]]:
+    match = _fts_query(query)
+    if match is None:
+        return [], None
+    rank = sqlalchemy.func.bm25(sqlalchemy.literal_column("skill_fts"))
+    skill_id = sqlmodel.col(models.Skill.skill_id)
+    # The rank and id of the matches come last, the cursor is made of them.
+    statement = (
+        sqlalchemy.select(*columns, skill_id.label("match_id"), rank.label("rank"))
+        .join(models.skill_fts, models.skill_fts.c.rowid == skill_id)
+        .where(models.skill_fts.c.skill_fts.match(match))
+        .order_by(rank, skill_id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        last_rank, last_skill_id = pagination.decode_search_cursor(cursor)
+        statement = statement.where(
+            sqlalchemy.tuple_(rank, skill_id)
+            > sqlalchemy.tuple_(
+                sqlalchemy.literal(last_rank), sqlalchemy.literal(last_skill_id)
+            )
+        )
+    rows = session.execute(statement).all()
+    next_cursor: Optional[str] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if rows:
+            next_cursor = pagination.encode_search_cursor(
+                rank=rows[-1].rank, skill_id=rows[-1].match_id
             )
+    return rows, next_cursor
+
+
+def search_skills(
+    session: sqlmodel.Session,
+    query: str,
+    cursor: Optional[str] = None,
+    limit: int = 15,
+) -> Tuple[Sequence[models.Skill], Optional[str]]:
+    """Searches the skills whose name has words starting with the query words.
+
+    The matches come from the FTS5 index of the names, best ranked first,
+    and are paginated by keyset on their rank.
+
+    Args:
+        session: The database session.
+        query: The words to look for, case insensitive.
+        cursor: The cursor returned with the previous page, None for the first one.
+        limit: The maximum number of skills in the page.
+
+    Returns:
+        The skills in the page and the cursor of the next page, which is None
+        when there are no more matches.
+
+    Raises:
+        InvalidCursorError: If the cursor can't be decoded.
+    """
+    rows, next_cursor = _search(
+        session, [models.Skill], query=query, cursor=cursor, limit=limit
+    )
+    log_config.hot_path("INFO", "Operation 'search_skills' ended successfully")
+    return [row[0] for row in rows], next_cursor
+
+
+def search_skill_rows(
+    session: sqlmodel.Session,
+    fields: Sequence[models.SkillField],
+    query: str,
+    cursor: Optional[str] = None,
+    limit: int = 15,
+) -> Tuple[Sequence[sqlalchemy.Row[Any]], Optional[str]]:
+    """Searches the skills like `search_skills`, as rows of some columns.
+
+    Args:
+        session: The database session.
+        fields: The columns to select.
+        query: The words to look for, case insensitive.
+        cursor: The cursor returned with the previous page, None for the first one.
+        limit: The maximum number of skills in the page.
+
+    Returns:
+        The rows, the requested columns followed by the id and rank of the
+        match, and the cursor of the next page, which is None when there
+        are no more matches.
+
+    Raises:
+        InvalidCursorError: If the cursor can't be decoded.
+    """
+    rows, next_cursor = _search(
+        session,
+        _field_columns(fields),
+        query=query,
+        cursor=cursor,
+        limit=limit,
+    )
+    log_config.hot_path("INFO", "Operation 'search_skill_rows' ended successfully")
+    return rows, next_cursor
+
+
+def update_skill(
+    session: sqlmodel.Session, skill_id: int, skill: models.SkillUpdate
+) -> Optional[models.Skill]:
+    """Updates the fields sent of a skill with a single UPDATE ... RETURNING.
+
+    Args:
+        session: The database session.
+        skill_id: The id of the skill to update.
+        skill: The fields to change, the unset ones are left untouched.
+
+    Returns:
+        The updated skill, None if it doesn't exist.
+
+    Raises:
+        IntegrityError: If the new name belongs to another skill.
+    """
+    changes = skill.model_dump(exclude_unset=True, exclude_none=True)
+    if not changes:
+        return get_skill_by_id(session=session, skill_id=skill_id)
+    statement = (
+        sqlalchemy.update(models.Skill)
+        .where(sqlmodel.col(models.Skill.skill_id) == skill_id)
+        .values(**changes)
+        .returning(*sqlalchemy.inspect(models.Skill).columns)
+    )
+    try:
+        row = session.execute(statement).one_or_none()
+        session.commit()
+        _invalidate_skill(skill_id=skill_id, skill_name=skill.skill_name)
+    except exc.IntegrityError:
+        logger.error("Skill {} already exist", skill.skill_name)
+        session.rollback()
+        raise
+    if row is None:
+        log_config.hot_path(
+            "WARNING", "The skill with id {} doesn't exists", skill_id, depth=1
+        )
+        return None
+    logger.info("Skill {} updated successfully", skill_id)
+    return models.Skill(**row._asdict())
+
+
+def delete_skill(session: sqlmodel.Session, skill: Optional[models.Skill]) -> None:
+    if skill:
+        session.delete(skill)
+        session.commit()
+        _invalidate_skill(skill_id=skill.skill_id, skill_name=skill.skill_name)
+        logger.info("Skill {} deleted successfully", skill.skill_name)
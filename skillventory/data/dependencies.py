@@ -1,11 +1,18 @@
 """Defines the dependencies used."""
 
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import Annotated, Optional, Union
 
+import fastapi
 import sqlmodel
+from sqlalchemy.ext import asyncio as sa_asyncio
+from sqlmodel.ext.asyncio import session as sm_asyncio
 
 from skillventory.database import config
 
+AnySession = Union[sqlmodel.Session, sm_asyncio.AsyncSession]
+SessionFactory = Callable[[], AnySession]
+
 
 def get_db_session() -> Iterator[sqlmodel.Session]:
     """Gets a database session object.
@@ -13,5 +20,111 @@ def get_db_session() -> Iterator[sqlmodel.Session]:
     Yields:
         session The database session.
     """
-    with sqlmodel.Session(config.engine) as session:
+    with sqlmodel.Session(config.get_engine()) as session:
+        yield session
+
+
+def get_read_db_session() -> Iterator[sqlmodel.Session]:
+    """Gets a database session object on the read engine.
+
+    Yields:
+        session The read-only database session.
+    """
+    with sqlmodel.Session(config.get_read_engine()) as session:
+        yield session
+
+
+def _get_async_engine(
+    engine: Optional[sa_asyncio.AsyncEngine],
+) -> sa_asyncio.AsyncEngine:
+    if engine is None:
+        msg = "The async engines are only created when ASYNC_MODE is enabled"
+        raise RuntimeError(msg)
+    return engine
+
+
+async def get_async_db_session() -> AsyncIterator[sm_asyncio.AsyncSession]:
+    """Gets an async database session object.
+
+    Yields:
+        session The async database session.
+
+    Raises:
+        RuntimeError: If the async mode isn't enabled.
+    """
+    engine = _get_async_engine(config.get_async_engine())
+    async with sm_asyncio.AsyncSession(engine) as session:
         yield session
+
+
+async def get_async_read_db_session() -> AsyncIterator[sm_asyncio.AsyncSession]:
+    """Gets an async database session object on the read engine.
+
+    Yields:
+        session The read-only async database session.
+
+    Raises:
+        RuntimeError: If the async mode isn't enabled.
+    """
+    engine = _get_async_engine(config.get_async_read_engine())
+    async with sm_asyncio.AsyncSession(engine) as session:
+        yield session
+
+
+def get_read_session_factory() -> SessionFactory:
+    """Gets a factory of sessions on the read engine.
+
+    The sessions yielded by the dependencies are closed before the body of
+    a streaming response is sent, so the streaming routes open their own.
+
+    Returns:
+        A callable creating a new, unopened, session.
+
+    Raises:
+        RuntimeError: If the async mode is enabled but its engines are missing.
+    """
+    if config.db_settings.ASYNC_MODE:
+        engine = _get_async_engine(config.get_async_read_engine())
+        return lambda: sm_asyncio.AsyncSession(engine)
+    return lambda: sqlmodel.Session(config.get_read_engine())
+
+
+def get_job_session_factory() -> Callable[[], sqlmodel.Session]:
+    """Gets a factory of sessions on the write engine for the background jobs.
+
+    The jobs run on a worker thread after the response is sent, so their
+    sessions are sync whatever the mode, and opened by the job itself.
+
+    Returns:
+        A callable creating a new, unopened, session.
+    """
+    return lambda: sqlmodel.Session(config.get_engine())
+
+
+# Session for the routes that write to the database.
+DBSession = Annotated[
+    AnySession,
+    fastapi.Depends(
+        get_async_db_session if config.db_settings.ASYNC_MODE else get_db_session
+    ),
+]
+
+# Session for the routes that only read, they never wait on the writers' pool.
+ReadDBSession = Annotated[
+    AnySession,
+    fastapi.Depends(
+        get_async_read_db_session
+        if config.db_settings.ASYNC_MODE
+        else get_read_db_session
+    ),
+]
+
+# Sessions for the routes that stream their response.
+ReadSessionFactory = Annotated[
+    SessionFactory, fastapi.Depends(get_read_session_factory)
+]
+
+# Sessions for the background jobs that write.
+JobSessionFactory = Annotated[
+    Callable[[], sqlmodel.Session], fastapi.Depends(get_job_session_factory)
+]
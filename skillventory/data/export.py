@@ -0,0 +1,119 @@
+"""Streaming export of the whole skill inventory.
+
+The rows are read in batches through a server-side cursor and each batch is
+encoded as soon as it is fetched, so memory stays flat whatever the size of
+the table and the first bytes are sent before the last rows are read.
+"""
+
+import csv
+import enum
+import io
+import json
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Optional
+
+import sqlalchemy
+from sqlmodel.ext.asyncio import session as sm_asyncio
+from starlette import concurrency
+
+from skillventory.data import crud
+from skillventory.data import dependencies as deps
+
+COLUMNS = ("skill_id", "skill_name", "level_of_confidence")
+
+
+class ExportFormat(enum.StrEnum):
+    """Formats in which the skills can be exported."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """The media type of the format."""
+        if self is ExportFormat.CSV:
+            return "text/csv; charset=utf-8"
+        return "application/x-ndjson"
+
+
+def _values(row: sqlalchemy.Row[Any]) -> tuple[int, str, str]:
+    skill_id, skill_name, level_of_confidence = row
+    return skill_id, skill_name, level_of_confidence.value
+
+
+def encode_ndjson(rows: Sequence[sqlalchemy.Row[Any]]) -> bytes:
+    """Encodes a batch of skills as JSON lines.
+
+    Args:
+        rows: The rows of the skills.
+
+    Returns:
+        One JSON object per skill, each followed by a newline.
+    """
+    return "".join(
+        json.dumps(dict(zip(COLUMNS, _values(row), strict=True)), ensure_ascii=False)
+        + "\n"
+        for row in rows
+    ).encode()
+
+
+def encode_csv(rows: Sequence[sqlalchemy.Row[Any]]) -> bytes:
+    """Encodes a batch of skills as CSV records, without header.
+
+    Args:
+        rows: The rows of the skills.
+
+    Returns:
+        One CSV record per skill.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(_values(row) for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def _next_batch(
+    session: deps.AnySession,
+    batches: Iterator[Sequence[sqlalchemy.Row[Any]]],
+) -> Optional[Sequence[sqlalchemy.Row[Any]]]:
+    # Every fetch runs off the event loop, like the CRUD functions do.
+    if isinstance(session, sm_asyncio.AsyncSession):
+        return await session.run_sync(lambda _: next(batches, None))
+    return await concurrency.run_in_threadpool(next, batches, None)
+
+
+async def stream_skills(
+    session_factory: deps.SessionFactory,
+    export_format: ExportFormat,
+    batch_size: int = 1000,
+) -> AsyncIterator[bytes]:
+    """Streams all the skills, ordered by id, in an export format.
+
+    The session is opened when the iteration starts and closed when it ends,
+    or when it is interrupted because the client went away.
+
+    Args:
+        session_factory: Creates the session used to read the skills.
+        export_format: The format of the export.
+        batch_size: The number of rows fetched and encoded at a time.
+
+    Yields:
+        The encoded chunks, a CSV export starts with its header.
+    """
+    encode = encode_csv if export_format is ExportFormat.CSV else encode_ndjson
+    if export_format is ExportFormat.CSV:
+        yield (",".join(COLUMNS) + "\r\n").encode()
+    session = session_factory()
+    sync_session = (
+        session.sync_session
+        if isinstance(session, sm_asyncio.AsyncSession)
+        else session
+    )
+    try:
+        batches = crud.iter_skills(session=sync_session, batch_size=batch_size)
+        while (batch := await _next_batch(session, batches)) is not None:
+            yield encode(batch)
+    finally:
+        if isinstance(session, sm_asyncio.AsyncSession):
+            await session.close()
+        else:
+            await concurrency.run_in_threadpool(session.close)
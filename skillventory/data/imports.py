@@ -0,0 +1,223 @@
+"""Background import of skills from NDJSON or CSV files.
+
+The upload is copied to a temporary file in chunks and the import runs after
+the response is sent: the file is parsed one line at a time, the rows are
+validated and inserted in batches, one transaction per batch, and the
+progress of the job is published to a registry the status route reads.
+"""
+
+import collections
+import csv
+import datetime
+import itertools
+import pathlib
+import tempfile
+import threading
+import uuid
+from collections.abc import Callable, Iterator
+from typing import Any, Optional, Union
+
+import fastapi
+import pydantic
+import sqlmodel
+from loguru import logger
+from starlette import concurrency
+
+from skillventory.data import crud, export
+from skillventory.models import models
+
+ImportFormat = export.ExportFormat
+
+# Errors reported in the status of a job, the rest are only counted.
+MAX_REPORTED_ERRORS = 100
+# Jobs kept in the registry, the oldest finished ones are forgotten first.
+MAX_KEPT_JOBS = 100
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ImportJobRegistry:
+    """Thread-safe registry of the import jobs of this process.
+
+    The jobs are stored as copies, so the status route never sees a job
+    while the worker thread is updating it.
+
+    Args:
+        max_jobs: Maximum number of jobs kept.
+    """
+
+    def __init__(self, max_jobs: int = MAX_KEPT_JOBS) -> None:
+        self.max_jobs = max_jobs
+        self._jobs: collections.OrderedDict[str, models.ImportJob] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def create(self) -> models.ImportJob:
+        """Registers a new pending job.
+
+        Returns:
+            The job, with a new random id.
+        """
+        job = models.ImportJob(job_id=uuid.uuid4().hex)
+        self.save(job)
+        return job
+
+    def save(self, job: models.ImportJob) -> None:
+        """Publishes the current state of a job.
+
+        Args:
+            job: The job to store.
+        """
+        with self._lock:
+            self._jobs[job.job_id] = job.model_copy(deep=True)
+            if len(self._jobs) > self.max_jobs:
+                for job_id, kept_job in list(self._jobs.items()):
+                    if kept_job.finished_at is not None:
+                        del self._jobs[job_id]
+                        break
+
+    def get(self, job_id: str) -> Optional[models.ImportJob]:
+        """Gets the last published state of a job.
+
+        Args:
+            job_id: The id of the job.
+
+        Returns:
+            A copy of the job, None if it doesn't exist or was forgotten.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else job.model_copy(deep=True)
+
+
+async def save_upload(upload: fastapi.UploadFile) -> pathlib.Path:
+    """Copies an upload to a temporary file, one chunk at a time.
+
+    Args:
+        upload: The uploaded file.
+
+    Returns:
+        The path of the copy, the caller has to delete it.
+    """
+    with tempfile.NamedTemporaryFile(
+        prefix="skillventory-import-", delete=False
+    ) as file:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            await concurrency.run_in_threadpool(file.write, chunk)
+    return pathlib.Path(file.name)
+
+
+def iter_records(
+    path: pathlib.Path, import_format: ImportFormat
+) -> Iterator[tuple[int, Union[str, dict[str, Any]]]]:
+    """Iterates over the records of a file without reading it whole.
+
+    Args:
+        path: The path of the file.
+        import_format: The format of the file. A CSV file needs a header row
+            with the skill_name and level_of_confidence columns.
+
+    Yields:
+        The line number of each record and the record: the raw JSON line
+        for NDJSON, the row mapped by the header for CSV. NDJSON blank lines
+        are skipped.
+    """
+    with path.open(encoding="utf-8-sig", newline="") as file:
+        if import_format is ImportFormat.CSV:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(file, start=1):
+            if line.strip():
+                yield line_number, line
+
+
+def _validate(record: Union[str, dict[str, Any]]) -> models.SkillBase:
+    if isinstance(record, str):
+        return models.SkillBase.model_validate_json(record)
+    return models.SkillBase.model_validate(record)
+
+
+def _describe(error: pydantic.ValidationError) -> str:
+    return "; ".join(
+        ".".join(str(part) for part in detail["loc"]) + f": {detail['msg']}"
+        if detail["loc"]
+        else detail["msg"]
+        for detail in error.errors()
+    )
+
+
+def _import_batch(
+    session: sqlmodel.Session,
+    job: models.ImportJob,
+    batch: list[tuple[int, Union[str, dict[str, Any]]]],
+    chunk_size: int,
+) -> None:
+    skills: list[models.SkillBase] = []
+    for line, record in batch:
+        try:
+            skills.append(_validate(record))
+        except pydantic.ValidationError as error:
+            job.rows_invalid += 1
+            if len(job.errors) < MAX_REPORTED_ERRORS:
+                job.errors.append(
+                    models.ImportRowError(line=line, message=_describe(error))
+                )
+    results = crud.create_skills(session=session, skills=skills, chunk_size=chunk_size)
+    for result in results:
+        if result.status is models.CreationStatus.CREATED:
+            job.rows_created += 1
+        else:
+            job.rows_conflicting += 1
+    job.rows_processed += len(batch)
+
+
+def run_import(
+    job_id: str,
+    path: pathlib.Path,
+    import_format: ImportFormat,
+    session_factory: Callable[[], sqlmodel.Session],
+    chunk_size: int,
+) -> None:
+    """Runs an import job, the existing skills are kept and reported as conflicts.
+
+    The progress is published after every batch and the file is deleted
+    when the job ends, whatever its outcome.
+
+    Args:
+        job_id: The id of the registered job.
+        path: The path of the file to import.
+        import_format: The format of the file.
+        session_factory: Creates the session used to insert the skills.
+        chunk_size: The number of rows validated and inserted per transaction.
+    """
+    job = import_jobs.get(job_id) or models.ImportJob(job_id=job_id)
+    job.status = models.ImportJobStatus.RUNNING
+    job.started_at = datetime.datetime.now(datetime.UTC)
+    import_jobs.save(job)
+    try:
+        with session_factory() as session:
+            records = iter_records(path=path, import_format=import_format)
+            while batch := list(itertools.islice(records, chunk_size)):
+                _import_batch(session, job, batch, chunk_size)
+                import_jobs.save(job)
+        job.status = models.ImportJobStatus.SUCCEEDED
+    except Exception as error:
+        logger.exception("Import job {} failed", job_id)
+        job.status = models.ImportJobStatus.FAILED
+        job.detail = str(error)
+    finally:
+        job.finished_at = datetime.datetime.now(datetime.UTC)
+        import_jobs.save(job)
+        path.unlink(missing_ok=True)
+    logger.info(
+        "Import job {} ended: {} created, {} conflicting, {} invalid",
+        job_id,
+        job.rows_created,
+        job.rows_conflicting,
+        job.rows_invalid,
+    )
+
+
+import_jobs = ImportJobRegistry()
@@ -0,0 +1,176 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token that encodes the sort key of the last
+row of a page. The next page is fetched with an indexed ``WHERE key > ?``
+query, so its cost doesn't depend on how deep into the listing it is.
+The descending listings record their sort field with a leading ``-`` and
+are continued with ``WHERE key < ?`` instead.
+"""
+
+import base64
+import binascii
+import enum
+import json
+from typing import Union
+
+CursorKey = Union[int, str, tuple[str, str]]
+
+# Field recorded in the cursors of the search pages, sorted by relevance.
+SEARCH_CURSOR_FIELD = "rank"
+
+
+class SortField(enum.StrEnum):
+    """Columns that can be used to sort and paginate the skills."""
+
+    SKILL_ID = "skill_id"
+    SKILL_NAME = "skill_name"
+    LEVEL_OF_CONFIDENCE = "level_of_confidence"
+
+
+class SortOrder(enum.StrEnum):
+    """Direction of the sort of the skills."""
+
+    ASC = "asc"
+    DESC = "desc"
+
+
+class TotalCountMode(enum.StrEnum):
+    """How the total number of skills is reported with a page.
+
+    EXACT counts the rows of the skill table, CACHED reads the counters
+    maintained by triggers and NONE doesn't report the total at all.
+    """
+
+    EXACT = "exact"
+    CACHED = "cached"
+    NONE = "none"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor can't be decoded or doesn't match the sort."""
+
+
+def _cursor_field(sort_by: SortField, order: SortOrder) -> str:
+    return f"-{sort_by.value}" if order is SortOrder.DESC else sort_by.value
+
+
+def encode_cursor(
+    sort_by: SortField, key: CursorKey, order: SortOrder = SortOrder.ASC
+) -> str:
+    """Encodes the sort key of the last row of a page into a cursor.
+
+    Args:
+        sort_by: The column the page is sorted by.
+        key: The value of that column in the last row of the page; the name
+            of the level of confidence and the skill name when sorted by level.
+        order: The direction of the sort.
+
+    Returns:
+        The opaque cursor.
+    """
+    payload = json.dumps([_cursor_field(sort_by, order), key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_payload(cursor: str) -> list[object]:
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as error:
+        msg = "Malformed cursor"
+        raise InvalidCursorError(msg) from error
+    if not isinstance(payload, list):
+        msg = "Malformed cursor"
+        raise InvalidCursorError(msg)
+    return payload
+
+
+def decode_cursor(
+    cursor: str, sort_by: SortField, order: SortOrder = SortOrder.ASC
+) -> CursorKey:
+    """Decodes a cursor created by `encode_cursor`.
+
+    Args:
+        cursor: The opaque cursor.
+        sort_by: The column the requested page is sorted by.
+        order: The direction of the sort of the requested page.
+
+    Returns:
+        The key after which the requested page starts.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was created for a
+            different sort.
+    """
+    try:
+        field, key = _decode_payload(cursor)
+    except ValueError as error:
+        msg = "Malformed cursor"
+        raise InvalidCursorError(msg) from error
+    if field != _cursor_field(sort_by, order):
+        msg = f"The cursor was created for a listing sorted by {field}"
+        raise InvalidCursorError(msg)
+    if sort_by is SortField.LEVEL_OF_CONFIDENCE:
+        if (
+            not isinstance(key, list)
+            or len(key) != 2  # noqa: PLR2004
+            or not all(isinstance(part, str) for part in key)
+        ):
+            msg = "Malformed cursor"
+            raise InvalidCursorError(msg)
+        level_name: str = key[0]
+        skill_name: str = key[1]
+        return level_name, skill_name
+    if sort_by is SortField.SKILL_ID:
+        if isinstance(key, int) and not isinstance(key, bool):
+            return key
+    elif isinstance(key, str):
+        return key
+    msg = "Malformed cursor"
+    raise InvalidCursorError(msg)
+
+
+def encode_search_cursor(rank: float, skill_id: int) -> str:
+    """Encodes the position of the last match of a search page into a cursor.
+
+    Args:
+        rank: The rank of the match, lower is better.
+        skill_id: The id of the matched skill, it breaks the ties of rank.
+
+    Returns:
+        The opaque cursor.
+    """
+    payload = json.dumps([SEARCH_CURSOR_FIELD, rank, skill_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    """Decodes a cursor created by `encode_search_cursor`.
+
+    Args:
+        cursor: The opaque cursor.
+
+    Returns:
+        The rank and skill id after which the requested page starts.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or wasn't created by
+            a search.
+    """
+    try:
+        field, rank, skill_id = _decode_payload(cursor)
+    except ValueError as error:
+        msg = "Malformed cursor"
+        raise InvalidCursorError(msg) from error
+    if field != SEARCH_CURSOR_FIELD:
+        msg = f"The cursor was created for a listing sorted by {field}"
+        raise InvalidCursorError(msg)
+    if (
+        not isinstance(rank, (int, float))
+        or not isinstance(skill_id, int)
+        or isinstance(rank, bool)
+        or isinstance(skill_id, bool)
+    ):
+        msg = "Malformed cursor"
+        raise InvalidCursorError(msg)
+    return float(rank), skill_id
@@ -1,8 +1,16 @@
 """Database configuration."""
 
+import functools
+import threading
+from collections.abc import Callable, Iterator
+from typing import Any, Literal, Optional, TypeVar, Union
+
+import pydantic
 import pydantic_settings
+from loguru import logger
 from sqlalchemy import pool
 import sqlalchemy
+from sqlalchemy.ext import asyncio as sa_asyncio
 import sqlmodel
 from sqlmodel import SQLModel
 
@@ -13,6 +21,43 @@ class DBSettings(pydantic_settings.BaseSettings):
     Attributes:
         SQLITE_URL: The URL for the SQLite database. Default is sqlite:///./database.db
         ECHO: True if you want to see all SQL statements printed. Default is False
+        BATCH_CHUNK_SIZE: Number of skills inserted per transaction by the batch
+        operations. Default is 500
+        LOOKUP_CHUNK_SIZE: Number of ids or names per query of the batch
+        lookups, under the limit of SQLite bound parameters. Default is 500
+        ASYNC_MODE: True to serve the requests with async sessions on the event
+        loop instead of sync sessions on the threadpool. Default is False
+        ASYNC_SQLITE_URL: The URL used by the async engine. Default is None, which
+        uses SQLITE_URL with the aiosqlite driver
+        SQLITE_PROFILE: Preset of pragmas applied to every new connection.
+        "default" keeps SQLite defaults, "production" enables WAL. Default is
+        "default"
+        JOURNAL_MODE: PRAGMA journal_mode, overrides the profile. Default is None
+        SYNCHRONOUS: PRAGMA synchronous, overrides the profile. Default is None
+        MMAP_SIZE: PRAGMA mmap_size in bytes, overrides the profile. Default is None
+        CACHE_SIZE: PRAGMA cache_size, pages if positive and KiB if negative,
+        overrides the profile. Default is None
+        TEMP_STORE: PRAGMA temp_store, overrides the profile. Default is None
+        BUSY_TIMEOUT: PRAGMA busy_timeout in milliseconds, overrides the profile.
+        Default is None
+        POOL_SIZE: Connections kept by the pool of the write engine. Default is 5
+        READ_SQLITE_URL: The URL for the read engine. Default is None, which
+        derives a read-only URI (mode=ro) from SQLITE_URL. In-memory databases
+        share the write engine
+        READ_POOL_SIZE: Connections kept by the pool of the read engine.
+        Default is 10
+        SLOW_QUERY_THRESHOLD: Duration in milliseconds above which a statement
+        is recorded with its parameters and query plan. Default is None, which
+        disables the slow query log
+        SLOW_QUERY_BUFFER_SIZE: Number of the latest slow queries kept in
+        memory. Default is 100
+        SLOW_QUERY_LOG_FILE: File the slow queries are also written to.
+        Default is None
+        SLOW_QUERY_LOG_ROTATION: Size or age at which the slow query log file
+        is rotated, as understood by loguru. Default is "10 MB"
+        SLOW_QUERY_ENDPOINT: Whether /admin/slow-queries serves and clears the
+        log, whose entries hold the parameters of the statements. Default is
+        False
         model_config: Configuration for Pydantic models loaded from .env file.
 
     This class defines the database settings by subclassing BaseSettings.
@@ -23,18 +68,285 @@ class DBSettings(pydantic_settings.BaseSettings):
 
     SQLITE_URL: str = "sqlite:///./database.db"
     ECHO: bool = False
+    BATCH_CHUNK_SIZE: int = pydantic.Field(default=500, gt=0)
+    LOOKUP_CHUNK_SIZE: int = pydantic.Field(default=500, gt=0, le=32766)
+    ASYNC_MODE: bool = False
+    ASYNC_SQLITE_URL: Optional[str] = None
+    SQLITE_PROFILE: Literal["default", "production"] = "default"
+    JOURNAL_MODE: Optional[
+        Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"]
+    ] = None
+    SYNCHRONOUS: Optional[Literal["OFF", "NORMAL", "FULL", "EXTRA"]] = None
+    MMAP_SIZE: Optional[int] = None
+    CACHE_SIZE: Optional[int] = None
+    TEMP_STORE: Optional[Literal["DEFAULT", "FILE", "MEMORY"]] = None
+    BUSY_TIMEOUT: Optional[int] = None
+    POOL_SIZE: int = pydantic.Field(default=5, gt=0)
+    READ_SQLITE_URL: Optional[str] = None
+    READ_POOL_SIZE: int = pydantic.Field(default=10, gt=0)
+    SLOW_QUERY_THRESHOLD: Optional[float] = pydantic.Field(default=None, ge=0)
+    SLOW_QUERY_BUFFER_SIZE: int = pydantic.Field(default=100, gt=0)
+    SLOW_QUERY_LOG_FILE: Optional[str] = None
+    SLOW_QUERY_LOG_ROTATION: str = "10 MB"
+    SLOW_QUERY_ENDPOINT: bool = False
 
-    model_config = pydantic_settings.SettingsConfigDict(env_file=".env")
+    model_config = pydantic_settings.SettingsConfigDict(env_file=".env", extra="ignore")
 
+    def pragmas(self) -> dict[str, Union[str, int]]:
+        """Gets the pragmas of the profile merged with the ones set explicitly.
+
+        Returns:
+            The pragmas to apply to every new connection, by name.
+        """
+        pragmas = dict(SQLITE_PROFILES[self.SQLITE_PROFILE])
+        for name in PRAGMA_NAMES:
+            value = getattr(self, name.upper())
+            if value is not None:
+                pragmas[name] = value
+        return pragmas
 
-db_settings = DBSettings()
 
-engine: sqlalchemy.Engine = sqlmodel.create_engine(
-    url=db_settings.SQLITE_URL,
-    echo=db_settings.ECHO,
-    connect_args={"check_same_thread": False},
+PRAGMA_NAMES = (
+    "journal_mode",
+    "synchronous",
+    "mmap_size",
+    "cache_size",
+    "temp_store",
+    "busy_timeout",
 )
 
+SQLITE_PROFILES: dict[str, dict[str, Union[str, int]]] = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+
+def apply_pragmas(
+    engine: sqlalchemy.Engine, pragmas: dict[str, Union[str, int]]
+) -> None:
+    """Applies the pragmas to every new connection of the engine.
+
+    Args:
+        engine: The engine whose connections are configured. For an async
+            engine, its sync_engine.
+        pragmas: The pragmas to apply, by name.
+    """
+    if not pragmas:
+        return
+
+    def set_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            # The values are validated by DBSettings, pragmas can't be bound.
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    sqlalchemy.event.listen(engine, "connect", set_pragmas)
+
+
+def get_pragmas(engine: sqlalchemy.Engine) -> dict[str, Any]:
+    """Reads the pragmas in effect on a connection of the engine.
+
+    Args:
+        engine: The engine to inspect.
+
+    Returns:
+        The value of each tunable pragma, by name.
+    """
+    with engine.connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in PRAGMA_NAMES
+        }
+
+
+def report_pragmas() -> None:
+    """Logs the pragmas in effect on the application's database."""
+    logger.info(
+        "SQLite profile '{}' in effect: {}",
+        db_settings.SQLITE_PROFILE,
+        get_pragmas(get_engine()),
+    )
+
+
+def read_only_url(url: Union[str, sqlalchemy.URL]) -> Optional[sqlalchemy.URL]:
+    """Derives a read-only URI (mode=ro) from the URL of a SQLite file database.
+
+    Args:
+        url: The URL of the database.
+
+    Returns:
+        The read-only URL, None for in-memory databases and non pysqlite or
+        aiosqlite drivers, which then share their engine for reads and writes.
+    """
+    sa_url = sqlalchemy.make_url(url)
+    if sa_url.get_driver_name() not in {"pysqlite", "aiosqlite"}:
+        return None
+    database = sa_url.database
+    if not database or database == ":memory:" or "memory" in sa_url.query.values():
+        return None
+    if not database.startswith("file:"):
+        database = f"file:{database}"
+    return sa_url.set(database=database).update_query_dict({
+        "mode": "ro",
+        "uri": "true",
+    })
+
+
+def _engine_args(url: Union[str, sqlalchemy.URL], pool_size: int) -> dict[str, Any]:
+    args: dict[str, Any] = {
+        "url": url,
+        "echo": db_settings.ECHO,
+        "connect_args": {"check_same_thread": False},
+    }
+    if read_only_url(url) is not None:
+        args["pool_size"] = pool_size
+    return args
+
+
+db_settings = DBSettings()
+
+_F = TypeVar("_F", bound=Callable[[], Any])
+_lock = threading.RLock()
+# Values of the builders decorated with _lazy, by name, once they have run.
+_built: dict[str, Any] = {}
+
+
+def _lazy(build: _F) -> _F:
+    """Runs a builder once, on its first call, and returns its value after."""
+
+    @functools.wraps(build)
+    def get() -> Any:
+        if build.__name__ not in _built:
+            with _lock:
+                if build.__name__ not in _built:
+                    _built[build.__name__] = build()
+        return _built[build.__name__]
+
+    return get  # type: ignore[return-value]
+
+
+def _read_pragmas() -> dict[str, Union[str, int]]:
+    # The journal mode is persistent and can't be changed from a read-only
+    # connection.
+    return {
+        name: value
+        for name, value in db_settings.pragmas().items()
+        if name != "journal_mode"
+    }
+
+
+@_lazy
+def get_engine() -> sqlalchemy.Engine:
+    """Gets the engine used for writes, created on the first call.
+
+    Returns:
+        The write engine.
+    """
+    engine = sqlmodel.create_engine(
+        **_engine_args(db_settings.SQLITE_URL, db_settings.POOL_SIZE)
+    )
+    apply_pragmas(engine, db_settings.pragmas())
+    return engine
+
+
+@_lazy
+def get_read_engine() -> sqlalchemy.Engine:
+    """Gets the engine used for reads, created on the first call.
+
+    Returns:
+        A read-only engine, or the write one for the in-memory databases.
+    """
+    read_url = read_only_url(db_settings.READ_SQLITE_URL or db_settings.SQLITE_URL)
+    if read_url is None:
+        return get_engine()
+    read_engine = sqlmodel.create_engine(
+        **_engine_args(read_url, db_settings.READ_POOL_SIZE)
+    )
+    apply_pragmas(read_engine, _read_pragmas())
+    return read_engine
+
+
+def _async_url() -> Union[str, sqlalchemy.URL]:
+    return db_settings.ASYNC_SQLITE_URL or sqlalchemy.make_url(
+        db_settings.SQLITE_URL
+    ).set(drivername="sqlite+aiosqlite")
+
+
+@_lazy
+def get_async_engine() -> Optional[sa_asyncio.AsyncEngine]:
+    """Gets the async engine used for writes, created on the first call.
+
+    Returns:
+        The async write engine, None if ASYNC_MODE is disabled.
+    """
+    if not db_settings.ASYNC_MODE:
+        return None
+    async_engine = sa_asyncio.create_async_engine(
+        **_engine_args(_async_url(), db_settings.POOL_SIZE)
+    )
+    apply_pragmas(async_engine.sync_engine, db_settings.pragmas())
+    return async_engine
+
+
+@_lazy
+def get_async_read_engine() -> Optional[sa_asyncio.AsyncEngine]:
+    """Gets the async engine used for reads, created on the first call.
+
+    Returns:
+        A read-only async engine, the async write one for the in-memory
+        databases, None if ASYNC_MODE is disabled.
+    """
+    if not db_settings.ASYNC_MODE:
+        return None
+    async_read_url = read_only_url(
+        sqlalchemy.make_url(db_settings.READ_SQLITE_URL).set(
+            drivername="sqlite+aiosqlite"
+        )
+        if db_settings.READ_SQLITE_URL
+        else _async_url()
+    )
+    if async_read_url is None:
+        return get_async_engine()
+    async_read_engine = sa_asyncio.create_async_engine(
+        **_engine_args(async_read_url, db_settings.READ_POOL_SIZE)
+    )
+    apply_pragmas(async_read_engine.sync_engine, _read_pragmas())
+    return async_read_engine
+
+
+def sync_engines() -> Iterator[tuple[str, sqlalchemy.Engine]]:
+    """Gets the application's engines, the sync_engine of the async ones.
+
+    Yields:
+        The role of the engine, "write" or "read", and the engine. An engine
+        shared by both roles is only yielded as the write one.
+    """
+    engine, read_engine = get_engine(), get_read_engine()
+    yield "write", engine
+    if read_engine is not engine:
+        yield "read", read_engine
+    async_engine, async_read_engine = get_async_engine(), get_async_read_engine()
+    if async_engine is not None:
+        yield "write", async_engine.sync_engine
+    if async_read_engine is not None and async_read_engine is not async_engine:
+        yield "read", async_read_engine.sync_engine
+
+
+async def dispose_async_engines() -> None:
+    """Closes the connections of the async engines that were created."""
+    for name in {get_async_engine.__name__, get_async_read_engine.__name__}:
+        engine_to_dispose = _built.get(name)
+        if engine_to_dispose is not None:
+            await engine_to_dispose.dispose()
+
 
 class DBTestingSettings(pydantic_settings.BaseSettings):
     """Database testing settings model.
@@ -55,18 +367,53 @@ class DBTestingSettings(pydantic_settings.BaseSettings):
     model_config = pydantic_settings.SettingsConfigDict(env_file="dev.env")
 
 
-db_testing_settings = DBTestingSettings()
+@_lazy
+def get_db_testing_settings() -> DBTestingSettings:
+    """Gets the testing settings, read from dev.env on the first call.
 
-testing_engine: sqlalchemy.Engine = sqlmodel.create_engine(
-    url=db_testing_settings.SQLITE_URL,
-    echo=True,
-    poolclass=pool.StaticPool,
-    connect_args={"check_same_thread": False},
-)
+    Returns:
+        The database testing settings.
+    """
+    return DBTestingSettings()
+
+
+@_lazy
+def get_testing_engine() -> sqlalchemy.Engine:
+    """Gets the engine of the tests, created on the first call.
+
+    Returns:
+        The testing engine, echoing every statement.
+    """
+    return sqlmodel.create_engine(
+        url=get_db_testing_settings().SQLITE_URL,
+        echo=True,
+        poolclass=pool.StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+
+# The engines and the testing settings are attributes of the module too,
+# built on their first access so importing the module creates none of them.
+_LAZY_ATTRIBUTES: dict[str, Callable[[], Any]] = {
+    "engine": get_engine,
+    "read_engine": get_read_engine,
+    "async_engine": get_async_engine,
+    "async_read_engine": get_async_read_engine,
+    "db_testing_settings": get_db_testing_settings,
+    "testing_engine": get_testing_engine,
+}
+
+
+def __getattr__(name: str) -> Any:
+    build = _LAZY_ATTRIBUTES.get(name)
+    if build is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    return build()
 
 
 Base = SQLModel
 
 
 def create_db_and_tables() -> None:
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(get_engine())
@@ -0,0 +1,195 @@
+"""Slow query log.
+
+Unlike `DBSettings.ECHO`, which prints every statement, only the statements
+slower than `DBSettings.SLOW_QUERY_THRESHOLD` are recorded, with their
+parameters, their duration and their `EXPLAIN QUERY PLAN`, so full scans can
+be caught in production. The latest ones are kept in memory for the admin
+routes and they are logged as warnings, optionally to a rotating file too.
+
+The duration is the one of the cursor execution: for a query, the time to
+its first row, the rows fetched afterwards aren't counted.
+"""
+
+import collections
+import contextlib
+import datetime
+import threading
+import time
+import weakref
+from typing import Any, Optional
+
+import sqlalchemy
+from loguru import logger
+
+from skillventory.database import config
+from skillventory.models import models
+
+# Parameters longer than this are truncated, a batch can have thousands.
+MAX_PARAMETERS_LENGTH = 1000
+
+# The statements of a connection don't overlap, and a failed one is followed
+# by the next one overwriting its start time.
+_START_TIME_KEY = "slow_query_start"
+
+# Startup runs again in each lifespan, the listeners must be added only once.
+_instrumented_engines: "weakref.WeakSet[sqlalchemy.Engine]" = weakref.WeakSet()
+_log_file_handler_id: Optional[int] = None
+
+
+class SlowQueryLog:
+    """Thread-safe ring buffer of the latest slow queries.
+
+    Args:
+        size: Number of slow queries kept, the oldest are dropped first.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._entries: collections.deque[models.SlowQuery] = collections.deque(
+            maxlen=size
+        )
+        self._lock = threading.Lock()
+
+    def record(self, slow_query: models.SlowQuery) -> None:
+        """Adds a slow query, dropping the oldest one if the log is full.
+
+        Args:
+            slow_query: The slow query to add.
+        """
+        with self._lock:
+            self._entries.append(slow_query)
+
+    def entries(self) -> list[models.SlowQuery]:
+        """Gets the slow queries kept.
+
+        Returns:
+            The slow queries, the slowest first.
+        """
+        with self._lock:
+            entries = list(self._entries)
+        return sorted(entries, key=lambda entry: entry.duration_ms, reverse=True)
+
+    def clear(self) -> None:
+        """Removes all the slow queries."""
+        with self._lock:
+            self._entries.clear()
+
+
+def _format_parameters(parameters: Any) -> str:
+    formatted = repr(parameters)
+    if len(formatted) > MAX_PARAMETERS_LENGTH:
+        return f"{formatted[:MAX_PARAMETERS_LENGTH]}..."
+    return formatted
+
+
+def explain_query_plan(
+    dbapi_connection: Any, statement: str, parameters: Any
+) -> list[str]:
+    """Gets the query plan of a statement.
+
+    It runs on a cursor of its own, so the rows of the statement aren't
+    touched, and bypasses the engine events.
+
+    Args:
+        dbapi_connection: The DBAPI connection the statement was executed on.
+        statement: The statement, as sent to the driver.
+        parameters: The parameters of the statement.
+
+    Returns:
+        One line per step of the plan, indented by its depth.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    depths: dict[int, int] = {}
+    plan = []
+    for step_id, parent_id, _unused, detail in rows:
+        depth = depths[step_id] = depths.get(parent_id, -1) + 1
+        plan.append(f"{'  ' * depth}{detail}")
+    return plan
+
+
+def instrument_engine(engine: sqlalchemy.Engine, name: str, threshold: float) -> None:
+    """Records the statements of an engine slower than a threshold.
+
+    Args:
+        engine: The sync engine, the sync_engine of an async one.
+        name: The name of the engine in the records.
+        threshold: Duration in milliseconds above which a statement is
+            recorded.
+    """
+    if engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(engine)
+
+    @sqlalchemy.event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection: sqlalchemy.Connection, *_args: Any) -> None:
+        connection.info[_START_TIME_KEY] = time.perf_counter()
+
+    @sqlalchemy.event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        connection: sqlalchemy.Connection,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: sqlalchemy.engine.ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        start = connection.info.pop(_START_TIME_KEY)
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms < threshold:
+            return
+        plan: list[str] = []
+        # DDL has no plan, and explaining a CREATE fails as it already ran.
+        if not executemany and not getattr(context, "isddl", False):
+            try:
+                plan = explain_query_plan(
+                    connection.connection.dbapi_connection, statement, parameters
+                )
+            except engine.dialect.loaded_dbapi.Error as error:
+                logger.debug("Query plan of a slow query unavailable: {}", error)
+        slow_query = models.SlowQuery(
+            engine=name,
+            statement=statement,
+            parameters=_format_parameters(parameters),
+            duration_ms=round(duration_ms, 3),
+            plan=plan,
+            recorded_at=datetime.datetime.now(datetime.UTC),
+        )
+        slow_query_log.record(slow_query)
+        logger.bind(slow_query=True).warning(
+            "Slow query on the {} engine ({:.1f} ms): {} {} plan: {}",
+            name,
+            duration_ms,
+            statement,
+            slow_query.parameters,
+            plan,
+        )
+
+
+def configure_log_file(settings: Optional[config.DBSettings] = None) -> None:
+    """Writes the slow queries to a rotating file, if one is set.
+
+    The file sink of a previous call is replaced.
+
+    Args:
+        settings: The settings to apply, the database ones by default.
+    """
+    global _log_file_handler_id  # noqa: PLW0603
+    settings = settings or config.db_settings
+    if _log_file_handler_id is not None:
+        with contextlib.suppress(ValueError):
+            logger.remove(_log_file_handler_id)
+        _log_file_handler_id = None
+    if settings.SLOW_QUERY_LOG_FILE is None:
+        return
+    _log_file_handler_id = logger.add(
+        settings.SLOW_QUERY_LOG_FILE,
+        rotation=settings.SLOW_QUERY_LOG_ROTATION,
+        filter=lambda record: record["extra"].get("slow_query", False),
+    )
+
+
+slow_query_log = SlowQueryLog(config.db_settings.SLOW_QUERY_BUFFER_SIZE)
@@ -0,0 +1,170 @@
+"""Logging configuration.
+
+The high-volume records of the CRUD hot path go through `hot_path`, which
+skips them entirely when they are turned off, and the info and warning
+records can be rate limited per call site. The sink can also be enqueued,
+written by a background thread, which keeps a slow stderr from blocking the
+requests but pickles every record on the request thread.
+"""
+
+import contextlib
+import sys
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, Literal, Optional
+
+import pydantic
+import pydantic_settings
+from loguru import logger
+
+if TYPE_CHECKING:
+    import loguru
+
+# Records at this level or above are never rate limited.
+_ERROR_LEVEL_NO = 40
+# Extra of the records already let through by the rate limiter.
+_RATE_LIMITED = "rate_limited"
+
+
+class LogSettings(pydantic_settings.BaseSettings):
+    """Logging settings model.
+
+    Attributes:
+        LOG_LEVEL: Minimum level of the records written. Default is "INFO"
+        LOG_ENQUEUE: True to write the records from a background thread instead
+        of the thread that logs them. Default is False
+        LOG_HOT_PATH: False to turn off the records logged on every read, the
+        successful operations and the missing skills. Default is True
+        LOG_RATE_LIMIT: Info and warning records per second let through from
+        each call site, 0 disables the limit. Default is 0
+        model_config: Configuration for Pydantic models loaded from .env file.
+    """
+
+    LOG_LEVEL: Literal[
+        "TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL"
+    ] = "INFO"
+    LOG_ENQUEUE: bool = False
+    LOG_HOT_PATH: bool = True
+    LOG_RATE_LIMIT: float = pydantic.Field(default=0, ge=0)
+
+    model_config = pydantic_settings.SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+class CallSiteRateLimiter:
+    """Loguru filter letting through a number of records per second per call site.
+
+    Every call site has its own token bucket, so a noisy one can't silence
+    the others. Error and critical records are always let through.
+
+    Args:
+        rate: Records per second let through from each call site, it is also
+            the size of the bursts allowed, at least one.
+        clock: Monotonic clock, in seconds.
+    """
+
+    def __init__(
+        self, rate: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self._clock = clock
+        self._buckets: dict[tuple[Optional[str], str, int], tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record: "loguru.Record") -> bool:
+        """Takes a token from the bucket of the call site of a record.
+
+        Args:
+            record: The record to filter.
+
+        Returns:
+            True if the record has to be written.
+        """
+        # The hot path records took their token before being created.
+        if record["extra"].get(_RATE_LIMITED, False):
+            return True
+        return self.allow(
+            (record["name"], record["function"], record["line"]), record["level"].no
+        )
+
+    def allow(self, call_site: tuple[Optional[str], str, int], level_no: int) -> bool:
+        """Takes a token from the bucket of a call site.
+
+        Args:
+            call_site: The module, function and line of the call site.
+            level_no: The severity of the record.
+
+        Returns:
+            True if the record has to be written.
+        """
+        if level_no >= _ERROR_LEVEL_NO:
+            return True
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(call_site, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[call_site] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+
+def hot_path(level: str, message: str, *args: Any, depth: int = 0) -> None:
+    """Logs a record of the hot path, unless they are turned off.
+
+    Loguru formats the message before the filters of the sinks run, so the
+    rate limit of the call site is applied first: the records it drops are
+    neither created nor formatted.
+
+    Args:
+        level: The level of the record.
+        message: The message, with "{}" placeholders for the arguments.
+        *args: The arguments of the message.
+        depth: The number of frames above the caller the record is
+            attributed to.
+    """
+    if not log_settings.LOG_HOT_PATH:
+        return
+    if _rate_limiter is None:
+        logger.opt(depth=depth + 1).log(level, message, *args)
+        return
+    # The call site is the frame the record is attributed to.
+    frame = sys._getframe(depth + 1)
+    call_site = (frame.f_globals.get("__name__"), frame.f_code.co_name, frame.f_lineno)
+    if _rate_limiter.allow(call_site, logger.level(level).no):
+        logger.opt(depth=depth + 1).bind(**{_RATE_LIMITED: True}).log(
+            level, message, *args
+        )
+
+
+_handler_id: Optional[int] = None
+_rate_limiter: Optional[CallSiteRateLimiter] = None
+
+
+def configure_logging(settings: Optional[LogSettings] = None) -> None:
+    """Replaces the default sink by a stderr one configured by the settings.
+
+    Args:
+        settings: The settings to apply, the module ones by default. They
+            become the module ones.
+    """
+    global _handler_id, _rate_limiter, log_settings  # noqa: PLW0603
+    if settings is not None:
+        log_settings = settings
+    _rate_limiter = (
+        CallSiteRateLimiter(log_settings.LOG_RATE_LIMIT)
+        if log_settings.LOG_RATE_LIMIT
+        else None
+    )
+    # The first time it is loguru's default handler, which has id 0.
+    with contextlib.suppress(ValueError):
+        logger.remove(0 if _handler_id is None else _handler_id)
+    _handler_id = logger.add(
+        sys.stderr,
+        level=log_settings.LOG_LEVEL,
+        enqueue=log_settings.LOG_ENQUEUE,
+        filter=_rate_limiter,
+    )
+
+
+log_settings = LogSettings()
@@ -1,18 +1,104 @@
+import contextlib
+import functools
+import time
+from collections.abc import AsyncIterator, Iterator
+
 import fastapi
 import fastui
 from fastapi import responses
+from loguru import logger
 
-from skillventory.database import config
-from skillventory.routers import skills_v1, skills_ui
+import skillventory
+from skillventory import compression, log_config, metrics
+from skillventory.database import config, slow_queries
+from skillventory.routers import metrics as metrics_router
+from skillventory.routers import admin, skills_v1, skills_ui
 from skillventory.models import models
 
 # dummy assignation to avoid deleting the unused import
 # necessary for the correct creation of the db and tables
 models_dummy = models
 
-config.create_db_and_tables()
 
-app = fastapi.FastAPI()
+@functools.cache
+def landing_page() -> compression.PrecompressedContent:
+    """Gets the FastUI landing page, built and compressed once."""
+    return compression.PrecompressedContent(
+        fastui.prebuilt_html(title="Skillventory").encode(), media_type="text/html"
+    )
+
+
+def _instrument_engines() -> None:
+    if metrics.metrics_settings.METRICS_ENABLED:
+        for engine_name, engine in config.sync_engines():
+            metrics.instrument_engine(engine, engine_name)
+    if config.db_settings.SLOW_QUERY_THRESHOLD is not None:
+        slow_queries.configure_log_file()
+        for engine_name, engine in config.sync_engines():
+            slow_queries.instrument_engine(
+                engine, engine_name, config.db_settings.SLOW_QUERY_THRESHOLD
+            )
+
+
+@contextlib.contextmanager
+def _timed(timings: dict[str, float], step: str) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    timings[step] = round((time.perf_counter() - start) * 1000, 3)
+
+
+def startup(app: fastapi.FastAPI) -> dict[str, float]:
+    """Initializes the service, none of it is done when importing it.
+
+    The engines are created with the tables, and the OpenAPI schema and the
+    landing page are built before the first request instead of by it.
+
+    Args:
+        app: The application to initialize.
+
+    Returns:
+        The duration of each step in milliseconds, with the import of the
+        package, "import", and the whole startup, "startup".
+    """
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+    with _timed(timings, "logging"):
+        log_config.configure_logging()
+    with _timed(timings, "database"):
+        config.create_db_and_tables()
+        config.report_pragmas()
+    with _timed(timings, "instrumentation"):
+        _instrument_engines()
+    with _timed(timings, "openapi"):
+        app.openapi()
+    with _timed(timings, "landing_page"):
+        landing_page()
+    timings["startup"] = round((time.perf_counter() - start) * 1000, 3)
+    timings["import"] = round((_imported_at - skillventory.IMPORT_STARTED) * 1000, 3)
+    logger.info(
+        "Started up in {} ms, after importing for {} ms: {}",
+        timings["startup"],
+        timings["import"],
+        timings,
+    )
+    return timings
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: fastapi.FastAPI) -> AsyncIterator[None]:
+    app.state.startup_timings = startup(app)
+    yield
+    await config.dispose_async_engines()
+    # Waits for the enqueued records to be written.
+    await logger.complete()
+
+
+app = fastapi.FastAPI(lifespan=lifespan)
+# The metrics middleware wraps the compression one, to measure the bytes sent.
+app.add_middleware(compression.CompressionMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+app.include_router(router=metrics_router.router)
+app.include_router(router=admin.router)
 app.include_router(router=skills_v1.router)
 app.include_router(router=skills_ui.router)
 
@@ -23,5 +109,8 @@ def main() -> dict[str, str]:
 
 
 @app.get("/{path:path}")
-async def html_landing() -> responses.HTMLResponse:
-    return responses.HTMLResponse(fastui.prebuilt_html(title="Skillventory"))
+async def html_landing(request: fastapi.Request) -> responses.Response:
+    return landing_page().response(request)
+
+
+_imported_at = time.perf_counter()
@@ -0,0 +1,497 @@
+"""Metrics of the service in the Prometheus text format.
+
+The metrics are kept in process by a small registry, so the service doesn't
+need a client library, and are fed by:
+
+- `MetricsMiddleware`, a pure ASGI middleware timing every request by route.
+- `instrument_engine`, which hooks the SQLAlchemy events of an engine to time
+  the queries and commits and to count the queries of each request, and
+  wraps its pool to time the connection checkouts.
+- Callbacks reading the counters of the skill lookup cache at scrape time.
+
+Recording a value is a dictionary lookup and an addition under a lock.
+"""
+
+import abc
+import bisect
+import contextvars
+import math
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, Optional
+
+import pydantic_settings
+import sqlalchemy
+from starlette import types
+
+from skillventory.data import cache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    1.0,
+)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+LabelValues = tuple[str, ...]
+
+
+class MetricsSettings(pydantic_settings.BaseSettings):
+    """Metrics settings model.
+
+    Attributes:
+        METRICS_ENABLED: True to record the metrics and serve /metrics.
+        Default is True
+        model_config: Configuration for Pydantic models loaded from .env file.
+    """
+
+    METRICS_ENABLED: bool = True
+
+    model_config = pydantic_settings.SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(abc.ABC):
+    """Base of the metrics, a family of time series sharing labels.
+
+    Args:
+        name: The name of the metric.
+        documentation: The help text of the metric.
+        label_names: The names of the labels of its time series.
+    """
+
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Renders the samples of the metric.
+
+        Yields:
+            One line per sample.
+        """
+
+    def render(self) -> str:
+        """Renders the metric with its help and type.
+
+        Returns:
+            The lines of the metric.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label values."""
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increments the value of a time series.
+
+        Args:
+            *label_values: The values of the labels, in order.
+            amount: The increment.
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down per label values."""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        """Decrements the value of a time series.
+
+        Args:
+            *label_values: The values of the labels, in order.
+            amount: The decrement.
+        """
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets.
+
+    Args:
+        name: The name of the metric.
+        documentation: The help text of the metric.
+        label_names: The names of the labels of its time series.
+        buckets: The upper bounds of the buckets, increasing. The +Inf bucket
+            is added.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = (*buckets, math.inf)
+        # Per label values: the count of each bucket, not cumulative, and the sum.
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Records a value.
+
+        Args:
+            value: The observed value.
+            *label_values: The values of the labels, in order.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * len(self.buckets), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            series = [
+                (label_values, list(counts), total[0])
+                for label_values, (counts, total) in self._series.items()
+            ]
+        bucket_label_names = (*self.label_names, "le")
+        for label_values, counts, total in series:
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets, counts, strict=True):
+                cumulative += count
+                labels = _format_labels(
+                    bucket_label_names, (*label_values, _format_value(upper_bound))
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class CallbackMetric(Metric):
+    """Metric whose samples are read from a callback at scrape time.
+
+    Args:
+        name: The name of the metric.
+        documentation: The help text of the metric.
+        kind: The Prometheus type, counter or gauge.
+        collect: Returns the label values and value of every time series.
+        label_names: The names of the labels of its time series.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+        label_names: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in self._collect():
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Registry:
+    """Set of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds a metric to the registry.
+
+        Args:
+            metric: The metric to add.
+
+        Returns:
+            The metric.
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Renders all the metrics in the Prometheus text format.
+
+        Returns:
+            The exposition, ending with a newline.
+        """
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+metrics_settings = MetricsSettings()
+registry = Registry()
+
+REQUEST_DURATION = Histogram(
+    "skillventory_http_request_duration_seconds",
+    "Time to answer a request, by route.",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "skillventory_http_requests_in_flight", "Requests being answered."
+)
+RESPONSE_SIZE = Histogram(
+    "skillventory_http_response_size_bytes",
+    "Size of the response bodies, by route.",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+QUERIES_PER_REQUEST = Histogram(
+    "skillventory_db_queries_per_request",
+    "Statements executed to answer a request, by route.",
+    ("method", "route"),
+    buckets=COUNT_BUCKETS,
+)
+QUERY_DURATION = Histogram(
+    "skillventory_db_query_duration_seconds",
+    "Time to execute a statement, by engine.",
+    ("engine",),
+    buckets=DB_LATENCY_BUCKETS,
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "skillventory_db_pool_checkout_wait_seconds",
+    "Time waited for a connection of the pool, by engine.",
+    ("engine",),
+    buckets=DB_LATENCY_BUCKETS,
+)
+COMMIT_DURATION = Histogram(
+    "skillventory_db_commit_duration_seconds",
+    "Time to commit a transaction, fsync included, by engine.",
+    ("engine",),
+    buckets=DB_LATENCY_BUCKETS,
+)
+
+for _metric in (
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    RESPONSE_SIZE,
+    QUERIES_PER_REQUEST,
+    QUERY_DURATION,
+    POOL_CHECKOUT_WAIT,
+    COMMIT_DURATION,
+):
+    registry.register(_metric)
+
+registry.register(
+    CallbackMetric(
+        "skillventory_cache_requests_total",
+        "Lookups of the skill cache, by result.",
+        "counter",
+        lambda: (
+            (("hit",), cache.skill_cache.stats().hits),
+            (("miss",), cache.skill_cache.stats().misses),
+        ),
+        ("result",),
+    )
+)
+registry.register(
+    CallbackMetric(
+        "skillventory_cache_evictions_total",
+        "Entries of the skill cache evicted by size or age.",
+        "counter",
+        lambda: (((), cache.skill_cache.stats().evictions),),
+    )
+)
+registry.register(
+    CallbackMetric(
+        "skillventory_cache_entries",
+        "Entries in the skill cache.",
+        "gauge",
+        lambda: (((), cache.skill_cache.stats().size),),
+    )
+)
+
+
+def _hit_ratio() -> Iterable[tuple[LabelValues, float]]:
+    stats = cache.skill_cache.stats()
+    lookups = stats.hits + stats.misses
+    return (((), stats.hits / lookups if lookups else 0.0),)
+
+
+registry.register(
+    CallbackMetric(
+        "skillventory_cache_hit_ratio",
+        "Share of the skill cache lookups served from the cache.",
+        "gauge",
+        _hit_ratio,
+    )
+)
+
+# Statements executed by the current request, shared with the threads that
+# run its CRUD functions through the copied context.
+_request_queries: contextvars.ContextVar[Optional[list[int]]] = contextvars.ContextVar(
+    "request_queries", default=None
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing the HTTP requests by route.
+
+    The route is the path template the request matched, so the number of
+    time series doesn't depend on the paths requested.
+
+    Args:
+        app: The ASGI application to wrap.
+    """
+
+    def __init__(self, app: types.ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self, scope: types.Scope, receive: types.Receive, send: types.Send
+    ) -> None:
+        if scope["type"] != "http" or not metrics_settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        status = "500"
+        response_size = 0
+
+        async def send_wrapper(message: types.Message) -> None:
+            nonlocal status, response_size
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        queries = [0]
+        token = _request_queries.set(queries)
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            _request_queries.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUEST_DURATION.observe(duration, method, route_path, status)
+            RESPONSE_SIZE.observe(response_size, method, route_path)
+            QUERIES_PER_REQUEST.observe(queries[0], method, route_path)
+
+
+_instrumented_engines: "weakref.WeakSet[sqlalchemy.Engine]" = weakref.WeakSet()
+
+
+def _time_pool_checkouts(engine: sqlalchemy.Engine, name: str) -> None:
+    connect = engine.pool.connect
+
+    def timed_connect() -> Any:
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, name)
+
+    engine.pool.connect = timed_connect  # type: ignore[method-assign]
+
+
+def instrument_engine(engine: sqlalchemy.Engine, name: str) -> None:
+    """Records the query, checkout and commit timings of an engine.
+
+    Args:
+        engine: The sync engine, the sync_engine of an async one.
+        name: The value of the engine label of its metrics.
+    """
+    if engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(engine)
+
+    @sqlalchemy.event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection: sqlalchemy.Connection, *_args: Any) -> None:
+        connection.info["query_start"] = time.perf_counter()
+
+    @sqlalchemy.event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(connection: sqlalchemy.Connection, *_args: Any) -> None:
+        start = connection.info.pop("query_start")
+        QUERY_DURATION.observe(time.perf_counter() - start, name)
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[0] += 1
+
+    # The pool and the dialect have no events around the checkout and the
+    # commit, their methods are wrapped instead. Disposing of the engine
+    # replaces its pool, the new one is wrapped in turn.
+    _time_pool_checkouts(engine, name)
+    sqlalchemy.event.listen(
+        engine, "engine_disposed", lambda _engine: _time_pool_checkouts(engine, name)
+    )
+
+    do_commit = engine.dialect.do_commit
+
+    def timed_commit(dbapi_connection: Any) -> None:
+        start = time.perf_counter()
+        try:
+            do_commit(dbapi_connection)
+        finally:
+            COMMIT_DURATION.observe(time.perf_counter() - start, name)
+
+    engine.dialect.do_commit = timed_commit  # type: ignore[method-assign]
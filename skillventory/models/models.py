@@ -7,6 +7,11 @@ Models:
 
 - Skill: Maps to skill table.
 - PlaceWithGreaterInterest: Maps to place_with_greater_interest table.
+- SkillLevelCount: Maps to skill_level_count table, the number of skills
+  per level of confidence kept current by triggers on the skill table.
+- SkillChangeCounter: Maps to skill_change_counter table, a version bumped
+  by triggers on every change of the skill table.
+- skill_fts: The FTS5 index of the skill names, kept in sync by triggers.
 
 The models have columns mapped to the corresponding database tables.
 Relationships between models are defined using SQLAlchemy relationships
@@ -16,8 +21,12 @@ This allows usage of the models for CRUD operations in SQLAlchemy
 and for serialization/deserialization with Pydantic.
 """
 
+import datetime
 import enum
-from typing import Optional
+from typing import Any, Optional, Union
+
+import pydantic
+import sqlalchemy
 import sqlmodel
 
 
@@ -55,7 +64,314 @@ class SkillBase(sqlmodel.SQLModel):
     }
 
 
+class SkillUpdate(sqlmodel.SQLModel):
+    """Partial update of a skill, only the fields sent are changed"""
+
+    skill_name: Optional[str] = None
+    level_of_confidence: Optional[LevelOfConfidence] = None
+
+
 class Skill(sqlmodel.SQLModel, table=True):
+    # Serves the listings filtered by level and sorted by name, and the ones
+    # sorted by level, without sorting the rows.
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ix_skill_level_of_confidence_skill_name",
+            "level_of_confidence",
+            "skill_name",
+        ),
+    )
+
     skill_id: Optional[int] = sqlmodel.Field(default=None, primary_key=True)
     skill_name: str = sqlmodel.Field(unique=True, index=True)
     level_of_confidence: LevelOfConfidence = sqlmodel.Field(index=True)
+
+
+class SkillField(enum.Enum):
+    """Columns of a skill that can be requested on their own."""
+
+    SKILL_ID = "skill_id"
+    SKILL_NAME = "skill_name"
+    LEVEL_OF_CONFIDENCE = "level_of_confidence"
+
+
+class OnConflict(enum.Enum):
+    """What to do when a skill with the same name already exists.
+
+    ERROR reports the conflict, IGNORE keeps the existing skill and UPDATE
+    overwrites its level of confidence.
+    """
+
+    ERROR = "error"
+    IGNORE = "ignore"
+    UPDATE = "update"
+
+
+class CreationStatus(enum.Enum):
+    """Outcome of adding a skill to the database."""
+
+    CREATED = "created"
+    UPDATED = "updated"
+    CONFLICT = "conflict"
+
+
+class SkillCreationResult(sqlmodel.SQLModel):
+    """Outcome of adding one skill of a batch.
+
+    The skill_id is only set for the skills that were created or updated.
+    """
+
+    skill_name: str
+    status: CreationStatus
+    skill_id: Optional[int] = None
+
+
+class SkillLookup(sqlmodel.SQLModel):
+    """Skills found by a batch lookup.
+
+    The skills are in the order they were requested, each one once; the ids
+    or names without a skill are the missing ones, in the same order.
+    """
+
+    skills: list[Skill]
+    missing: list[Union[int, str]]
+
+
+class SkillStats(sqlmodel.SQLModel):
+    """Distribution of the skills by level of confidence."""
+
+    total: int
+    by_level_of_confidence: dict[LevelOfConfidence, int]
+
+
+class ImportJobStatus(enum.Enum):
+    """Stages of a background import."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ImportRowError(sqlmodel.SQLModel):
+    """A row of an import that couldn't be parsed or validated."""
+
+    line: int
+    message: str
+
+
+class ImportJob(sqlmodel.SQLModel):
+    """Progress of a background import.
+
+    The rows processed are the created, conflicting and invalid ones; only
+    the first errors are kept, the rest are just counted as invalid rows.
+    """
+
+    job_id: str
+    status: ImportJobStatus = ImportJobStatus.PENDING
+    rows_processed: int = 0
+    rows_created: int = 0
+    rows_conflicting: int = 0
+    rows_invalid: int = 0
+    errors: list[ImportRowError] = []
+    detail: Optional[str] = None
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+
+    @pydantic.computed_field  # type: ignore[prop-decorator]
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        """Throughput of the import since it started."""
+        if self.started_at is None:
+            return None
+        finished_at = self.finished_at or datetime.datetime.now(datetime.UTC)
+        elapsed = (finished_at - self.started_at).total_seconds()
+        return round(self.rows_processed / elapsed, 1) if elapsed > 0 else None
+
+
+class SlowQuery(sqlmodel.SQLModel):
+    """A statement that took longer than the slow query threshold.
+
+    The plan has one line per step of `EXPLAIN QUERY PLAN`, indented by its
+    depth; it is empty for the statements executed with many parameter sets.
+    """
+
+    engine: str
+    statement: str
+    parameters: str
+    duration_ms: float
+    plan: list[str] = []
+    recorded_at: datetime.datetime
+
+
+class SkillLevelCount(sqlmodel.SQLModel, table=True):
+    """Number of skills with a level of confidence.
+
+    The rows are maintained by the triggers below, so counting the skills
+    doesn't need a scan of the skill table.
+    """
+
+    __tablename__ = "skill_level_count"
+
+    level_of_confidence: LevelOfConfidence = sqlmodel.Field(primary_key=True)
+    total: int = 0
+
+
+class SkillChangeCounter(sqlmodel.SQLModel, table=True):
+    """Version of the skill table.
+
+    It has a single row whose version is bumped by the triggers below on
+    every insert, update and delete, so it changes whenever any skill does.
+    """
+
+    __tablename__ = "skill_change_counter"
+
+    counter_id: int = sqlmodel.Field(default=1, primary_key=True)
+    version: int = 0
+
+
+_SKILL_LEVEL_COUNT_DDL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_level_count_after_insert
+    AFTER INSERT ON skill
+    BEGIN
+        INSERT INTO skill_level_count (level_of_confidence, total)
+        VALUES (NEW.level_of_confidence, 1)
+        ON CONFLICT (level_of_confidence) DO UPDATE SET total = total + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_level_count_after_delete
+    AFTER DELETE ON skill
+    BEGIN
+        UPDATE skill_level_count SET total = total - 1
+        WHERE level_of_confidence = OLD.level_of_confidence;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_level_count_after_update
+    AFTER UPDATE OF level_of_confidence ON skill
+    WHEN OLD.level_of_confidence IS NOT NEW.level_of_confidence
+    BEGIN
+        UPDATE skill_level_count SET total = total - 1
+        WHERE level_of_confidence = OLD.level_of_confidence;
+        INSERT INTO skill_level_count (level_of_confidence, total)
+        VALUES (NEW.level_of_confidence, 1)
+        ON CONFLICT (level_of_confidence) DO UPDATE SET total = total + 1;
+    END
+    """,
+    # Backfills the counters of a database created before they existed.
+    """
+    INSERT INTO skill_level_count (level_of_confidence, total)
+    SELECT level_of_confidence, count(*) FROM skill
+    WHERE NOT EXISTS (SELECT 1 FROM skill_level_count)
+    GROUP BY level_of_confidence
+    """,
+)
+
+_SKILL_CHANGE_COUNTER_DDL = (
+    # Starts at the creation time in milliseconds, so a recreated database
+    # doesn't reuse the versions, and the ETags, of the previous one.
+    """
+    INSERT OR IGNORE INTO skill_change_counter (counter_id, version)
+    VALUES (1, CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_change_counter_after_insert
+    AFTER INSERT ON skill
+    BEGIN
+        UPDATE skill_change_counter SET version = version + 1 WHERE counter_id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_change_counter_after_update
+    AFTER UPDATE ON skill
+    BEGIN
+        UPDATE skill_change_counter SET version = version + 1 WHERE counter_id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_change_counter_after_delete
+    AFTER DELETE ON skill
+    BEGIN
+        UPDATE skill_change_counter SET version = version + 1 WHERE counter_id = 1;
+    END
+    """,
+)
+
+# Full-text index of the skill names. It is an external content table: it
+# only stores the index, the names are read from the skill table. The
+# prefix indexes make the 2 and 3 character prefix queries as fast as the
+# full terms.
+skill_fts = sqlalchemy.table(
+    "skill_fts", sqlalchemy.column("rowid"), sqlalchemy.column("skill_fts")
+)
+
+_SKILL_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS skill_fts USING fts5(
+        skill_name, content='skill', content_rowid='skill_id', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_fts_after_insert
+    AFTER INSERT ON skill
+    BEGIN
+        INSERT INTO skill_fts (rowid, skill_name)
+        VALUES (NEW.skill_id, NEW.skill_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_fts_after_delete
+    AFTER DELETE ON skill
+    BEGIN
+        INSERT INTO skill_fts (skill_fts, rowid, skill_name)
+        VALUES ('delete', OLD.skill_id, OLD.skill_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_fts_after_update
+    AFTER UPDATE OF skill_name ON skill
+    BEGIN
+        INSERT INTO skill_fts (skill_fts, rowid, skill_name)
+        VALUES ('delete', OLD.skill_id, OLD.skill_name);
+        INSERT INTO skill_fts (rowid, skill_name)
+        VALUES (NEW.skill_id, NEW.skill_name);
+    END
+    """,
+    # Indexes the skills of a database created before the index existed.
+    """
+    INSERT INTO skill_fts (skill_fts) SELECT 'rebuild'
+    WHERE NOT EXISTS (SELECT 1 FROM skill_fts_docsize)
+    AND EXISTS (SELECT 1 FROM skill)
+    """,
+)
+
+for _statement in (
+    *_SKILL_LEVEL_COUNT_DDL,
+    *_SKILL_CHANGE_COUNTER_DDL,
+    *_SKILL_FTS_DDL,
+):
+    sqlalchemy.event.listen(
+        sqlmodel.SQLModel.metadata,
+        "after_create",
+        sqlalchemy.DDL(_statement).execute_if(dialect="sqlite"),
+    )
+
+
+@sqlalchemy.event.listens_for(sqlmodel.SQLModel.metadata, "after_create")
+def _create_missing_indexes(
+    target: sqlalchemy.MetaData, connection: sqlalchemy.Connection, **kw: Any
+) -> None:
+    # create_all skips the tables that exist, with their indexes, so the
+    # indexes added since a database was created are created here.
+    for index in target.tables["skill"].indexes:
+        index.create(connection, checkfirst=True)
+
+
+# The index isn't part of the metadata, it is dropped with the tables.
+sqlalchemy.event.listen(
+    sqlmodel.SQLModel.metadata,
+    "after_drop",
+    sqlalchemy.DDL("DROP TABLE IF EXISTS skill_fts").execute_if(dialect="sqlite"),
+)
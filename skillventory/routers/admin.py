@@ -0,0 +1,48 @@
+"""Module that defines the routes used to inspect the service."""
+
+from typing import Any, Dict, Union
+
+import fastapi as fa
+from fastapi import status
+
+from skillventory.database import config, slow_queries
+from skillventory.models import models
+
+router: fa.APIRouter = fa.APIRouter(prefix="/admin", tags=["Admin"])
+
+_DISABLED_RESPONSES: Dict[Union[int, str], Dict[str, Any]] = {
+    404: {"description": "The slow query log or its endpoint is disabled"}
+}
+
+
+def _ensure_slow_query_log_enabled() -> None:
+    # The entries hold user data, the endpoint is only served when enabled.
+    if (
+        config.db_settings.SLOW_QUERY_THRESHOLD is None
+        or not config.db_settings.SLOW_QUERY_ENDPOINT
+    ):
+        raise fa.HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="The slow query log is disabled",
+        )
+
+
+@router.get(
+    "/slow-queries",
+    status_code=status.HTTP_200_OK,
+    response_model=list[models.SlowQuery],
+    responses=_DISABLED_RESPONSES,
+)
+async def get_slow_queries() -> list[models.SlowQuery]:
+    _ensure_slow_query_log_enabled()
+    return slow_queries.slow_query_log.entries()
+
+
+@router.delete(
+    "/slow-queries",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses=_DISABLED_RESPONSES,
+)
+async def clear_slow_queries() -> None:
+    _ensure_slow_query_log_enabled()
+    slow_queries.slow_query_log.clear()
@@ -0,0 +1,123 @@
+"""HTTP caching of the skill reads: ETags, conditional GETs and Cache-Control.
+
+The ETags are built from the version of the skill table, which triggers bump
+on every write, so a client, or a proxy, holding a response can revalidate it
+with ``If-None-Match`` and get a 304 without the rows being read or
+serialized again.
+"""
+
+from typing import Optional
+
+import fastapi as fa
+import pydantic_settings
+from fastapi import status
+
+# Content encodings the representation ETags can carry.
+CONTENT_ENCODINGS = ("br", "gzip")
+
+
+class HTTPCacheSettings(pydantic_settings.BaseSettings):
+    """HTTP cache settings model.
+
+    Attributes:
+        LIST_CACHE_CONTROL: Cache-Control of the skill listings. Default is
+        "no-cache", stored but revalidated on every use
+        ITEM_CACHE_CONTROL: Cache-Control of the single skill reads. Default is
+        "no-cache"
+        model_config: Configuration for Pydantic models loaded from .env file.
+    """
+
+    LIST_CACHE_CONTROL: str = "no-cache"
+    ITEM_CACHE_CONTROL: str = "no-cache"
+
+    model_config = pydantic_settings.SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+def make_etag(version: int) -> str:
+    """Builds the strong ETag of the skill reads for a version of the table.
+
+    Args:
+        version: The version of the skill table.
+
+    Returns:
+        The quoted ETag.
+    """
+    return f'"{version}"'
+
+
+def representation_etag(etag: str, encoding: Optional[str]) -> str:
+    """Builds the ETag of a content encoded representation of a resource.
+
+    A compressed body is a different representation, so it can't share the
+    strong ETag of the identity one: the encoding is appended to the tag.
+
+    Args:
+        etag: The ETag of the identity representation.
+        encoding: The content encoding, None for the identity.
+
+    Returns:
+        The quoted ETag, weak if the original one is.
+    """
+    if encoding is None:
+        return etag
+    return etag.removesuffix('"') + f'-{encoding}"'
+
+
+def _strip_encoding(opaque_tag: str) -> str:
+    tag, separator, encoding = opaque_tag.removesuffix('"').rpartition("-")
+    if separator and encoding in CONTENT_ENCODINGS:
+        return f'{tag}"'
+    return opaque_tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks an If-None-Match header against an ETag.
+
+    The comparison is weak, as RFC 9110 requires for If-None-Match, and
+    ignores the content encoding, so a client holding a compressed
+    representation revalidates it too.
+
+    Args:
+        if_none_match: The value of the header, if any.
+        etag: The current ETag of the resource.
+
+    Returns:
+        True if the client already holds the current representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = _strip_encoding(etag.removeprefix("W/"))
+    return any(
+        _strip_encoding(candidate.strip().removeprefix("W/")) == opaque_tag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_response(
+    request: fa.Request,
+    response: fa.Response,
+    version: int,
+    cache_control: str,
+) -> Optional[fa.Response]:
+    """Handles a conditional GET of a skill read.
+
+    Args:
+        request: The incoming request.
+        response: The response of the route, whose caching headers are set.
+        version: The version of the skill table.
+        cache_control: The Cache-Control policy of the route.
+
+    Returns:
+        A 304 response if the client's copy is current, None if the route
+        has to answer with the content.
+    """
+    headers = {"ETag": make_etag(version), "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return fa.Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+http_cache_settings = HTTPCacheSettings()
@@ -0,0 +1,24 @@
+"""Module that defines the route exposing the metrics to Prometheus."""
+
+import fastapi as fa
+from fastapi import responses, status
+
+from skillventory import metrics
+
+router: fa.APIRouter = fa.APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    response_class=responses.PlainTextResponse,
+    responses={404: {"description": "The metrics are disabled"}},
+)
+async def get_metrics() -> responses.PlainTextResponse:
+    if not metrics.metrics_settings.METRICS_ENABLED:
+        raise fa.HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="The metrics are disabled"
+        )
+    return responses.PlainTextResponse(
+        metrics.registry.render(), media_type=metrics.CONTENT_TYPE
+    )
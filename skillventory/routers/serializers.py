@@ -0,0 +1,88 @@
+"""Pre-built serializers for the skill listings.
+
+FastAPI validates what a route returns against its response_model before
+encoding it, which for long listings costs more than the query itself. The
+listing routes read the skills as rows of the fields requested, without the
+ORM, and encode them straight to JSON bytes with serializers built once at
+import; their response_model is kept for the OpenAPI schema.
+"""
+
+from collections.abc import Sequence
+from typing import Any, Dict
+
+import fastapi as fa
+import pydantic
+import sqlalchemy
+
+from skillventory.models import models
+
+fields_adapter: pydantic.TypeAdapter[Dict[str, Any]] = pydantic.TypeAdapter(
+    Dict[str, Any]
+)
+rows_adapter: pydantic.TypeAdapter[list[Dict[str, Any]]] = pydantic.TypeAdapter(
+    list[Dict[str, Any]]
+)
+
+
+def _json_response(content: bytes, response: fa.Response) -> fa.Response:
+    return fa.Response(
+        content=content,
+        status_code=response.status_code or fa.status.HTTP_200_OK,
+        headers=dict(response.headers),
+        media_type="application/json",
+    )
+
+
+def skill_rows_json_response(
+    rows: Sequence[sqlalchemy.Row[Any]],
+    fields: Sequence[models.SkillField],
+    response: fa.Response,
+) -> fa.Response:
+    """Encodes rows of skill columns as a JSON array of objects.
+
+    Args:
+        rows: The rows, starting with the columns of the fields.
+        fields: The fields of the objects, the rest of the columns are left out.
+        response: The response of the route, its headers are kept.
+
+    Returns:
+        The response with the encoded rows.
+    """
+    names = [field.value for field in fields]
+    return _json_response(
+        rows_adapter.dump_json([dict(zip(names, row, strict=False)) for row in rows]),
+        response,
+    )
+
+
+def skill_fields_json_response(
+    columns: Dict[str, Any], response: fa.Response
+) -> fa.Response:
+    """Encodes the columns of a skill as a JSON object.
+
+    Args:
+        columns: The columns by name.
+        response: The response of the route, its headers are kept.
+
+    Returns:
+        The response with the encoded skill.
+    """
+    return _json_response(fields_adapter.dump_json(columns), response)
+
+
+def skill_lookup_json_response(
+    skills: Sequence[Dict[str, Any]], missing: Sequence[Any], response: fa.Response
+) -> fa.Response:
+    """Encodes the outcome of a batch lookup as a JSON object.
+
+    Args:
+        skills: The columns of the skills found, by name.
+        missing: The ids or names without a skill.
+        response: The response of the route, its headers are kept.
+
+    Returns:
+        The response with the skills and the missing keys.
+    """
+    return _json_response(
+        fields_adapter.dump_json({"skills": skills, "missing": missing}), response
+    )
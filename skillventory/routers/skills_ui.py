@@ -1,32 +1,106 @@
-from typing import Annotated
+from typing import Annotated, Optional, Union
 
 import fastapi
 import fastui
-import sqlmodel
-from fastui import components
+import pydantic
+from fastapi import status
+from fastui import components, events
 from fastui.components import display
 
 
-from skillventory.data import crud
+from skillventory.data import async_crud, crud
 from skillventory.data import dependencies as deps
+from skillventory.data import pagination
 from skillventory.models import models
 
 router = fastapi.APIRouter(prefix="/api/skills", tags=["Skills UI"])
 
 
+class SkillSearch(pydantic.BaseModel):
+    """Search box of the skills table."""
+
+    q: Optional[str] = pydantic.Field(
+        default=None, title="Search", description="Words the skill names start with"
+    )
+
+
 @router.get("/", response_model=fastui.FastUI, response_model_exclude_none=True)
-def skills_table(
-    session: Annotated[sqlmodel.Session, fastapi.Depends(deps.get_db_session)],
-    page: Annotated[int, fastapi.Query()] = 1,
-    page_size: Annotated[int, fastapi.Query()] = 15,
+async def skills_table(
+    session: deps.ReadDBSession,
+    page: Annotated[int, fastapi.Query(gt=0)] = 1,
+    page_size: Annotated[int, fastapi.Query(gt=0)] = 15,
+    cursor: Annotated[Optional[str], fastapi.Query()] = None,
+    q: Annotated[Optional[str], fastapi.Query()] = None,
+    sort: Annotated[
+        pagination.SortField, fastapi.Query()
+    ] = pagination.SortField.SKILL_ID,
+    order: Annotated[pagination.SortOrder, fastapi.Query()] = pagination.SortOrder.ASC,
+    level: Annotated[Optional[models.LevelOfConfidence], fastapi.Query()] = None,
 ) -> list[fastui.AnyComponent]:
-    skills, total = crud.get_skills(
-        session=session, offset=(page - 1) * page_size, limit=page_size
-    )
+    navigation: list[fastui.AnyComponent]
+    next_cursor: Optional[str]
+    if q:
+        try:
+            skills, next_cursor = await async_crud.run(
+                session, crud.search_skills, query=q, cursor=cursor, limit=page_size
+            )
+        except pagination.InvalidCursorError as error:
+            raise fastapi.HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+            ) from error
+        navigation = _next_page_link(next_cursor, page_size, q=q)
+    elif cursor is None:
+        offset = (page - 1) * page_size
+        skills, total = await async_crud.run(
+            session,
+            crud.get_skills,
+            offset=offset,
+            limit=page_size,
+            sort_by=sort,
+            order=order,
+            level=level,
+        )
+        # As the API's X-Next-Cursor, the next pages are read by keyset.
+        next_cursor = None
+        has_more = (
+            len(skills) == page_size if total is None else offset + len(skills) < total
+        )
+        if skills and has_more:
+            next_cursor = crud.skill_cursor(skills[-1], sort_by=sort, order=order)
+        navigation = [
+            components.Pagination(page=page, page_size=page_size, total=total or 0),
+            *_next_page_link(next_cursor, page_size),
+        ]
+    else:
+        try:
+            skills, next_cursor = await async_crud.run(
+                session,
+                crud.get_skills_page,
+                cursor=cursor,
+                limit=page_size,
+                sort_by=sort,
+                order=order,
+                level=level,
+            )
+        except pagination.InvalidCursorError as error:
+            raise fastapi.HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+            ) from error
+        navigation = _next_page_link(next_cursor, page_size)
     return [
         components.Page(
             components=[
                 components.Heading(text="Skills", level=2),
+                components.ModelForm(
+                    model=SkillSearch,
+                    submit_url=".",
+                    initial={"q": q} if q else {},
+                    method="GOTO",
+                    submit_on_change=True,
+                    display_mode="inline",
+                ),
+                # The search results are sorted by relevance.
+                *([] if q else _sort_and_filter_links(sort, order, level)),
                 components.Table(
                     data=skills,
                     data_model=models.Skill,
@@ -40,7 +114,84 @@ def skills_table(
                         ),
                     ],
                 ),
-                components.Pagination(page=page, page_size=page_size, total=total),
+                *navigation,
             ]
         )
     ]
+
+
+SORTABLE_COLUMNS = {
+    pagination.SortField.SKILL_NAME: "Name",
+    pagination.SortField.LEVEL_OF_CONFIDENCE: "Level of confidence",
+}
+
+SORT_ARROWS = {pagination.SortOrder.ASC: " ↑", pagination.SortOrder.DESC: " ↓"}
+
+
+def _sort_and_filter_links(
+    sort: pagination.SortField,
+    order: pagination.SortOrder,
+    level: Optional[models.LevelOfConfidence],
+) -> list[fastui.AnyComponent]:
+    # The links only change their parameters of the query, the others are
+    # kept; a new sort or filter starts again from the first page.
+    first_page = {"page": None, "cursor": None}
+    sort_links = []
+    for field, title in SORTABLE_COLUMNS.items():
+        active = field is sort
+        next_order = (
+            pagination.SortOrder.DESC
+            if active and order is pagination.SortOrder.ASC
+            else pagination.SortOrder.ASC
+        )
+        sort_links.append(
+            components.Link(
+                components=[
+                    components.Text(text=title + (SORT_ARROWS[order] if active else ""))
+                ],
+                on_click=events.GoToEvent(
+                    query={**first_page, "sort": field.value, "order": next_order}
+                ),
+                active=active,
+            )
+        )
+    level_links = [
+        components.Link(
+            components=[components.Text(text="All levels")],
+            on_click=events.GoToEvent(query={**first_page, "level": None}),
+            active=level is None,
+        ),
+        *(
+            components.Link(
+                components=[components.Text(text=level_option.value)],
+                on_click=events.GoToEvent(
+                    query={**first_page, "level": level_option.value}
+                ),
+                active=level_option is level,
+            )
+            for level_option in models.LevelOfConfidence
+        ),
+    ]
+    return [
+        components.LinkList(links=sort_links, mode="tabs"),
+        components.LinkList(links=level_links, mode="tabs"),
+    ]
+
+
+def _next_page_link(
+    next_cursor: Optional[str], page_size: int, q: Optional[str] = None
+) -> list[fastui.AnyComponent]:
+    if next_cursor is None:
+        return []
+    query: dict[str, Union[str, int, float, None]] = {
+        "cursor": next_cursor,
+        "page_size": page_size,
+    }
+    if q:
+        query["q"] = q
+    return [
+        components.Link(
+            components=[components.Text(text="Next page")],
+            on_click=events.GoToEvent(query=query),
+        )
+    ]
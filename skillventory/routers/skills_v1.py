@@ -4,12 +4,15 @@ from collections.abc import Sequence
 from typing import Annotated, Any, Dict, Optional
 
 import fastapi as fa
-import sqlmodel
 from fastapi import responses, status
+from sqlalchemy import exc
 
-from skillventory.data import crud
+from skillventory.data import async_crud, crud, export, imports
 from skillventory.data import dependencies as deps
+from skillventory.data import pagination
+from skillventory.database import config
 from skillventory.models import models
+from skillventory.routers import http_cache, serializers
 
 router: fa.APIRouter = fa.APIRouter(
     prefix="/v1/skills",
@@ -18,28 +21,276 @@ router: fa.APIRouter = fa.APIRouter(
 )
 
 
-@router.get("/", status_code=status.HTTP_200_OK, response_model=Sequence[models.Skill])
-def get_skills(
-    session: Annotated[sqlmodel.Session, fa.Depends(deps.get_db_session)],
+def sparse_fields(
+    fields: Annotated[
+        Optional[str],
+        fa.Query(
+            description="Comma separated fields of the skills to return, all of "
+            "them by default. Only those columns are read from the database.",
+            examples=["skill_name,level_of_confidence"],
+        ),
+    ] = None,
+) -> tuple[models.SkillField, ...]:
+    """Parses the fields of the skills requested.
+
+    Args:
+        fields: The comma separated names of the fields.
+
+    Returns:
+        The requested fields without repetitions, all of them if none is given.
+
+    Raises:
+        HTTPException: If a field doesn't exist.
+    """
+    if not fields:
+        return tuple(models.SkillField)
+    names = [name.strip() for name in fields.split(",")]
+    known = {field.value for field in models.SkillField}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise fa.HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return tuple(dict.fromkeys(models.SkillField(name) for name in names))
+
+
+SparseFields = Annotated[tuple[models.SkillField, ...], fa.Depends(sparse_fields)]
+
+# Maximum number of ids or names of a batch lookup.
+MAX_LOOKUP_KEYS = 1000
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=Sequence[models.Skill],
+    responses={
+        304: {"description": "The skills haven't changed since the given ETag"},
+        400: {"description": "Invalid cursor"},
+    },
+)
+async def get_skills(
+    session: deps.ReadDBSession,
+    request: fa.Request,
     response: fa.Response,
-    limit: Annotated[int, fa.Query()] = 15,
+    fields: SparseFields,
+    limit: Annotated[int, fa.Query(gt=0)] = 15,
     offset: Annotated[int, fa.Query()] = 0,
-) -> Sequence[models.Skill]:
-    (skills, count) = crud.get_skills(session=session, offset=offset, limit=limit)
-    response.headers["X-Total-Count"] = str(count)
-    response.headers["X-Offset"] = str(offset)
+    cursor: Annotated[
+        Optional[str],
+        fa.Query(
+            description="Cursor from the X-Next-Cursor header of the previous page. "
+            "When given, the offset is ignored."
+        ),
+    ] = None,
+    sort: Annotated[
+        pagination.SortField,
+        fa.Query(
+            description="Column the skills are sorted by, the skills with the "
+            "same level of confidence are sorted by name."
+        ),
+    ] = pagination.SortField.SKILL_ID,
+    order: Annotated[
+        pagination.SortOrder, fa.Query(description="Direction of the sort.")
+    ] = pagination.SortOrder.ASC,
+    level: Annotated[
+        Optional[models.LevelOfConfidence],
+        fa.Query(description="Only list the skills with this level of confidence."),
+    ] = None,
+    total: Annotated[
+        pagination.TotalCountMode,
+        fa.Query(
+            description="How X-Total-Count is computed: an exact count, the "
+            "maintained counters or not at all."
+        ),
+    ] = pagination.TotalCountMode.CACHED,
+) -> Any:
+    version = await async_crud.run(session, crud.get_skills_version)
+    not_modified = http_cache.conditional_response(
+        request,
+        response,
+        version=version,
+        cache_control=http_cache.http_cache_settings.LIST_CACHE_CONTROL,
+    )
+    if not_modified is not None:
+        return not_modified
+    next_cursor: Optional[str]
+    if cursor is None:
+        (skills, count) = await async_crud.run(
+            session,
+            crud.get_skill_rows,
+            fields=fields,
+            offset=offset,
+            limit=limit,
+            sort_by=sort,
+            order=order,
+            level=level,
+            total=total,
+        )
+        next_cursor = None
+        has_more = (
+            len(skills) == limit if count is None else offset + len(skills) < count
+        )
+        if skills and has_more:
+            next_cursor = crud.skill_cursor(skills[-1], sort_by=sort, order=order)
+        response.headers["X-Offset"] = str(offset)
+    else:
+        try:
+            (skills, next_cursor) = await async_crud.run(
+                session,
+                crud.get_skill_rows_page,
+                fields=fields,
+                cursor=cursor,
+                limit=limit,
+                sort_by=sort,
+                order=order,
+                level=level,
+            )
+        except pagination.InvalidCursorError as error:
+            raise fa.HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+            ) from error
+        count = await async_crud.run(
+            session, crud.count_skills, mode=total, level=level
+        )
+    if count is not None:
+        response.headers["X-Total-Count"] = str(count)
+    response.headers["X-Limit"] = str(limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return serializers.skill_rows_json_response(skills, fields, response)
+
+
+@router.get(
+    "/stats",
+    status_code=status.HTTP_200_OK,
+    response_model=models.SkillStats,
+    responses={304: {"description": "The skills haven't changed since the given ETag"}},
+)
+async def get_skill_stats(
+    session: deps.ReadDBSession,
+    request: fa.Request,
+    response: fa.Response,
+    exact: Annotated[
+        bool,
+        fa.Query(
+            description="Count the skill table instead of reading the counters "
+            "maintained on every write."
+        ),
+    ] = False,
+) -> Any:
+    version = await async_crud.run(session, crud.get_skills_version)
+    not_modified = http_cache.conditional_response(
+        request,
+        response,
+        version=version,
+        cache_control=http_cache.http_cache_settings.ITEM_CACHE_CONTROL,
+    )
+    if not_modified is not None:
+        return not_modified
+    return await async_crud.run(session, crud.get_skill_stats, exact=exact)
+
+
+@router.get(
+    "/search",
+    status_code=status.HTTP_200_OK,
+    response_model=Sequence[models.Skill],
+    responses={
+        304: {"description": "The skills haven't changed since the given ETag"},
+        400: {"description": "Invalid cursor"},
+    },
+)
+async def search_skills(
+    session: deps.ReadDBSession,
+    request: fa.Request,
+    response: fa.Response,
+    fields: SparseFields,
+    q: Annotated[
+        str,
+        fa.Query(
+            min_length=1,
+            description="Words the skill names have words starting with, "
+            "case insensitive. The best matches come first.",
+        ),
+    ],
+    limit: Annotated[int, fa.Query(gt=0)] = 15,
+    cursor: Annotated[
+        Optional[str],
+        fa.Query(
+            description="Cursor from the X-Next-Cursor header of the previous page."
+        ),
+    ] = None,
+) -> Any:
+    version = await async_crud.run(session, crud.get_skills_version)
+    not_modified = http_cache.conditional_response(
+        request,
+        response,
+        version=version,
+        cache_control=http_cache.http_cache_settings.LIST_CACHE_CONTROL,
+    )
+    if not_modified is not None:
+        return not_modified
+    try:
+        (skills, next_cursor) = await async_crud.run(
+            session,
+            crud.search_skill_rows,
+            fields=fields,
+            query=q,
+            cursor=cursor,
+            limit=limit,
+        )
+    except pagination.InvalidCursorError as error:
+        raise fa.HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+        ) from error
     response.headers["X-Limit"] = str(limit)
-    return skills
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return serializers.skill_rows_json_response(skills, fields, response)
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    response_class=responses.StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}, "text/csv": {}},
+            "description": "All the skills, ordered by id",
+        }
+    },
+)
+async def export_skills(
+    session_factory: deps.ReadSessionFactory,
+    export_format: Annotated[
+        export.ExportFormat,
+        fa.Query(alias="format", description="Format of the export."),
+    ] = export.ExportFormat.NDJSON,
+) -> responses.StreamingResponse:
+    return responses.StreamingResponse(
+        export.stream_skills(
+            session_factory=session_factory, export_format=export_format
+        ),
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="skills.{export_format}"'
+        },
+    )
 
 
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
-    responses={409: {"description": "Conflicting request"}},
+    responses={
+        200: {"description": "Skill already added, ignored or updated"},
+        409: {"description": "Conflicting request"},
+    },
     response_class=responses.JSONResponse,
 )
-def post_skill(
-    session: Annotated[sqlmodel.Session, fa.Depends(deps.get_db_session)],
+async def post_skill(
+    session: deps.DBSession,
+    response: fa.Response,
     skill: Annotated[
         models.SkillBase,
         fa.Body(
@@ -72,74 +323,265 @@ def post_skill(
             },
         ),
     ],
+    on_conflict: Annotated[
+        models.OnConflict,
+        fa.Query(
+            description="error answers 409 when the skill already exists, ignore "
+            "keeps the existing skill and update overwrites its level of confidence."
+        ),
+    ] = models.OnConflict.ERROR,
 ) -> Dict[str, str]:
-    if not crud.get_skill_by_name(session=session, skill_name=skill.skill_name):
-        crud.create_skill(session=session, skill=skill)
+    result = await async_crud.run(
+        session, crud.create_skill, skill=skill, on_conflict=on_conflict
+    )
+    if result.status is models.CreationStatus.CREATED:
         return {"message": "Skill added successfully"}
-    raise fa.HTTPException(
-        status_code=status.HTTP_409_CONFLICT, detail="Skill already added"
+    if result.status is models.CreationStatus.UPDATED:
+        response.status_code = status.HTTP_200_OK
+        return {"message": "Skill updated successfully"}
+    if on_conflict is models.OnConflict.ERROR:
+        raise fa.HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Skill already added"
+        )
+    response.status_code = status.HTTP_200_OK
+    return {"message": "Skill already added"}
+
+
+@router.post(
+    "/batch",
+    status_code=status.HTTP_201_CREATED,
+    response_model=list[models.SkillCreationResult],
+    response_model_exclude_none=True,
+)
+async def post_skills_batch(
+    session: deps.DBSession,
+    skills: Annotated[
+        list[models.SkillBase],
+        fa.Body(description="Skills to add to the DB."),
+    ],
+    chunk_size: Annotated[
+        Optional[int],
+        fa.Query(
+            gt=0,
+            description="Number of skills inserted per transaction. "
+            "Defaults to the BATCH_CHUNK_SIZE setting.",
+        ),
+    ] = None,
+) -> list[models.SkillCreationResult]:
+    return await async_crud.run(
+        session,
+        crud.create_skills,
+        skills=skills,
+        chunk_size=chunk_size or config.db_settings.BATCH_CHUNK_SIZE,
+    )
+
+
+@router.post(
+    "/import",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=models.ImportJob,
+)
+async def import_skills(
+    session_factory: deps.JobSessionFactory,
+    background_tasks: fa.BackgroundTasks,
+    response: fa.Response,
+    file: Annotated[
+        fa.UploadFile,
+        fa.File(description="NDJSON or CSV file of skills, CSV needs a header."),
+    ],
+    import_format: Annotated[
+        imports.ImportFormat,
+        fa.Query(alias="format", description="Format of the file."),
+    ] = imports.ImportFormat.NDJSON,
+    chunk_size: Annotated[
+        Optional[int],
+        fa.Query(
+            gt=0,
+            description="Number of skills validated and inserted per transaction. "
+            "Defaults to the BATCH_CHUNK_SIZE setting.",
+        ),
+    ] = None,
+) -> models.ImportJob:
+    path = await imports.save_upload(file)
+    job = imports.import_jobs.create()
+    background_tasks.add_task(
+        imports.run_import,
+        job_id=job.job_id,
+        path=path,
+        import_format=import_format,
+        session_factory=session_factory,
+        chunk_size=chunk_size or config.db_settings.BATCH_CHUNK_SIZE,
+    )
+    response.headers["Location"] = f"{router.prefix}/import/{job.job_id}"
+    return job
+
+
+@router.get(
+    "/import/{job_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=models.ImportJob,
+    responses={404: {"description": "Import job not found"}},
+)
+async def get_import_job(
+    job_id: Annotated[str, fa.Path(title="The ID of the import job")],
+) -> models.ImportJob:
+    job = imports.import_jobs.get(job_id)
+    if job is None:
+        raise fa.HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import job {job_id} not found",
+        )
+    return job
+
+
+@router.post(
+    "/lookup/id",
+    status_code=status.HTTP_200_OK,
+    response_model=models.SkillLookup,
+)
+async def lookup_skills_by_id(
+    session: deps.ReadDBSession,
+    response: fa.Response,
+    fields: SparseFields,
+    skill_ids: Annotated[
+        list[int],
+        fa.Body(max_length=MAX_LOOKUP_KEYS, description="IDs of the skills to get."),
+    ],
+) -> Any:
+    skills, missing = await async_crud.run(
+        session,
+        crud.get_skill_fields_by_ids,
+        skill_ids=skill_ids,
+        fields=fields,
+        chunk_size=config.db_settings.LOOKUP_CHUNK_SIZE,
+    )
+    return serializers.skill_lookup_json_response(skills, missing, response)
+
+
+@router.post(
+    "/lookup/name",
+    status_code=status.HTTP_200_OK,
+    response_model=models.SkillLookup,
+)
+async def lookup_skills_by_name(
+    session: deps.ReadDBSession,
+    response: fa.Response,
+    fields: SparseFields,
+    skill_names: Annotated[
+        list[str],
+        fa.Body(max_length=MAX_LOOKUP_KEYS, description="Names of the skills to get."),
+    ],
+) -> Any:
+    skills, missing = await async_crud.run(
+        session,
+        crud.get_skill_fields_by_names,
+        skill_names=skill_names,
+        fields=fields,
+        chunk_size=config.db_settings.LOOKUP_CHUNK_SIZE,
     )
+    return serializers.skill_lookup_json_response(skills, missing, response)
 
 
 @router.get(
-    "/id/{skill_id}", status_code=status.HTTP_200_OK, response_model=models.Skill
+    "/id/{skill_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=models.Skill,
+    responses={304: {"description": "The skill hasn't changed since the given ETag"}},
 )
-def get_skill_by_id(
-    session: Annotated[sqlmodel.Session, fa.Depends(deps.get_db_session)],
+async def get_skill_by_id(
+    session: deps.ReadDBSession,
+    request: fa.Request,
+    response: fa.Response,
     skill_id: Annotated[int, fa.Path(title="The ID of the skill to get")],
-) -> models.Skill:
-    skill_db: Optional[models.Skill] = crud.get_skill_by_id(
-        session=session, skill_id=skill_id
+    fields: SparseFields,
+) -> Any:
+    version = await async_crud.run(session, crud.get_skills_version)
+    not_modified = http_cache.conditional_response(
+        request,
+        response,
+        version=version,
+        cache_control=http_cache.http_cache_settings.ITEM_CACHE_CONTROL,
+    )
+    if not_modified is not None:
+        return not_modified
+    skill_db = await async_crud.run(
+        session,
+        crud.get_skill_fields_by_id,
+        skill_id=skill_id,
+        fields=fields,
+        version=version,
     )
     if skill_db is None:
         raise fa.HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Skill with id {skill_id} not found",
         )
-    return skill_db
+    return serializers.skill_fields_json_response(skill_db, response)
 
 
 @router.get(
-    "/name/{skill_name}", status_code=status.HTTP_200_OK, response_model=models.Skill
+    "/name/{skill_name}",
+    status_code=status.HTTP_200_OK,
+    response_model=models.Skill,
+    responses={304: {"description": "The skill hasn't changed since the given ETag"}},
 )
-def get_skill_by_name(
-    session: Annotated[sqlmodel.Session, fa.Depends(deps.get_db_session)],
+async def get_skill_by_name(
+    session: deps.ReadDBSession,
+    request: fa.Request,
+    response: fa.Response,
     skill_name: Annotated[str, fa.Path(title="The name of the skill to get")],
-) -> Optional[models.Skill]:
-    skill_db: Optional[models.Skill] = crud.get_skill_by_name(
-        session=session, skill_name=skill_name
+    fields: SparseFields,
+) -> Any:
+    version = await async_crud.run(session, crud.get_skills_version)
+    not_modified = http_cache.conditional_response(
+        request,
+        response,
+        version=version,
+        cache_control=http_cache.http_cache_settings.ITEM_CACHE_CONTROL,
+    )
+    if not_modified is not None:
+        return not_modified
+    skill_db = await async_crud.run(
+        session,
+        crud.get_skill_fields_by_name,
+        skill_name=skill_name,
+        fields=fields,
+        version=version,
     )
     if skill_db is None:
         raise fa.HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Skill with name '{skill_name}' not found",
         )
-    return skill_db
+    return serializers.skill_fields_json_response(skill_db, response)
 
 
 @router.patch(
-    "/{skill_id}", status_code=status.HTTP_200_OK, response_model=models.Skill
+    "/{skill_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=models.Skill,
+    responses={409: {"description": "Conflicting request"}},
 )
-def update_skill(
-    session: Annotated[sqlmodel.Session, fa.Depends(deps.get_db_session)],
+async def update_skill(
+    session: deps.DBSession,
     skill_id: Annotated[int, fa.Path(title="ID of the skill to update")],
     skill: Annotated[
-        models.SkillBase,
-        fa.Body(title="Body of the modified skill"),
+        models.SkillUpdate,
+        fa.Body(title="Fields of the skill to modify"),
     ],
 ) -> Any:
-    skill_to_update = crud.get_skill_by_id(session=session, skill_id=skill_id)
-    if skill_to_update is None:
+    try:
+        skill_updated = await async_crud.run(
+            session, crud.update_skill, skill_id=skill_id, skill=skill
+        )
+    except exc.IntegrityError as error:
+        raise fa.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Skill with name '{skill.skill_name}' already exists",
+        ) from error
+    if skill_updated is None:
         raise fa.HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Skill with Id {skill_id} not found",
         )
-    skill_name_received = skill.skill_name
-    skill_level_received = skill.level_of_confidence
-    crud.update_skill_if_changed(
-        session=session,
-        skill=skill_to_update,
-        skill_name=skill_name_received,
-        skill_level=skill_level_received,
-    )
-    return crud.get_skill_by_id(session=session, skill_id=skill_id)
+    return skill_updated
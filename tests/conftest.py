@@ -7,7 +7,7 @@ from loguru import logger
 import sqlmodel
 
 from skillventory import main
-from skillventory.data import crud, dependencies
+from skillventory.data import cache, crud, dependencies
 from skillventory.database import config
 from skillventory.models import models
 
@@ -40,6 +40,13 @@ def override_get_db_session() -> Any:
             yield session
 
     main.app.dependency_overrides[dependencies.get_db_session] = get_db_session
+    main.app.dependency_overrides[dependencies.get_read_db_session] = get_db_session
+    main.app.dependency_overrides[dependencies.get_read_session_factory] = lambda: (
+        lambda: sqlmodel.Session(config.testing_engine)
+    )
+    main.app.dependency_overrides[dependencies.get_job_session_factory] = lambda: (
+        lambda: sqlmodel.Session(config.testing_engine)
+    )
     try:
         yield config.Base.metadata.create_all(bind=config.testing_engine)
     finally:
@@ -57,7 +64,9 @@ def setup_db(get_db_session: sqlmodel.Session) -> Any:
     and drop all tables after each test finishes using the
     provided database session. It is function scoped and
     auto-used to setup/teardown the database for all tests.
+    The skill lookup cache is emptied as the database it mirrors.
     """
+    cache.skill_cache.clear()
     try:
         yield config.Base.metadata.create_all(bind=get_db_session.get_bind())
     finally:
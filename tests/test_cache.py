@@ -0,0 +1,170 @@
+from collections.abc import Callable
+
+import pytest
+import sqlmodel
+
+from skillventory.data import cache, crud
+from skillventory.models import models
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRUTTLCache:
+    def test_evicts_least_recently_used(self) -> None:
+        lru_cache: cache.LRUTTLCache[str, int] = cache.LRUTTLCache(max_size=2, ttl=60)
+        lru_cache.set("a", 1)
+        lru_cache.set("b", 2)
+        lru_cache.get("a")
+
+        lru_cache.set("c", 3)
+
+        assert lru_cache.get("b") is cache.MISSING
+        assert lru_cache.get("a") == 1
+        assert lru_cache.stats().evictions == 1
+
+    def test_expires(self) -> None:
+        clock = FakeClock()
+        lru_cache: cache.LRUTTLCache[str, int] = cache.LRUTTLCache(
+            max_size=2, ttl=60, clock=clock
+        )
+        lru_cache.set("a", 1)
+
+        clock.now = 61
+
+        assert lru_cache.get("a") is cache.MISSING
+        assert lru_cache.stats().size == 0
+
+    def test_counters(self) -> None:
+        lru_cache: cache.LRUTTLCache[str, None] = cache.LRUTTLCache(max_size=2, ttl=60)
+        lru_cache.set("a", None)
+
+        lru_cache.get("a")
+        lru_cache.get("b")
+
+        assert lru_cache.stats() == cache.CacheStats(
+            hits=1, misses=1, evictions=0, size=1, max_size=2
+        )
+
+    def test_disabled(self) -> None:
+        lru_cache: cache.LRUTTLCache[str, int] = cache.LRUTTLCache(max_size=0, ttl=60)
+        lru_cache.set("a", 1)
+
+        assert lru_cache.get("a") is cache.MISSING
+
+
+class TestSkillCache:
+    def test_lookups_are_cached(
+        self,
+        get_db_session: sqlmodel.Session,
+        factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+    ) -> None:
+        factory_skills_in_db(1)
+        hits = cache.skill_cache.stats().hits
+
+        crud.get_skill_by_id(session=get_db_session, skill_id=1)
+        skill = crud.get_skill_by_name(session=get_db_session, skill_name="python_0")
+
+        assert cache.skill_cache.stats().hits == hits + 1
+        assert skill is not None
+        assert skill.skill_id == 1
+
+    def test_negative_lookup_is_invalidated_by_create(
+        self,
+        get_db_session: sqlmodel.Session,
+        factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+    ) -> None:
+        assert crud.get_skill_by_id(session=get_db_session, skill_id=1) is None
+
+        factory_skills_in_db(1)
+
+        assert crud.get_skill_by_id(session=get_db_session, skill_id=1) is not None
+
+    def test_rename_invalidates_old_name(
+        self,
+        get_db_session: sqlmodel.Session,
+        factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+    ) -> None:
+        factory_skills_in_db(1)
+        crud.get_skill_by_name(session=get_db_session, skill_name="python_0")
+
+        crud.update_skill(
+            session=get_db_session,
+            skill_id=1,
+            skill=models.SkillUpdate(skill_name="Java"),
+        )
+
+        assert (
+            crud.get_skill_by_name(session=get_db_session, skill_name="python_0")
+            is None
+        )
+        skill = crud.get_skill_by_id(session=get_db_session, skill_id=1)
+        assert skill is not None
+        assert skill.skill_name == "Java"
+
+    def test_delete_invalidates(
+        self,
+        get_db_session: sqlmodel.Session,
+        factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+    ) -> None:
+        factory_skills_in_db(1)
+        skill = crud.get_skill_by_id(session=get_db_session, skill_id=1)
+
+        crud.delete_skill(session=get_db_session, skill=skill)
+
+        assert crud.get_skill_by_id(session=get_db_session, skill_id=1) is None
+
+    def test_batch_create_discards_only_its_keys(
+        self, get_db_session: sqlmodel.Session, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        crud.get_skill_by_id(session=get_db_session, skill_id=1)
+        crud.get_skill_by_name(session=get_db_session, skill_name="Python")
+
+        def discard_if(predicate: Callable[[object], bool]) -> None:
+            raise AssertionError
+
+        monkeypatch.setattr(cache.skill_cache, "discard_if", discard_if)
+        crud.create_skills(
+            session=get_db_session,
+            skills=[
+                models.SkillBase(
+                    skill_name="Python",
+                    level_of_confidence=models.LevelOfConfidence.LEVEL_1,
+                )
+            ],
+        )
+
+        assert crud.get_skill_by_id(session=get_db_session, skill_id=1) is not None
+        assert (
+            crud.get_skill_by_name(session=get_db_session, skill_name="Python")
+            is not None
+        )
+
+    def test_entry_of_another_version_is_read_again(
+        self,
+        get_db_session: sqlmodel.Session,
+        factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+    ) -> None:
+        factory_skills_in_db(1)
+        version = crud.get_skills_version(get_db_session)
+        stale = {
+            "skill_id": 1,
+            "skill_name": "stale",
+            "level_of_confidence": models.LevelOfConfidence.LEVEL_1,
+        }
+        cache.skill_cache.set(("id", 1), cache.CachedSkill(stale, version - 1))
+
+        columns = crud.get_skill_fields_by_id(
+            session=get_db_session,
+            skill_id=1,
+            fields=[models.SkillField.SKILL_NAME],
+            version=version,
+        )
+
+        assert columns == {"skill_name": "python_0"}
+        assert cache.skill_cache.get(("id", 1)).version == version
@@ -0,0 +1,101 @@
+import gzip
+from collections.abc import Callable
+from typing import Optional
+
+import pytest
+from fastapi import status, testclient
+
+from skillventory import compression, main
+from skillventory.models import models
+
+client = testclient.TestClient(app=main.app)
+
+# Enough skills for the listing to be over the compression threshold.
+NUMBER_OF_SKILLS = 30
+
+
+@pytest.fixture
+def _skills_in_db(
+    factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+) -> None:
+    compression.compressed_cache.clear()
+    factory_skills_in_db(NUMBER_OF_SKILLS)
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected_encoding"),
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip;q=0.5, deflate", "gzip"),
+        ("gzip;q=0", None),
+        ("*;q=0.1, gzip;q=0", "br" if compression.brotli is not None else None),
+    ],
+)
+def test_negotiate_encoding(
+    accept_encoding: Optional[str], expected_encoding: Optional[str]
+) -> None:
+    assert compression.negotiate_encoding(accept_encoding) == expected_encoding
+
+
+@pytest.mark.usefixtures("override_get_db_session", "_skills_in_db")
+class TestCompressionMiddleware:
+    def test_compresses_large_responses(self) -> None:
+        identity = client.get("/v1/skills/?limit=30", headers={"Accept-Encoding": ""})
+
+        response = client.get(
+            "/v1/skills/?limit=30", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert response.headers["ETag"] == identity.headers["ETag"][:-1] + '-gzip"'
+        assert int(response.headers["Content-Length"]) < len(identity.content)
+        assert response.json() == identity.json()
+
+    def test_skips_small_responses(self) -> None:
+        response = client.get("/v1/skills/id/1", headers={"Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in response.headers
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+    def test_revalidates_compressed_responses(self) -> None:
+        headers = {"Accept-Encoding": "gzip"}
+        etag = client.get("/v1/skills/?limit=30", headers=headers).headers["ETag"]
+
+        not_modified = client.get(
+            "/v1/skills/?limit=30", headers={**headers, "If-None-Match": etag}
+        )
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified.headers["ETag"] == etag
+
+    def test_caches_compressed_pages(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls = []
+
+        def compress(body: bytes, encoding: str) -> bytes:
+            calls.append(encoding)
+            return gzip.compress(body)
+
+        monkeypatch.setattr(compression, "compress", compress)
+        for _ in range(2):
+            client.get("/v1/skills/?limit=30", headers={"Accept-Encoding": "gzip"})
+
+        assert calls == ["gzip"]
+
+
+@pytest.mark.parametrize("accept_encoding", ["", "gzip", "br"])
+def test_landing_page(accept_encoding: str) -> None:
+    if accept_encoding == "br":
+        pytest.importorskip("brotli")
+    headers = {"Accept-Encoding": accept_encoding}
+
+    response = client.get("/skills", headers=headers)
+    not_modified = client.get(
+        "/skills", headers={**headers, "If-None-Match": response.headers["ETag"]}
+    )
+
+    assert response.headers.get("Content-Encoding") == (accept_encoding or None)
+    assert response.text.startswith("<!doctype html>")
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,78 @@
+import pathlib
+from typing import Optional
+
+import pydantic
+import pytest
+import sqlmodel
+
+from skillventory.database import config
+
+
+@pytest.mark.parametrize(
+    ("settings", "expected_pragmas"),
+    [
+        ({}, {}),
+        ({"SYNCHRONOUS": "FULL"}, {"synchronous": "FULL"}),
+        (
+            {"SQLITE_PROFILE": "production", "BUSY_TIMEOUT": 100},
+            {**config.SQLITE_PROFILES["production"], "busy_timeout": 100},
+        ),
+    ],
+)
+def test_pragmas(
+    settings: dict[str, object], expected_pragmas: dict[str, object]
+) -> None:
+    db_settings = config.DBSettings.model_validate(settings)
+
+    assert db_settings.pragmas() == expected_pragmas
+
+
+def test_apply_pragmas(tmp_path: pathlib.Path) -> None:
+    engine = sqlmodel.create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    pragmas = config.DBSettings(SQLITE_PROFILE="production").pragmas()
+
+    config.apply_pragmas(engine, pragmas)
+    pragmas_in_effect = config.get_pragmas(engine)
+
+    assert pragmas_in_effect["journal_mode"] == "wal"
+    assert pragmas_in_effect["mmap_size"] == pragmas["mmap_size"]
+    assert pragmas_in_effect["cache_size"] == pragmas["cache_size"]
+    assert pragmas_in_effect["busy_timeout"] == pragmas["busy_timeout"]
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    ("url", "expected_url"),
+    [
+        ("sqlite:///./database.db", "sqlite:///file:./database.db?mode=ro&uri=true"),
+        (
+            "sqlite+aiosqlite:////tmp/database.db",
+            "sqlite+aiosqlite:///file:/tmp/database.db?mode=ro&uri=true",
+        ),
+        ("sqlite://", None),
+        ("sqlite:///:memory:", None),
+        ("sqlite+libsql://localhost:8080", None),
+    ],
+)
+def test_read_only_url(url: str, expected_url: Optional[str]) -> None:
+    read_url = config.read_only_url(url)
+
+    assert (None if read_url is None else str(read_url)) == expected_url
+
+
+def test_lazy_engines() -> None:
+    engine = config.get_engine()
+
+    assert config.engine is engine
+    assert config.get_engine() is engine
+
+
+def test_unknown_attribute() -> None:
+    with pytest.raises(AttributeError):
+        config.unknown_engine  # noqa: B018
+
+
+@pytest.mark.parametrize("name", ["BATCH_CHUNK_SIZE", "POOL_SIZE", "READ_POOL_SIZE"])
+def test_sizes_must_be_positive(name: str) -> None:
+    with pytest.raises(pydantic.ValidationError):
+        config.DBSettings.model_validate({name: 0})
@@ -1,10 +1,12 @@
-from collections.abc import Callable, Sequence
+import math
+from collections.abc import Callable, Iterator, Sequence
 from typing import Any, Literal, Optional
 
 import pytest
+import sqlalchemy
 import sqlmodel
 
-from skillventory.data import crud
+from skillventory.data import crud, pagination
 from skillventory.models import models
 
 
@@ -38,6 +40,49 @@ def test_create_skill(
         assert f"Skill {skill.skill_name} already exist" in caplog.text
 
 
+@pytest.mark.parametrize(
+    ("on_conflict", "expected_status", "expected_level"),
+    [
+        (
+            models.OnConflict.ERROR,
+            models.CreationStatus.CONFLICT,
+            models.LevelOfConfidence.LEVEL_1,
+        ),
+        (
+            models.OnConflict.IGNORE,
+            models.CreationStatus.CONFLICT,
+            models.LevelOfConfidence.LEVEL_1,
+        ),
+        (
+            models.OnConflict.UPDATE,
+            models.CreationStatus.UPDATED,
+            models.LevelOfConfidence.LEVEL_2,
+        ),
+    ],
+)
+def test_create_skill_on_conflict(
+    get_db_session: sqlmodel.Session,
+    factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+    on_conflict: models.OnConflict,
+    expected_status: models.CreationStatus,
+    expected_level: models.LevelOfConfidence,
+) -> None:
+    skill_model = factory_skills_in_db(1)[0].model_copy(
+        update={"level_of_confidence": models.LevelOfConfidence.LEVEL_2}
+    )
+
+    result = crud.create_skill(
+        session=get_db_session, skill=skill_model, on_conflict=on_conflict
+    )
+    skill = crud.get_skill_by_name(
+        session=get_db_session, skill_name=skill_model.skill_name
+    )
+
+    assert result.status is expected_status
+    assert skill is not None
+    assert skill.level_of_confidence is expected_level
+
+
 @pytest.mark.parametrize("skill_id", [1, 2])
 def test_delete_skill(
     get_db_session: sqlmodel.Session,
@@ -105,21 +150,19 @@ class TestUpdateSkill:
         caplog: Any,
     ) -> None:
         new_skill_name: str = "Java"
-        skill = crud.get_skill_by_id(session=get_db_session, skill_id=skill_id)
+
+        crud.update_skill(
+            session=get_db_session,
+            skill_id=skill_id,
+            skill=models.SkillUpdate(skill_name=new_skill_name),
+        )
+        skill_updated: Optional[models.Skill] = crud.get_skill_by_id(
+            session=get_db_session, skill_id=skill_id
+        )
 
         if expected_warning:
             assert f"The skill with id {skill_id} doesn't exist" in caplog.text
         else:
-            crud.update_skill_if_changed(
-                session=get_db_session,
-                skill=skill,
-                skill_name=new_skill_name,
-                skill_level=skill.level_of_confidence,
-            )
-            skill_updated: Optional[models.Skill] = crud.get_skill_by_id(
-                session=get_db_session, skill_id=skill_id
-            )
-
             assert skill_updated is not None
             assert skill_updated.skill_id == skill_id
             assert skill_updated.skill_name == new_skill_name
@@ -133,12 +176,11 @@ class TestUpdateSkill:
         caplog: Any,
     ) -> None:
         new_level_of_confidence = models.LevelOfConfidence.LEVEL_2
-        skill = crud.get_skill_by_id(session=get_db_session, skill_id=skill_id)
 
-        crud._update_skill_level_of_confidence(
+        crud.update_skill(
             session=get_db_session,
-            skill=skill,
-            new_level=new_level_of_confidence,
+            skill_id=skill_id,
+            skill=models.SkillUpdate(level_of_confidence=new_level_of_confidence),
         )
         skill_updated: Optional[models.Skill] = crud.get_skill_by_id(
             session=get_db_session, skill_id=skill_id
@@ -152,6 +194,23 @@ class TestUpdateSkill:
             assert skill_updated.level_of_confidence == new_level_of_confidence
 
 
+@pytest.mark.usefixtures("_create_one_skill_in_db")
+@pytest.mark.parametrize(("skill_id", "expected_none"), [(1, False), (2, True)])
+def test_update_skill(
+    get_db_session: sqlmodel.Session, skill_id: int, expected_none: bool
+) -> None:
+    changes = models.SkillUpdate(skill_name="Java")
+
+    skill = crud.update_skill(session=get_db_session, skill_id=skill_id, skill=changes)
+
+    if expected_none:
+        assert skill is None
+    else:
+        assert skill is not None
+        assert skill.skill_name == "Java"
+        assert skill.level_of_confidence is models.LevelOfConfidence.LEVEL_1
+
+
 class TestGetSkills:
     @pytest.mark.parametrize("number_of_skills", [0, 1, 2])
     def test_quantity_and_attributes(
@@ -204,3 +263,488 @@ class TestGetSkills:
         (skills_db, _) = crud.get_skills(session=get_db_session, offset=offset)
 
         assert len(skills_db) == number_of_skills_received
+
+
+SKILLS_WITH_LEVELS = 16
+
+
+@pytest.fixture
+def _skills_with_levels(get_db_session: sqlmodel.Session) -> None:
+    levels = list(models.LevelOfConfidence)
+    crud.create_skills(
+        session=get_db_session,
+        skills=[
+            models.SkillBase(
+                skill_name=f"skill_{number:02}",
+                level_of_confidence=levels[number % len(levels)],
+            )
+            for number in range(SKILLS_WITH_LEVELS)
+        ],
+    )
+
+
+def _expected_names(
+    session: sqlmodel.Session,
+    sort_by: pagination.SortField,
+    order: pagination.SortOrder,
+    level: Optional[models.LevelOfConfidence] = None,
+) -> list[str]:
+    levels = list(models.LevelOfConfidence)
+    skills = [
+        skill
+        for skill in session.exec(sqlmodel.select(models.Skill)).all()
+        if level is None or skill.level_of_confidence is level
+    ]
+    if sort_by is pagination.SortField.LEVEL_OF_CONFIDENCE:
+        skills.sort(
+            key=lambda skill: (
+                levels.index(skill.level_of_confidence),
+                skill.skill_name,
+            )
+        )
+    else:
+        skills.sort(key=lambda skill: getattr(skill, sort_by.value))
+    if order is pagination.SortOrder.DESC:
+        skills.reverse()
+    return [skill.skill_name for skill in skills]
+
+
+@pytest.mark.usefixtures("_skills_with_levels")
+class TestSortAndFilter:
+    @pytest.mark.parametrize("sort_by", list(pagination.SortField))
+    @pytest.mark.parametrize("order", list(pagination.SortOrder))
+    @pytest.mark.parametrize("level", [None, models.LevelOfConfidence.LEVEL_2])
+    def test_get_skills(
+        self,
+        get_db_session: sqlmodel.Session,
+        sort_by: pagination.SortField,
+        order: pagination.SortOrder,
+        level: Optional[models.LevelOfConfidence],
+    ) -> None:
+        (skills_db, count) = crud.get_skills(
+            session=get_db_session, limit=20, sort_by=sort_by, order=order, level=level
+        )
+
+        expected_names = _expected_names(get_db_session, sort_by, order, level)
+        assert [skill.skill_name for skill in skills_db] == expected_names
+        assert count == len(expected_names)
+
+    @pytest.mark.parametrize("total", list(pagination.TotalCountMode))
+    def test_count_by_level(
+        self, get_db_session: sqlmodel.Session, total: pagination.TotalCountMode
+    ) -> None:
+        count = crud.count_skills(
+            session=get_db_session,
+            mode=total,
+            level=models.LevelOfConfidence.LEVEL_3,
+        )
+
+        assert count == (None if total is pagination.TotalCountMode.NONE else 5)
+
+    @pytest.mark.parametrize("sort_by", list(pagination.SortField))
+    @pytest.mark.parametrize("order", list(pagination.SortOrder))
+    @pytest.mark.parametrize("level", [None, models.LevelOfConfidence.LEVEL_1])
+    def test_sorted_by_index(
+        self,
+        get_db_session: sqlmodel.Session,
+        sort_by: pagination.SortField,
+        order: pagination.SortOrder,
+        level: Optional[models.LevelOfConfidence],
+    ) -> None:
+        statements: list[str] = []
+        engine = get_db_session.get_bind()
+
+        def record(*args: Any) -> None:
+            statements.append(args[2])
+
+        sqlalchemy.event.listen(engine, "before_cursor_execute", record)
+        try:
+            (_, cursor) = crud.get_skills_page(
+                session=get_db_session,
+                limit=2,
+                sort_by=sort_by,
+                order=order,
+                level=level,
+            )
+            crud.get_skills_page(
+                session=get_db_session,
+                cursor=cursor,
+                limit=2,
+                sort_by=sort_by,
+                order=order,
+                level=level,
+            )
+        finally:
+            sqlalchemy.event.remove(engine, "before_cursor_execute", record)
+
+        connection = get_db_session.connection()
+        for statement in statements:
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}",
+                tuple(None for _ in range(statement.count("?"))),
+            ).all()
+            assert not any("TEMP B-TREE" in row[-1] for row in plan)
+
+
+class TestGetSkillsPage:
+    @pytest.mark.usefixtures("_skills_with_levels")
+    @pytest.mark.parametrize("sort_by", list(pagination.SortField))
+    @pytest.mark.parametrize("order", list(pagination.SortOrder))
+    def test_walk_all_pages(
+        self,
+        get_db_session: sqlmodel.Session,
+        sort_by: pagination.SortField,
+        order: pagination.SortOrder,
+    ) -> None:
+        names_received: list[str] = []
+        cursor: Optional[str] = None
+
+        for _ in range(3):
+            (skills_db, cursor) = crud.get_skills_page(
+                session=get_db_session,
+                cursor=cursor,
+                limit=7,
+                sort_by=sort_by,
+                order=order,
+            )
+            names_received.extend(skill.skill_name for skill in skills_db)
+            if cursor is None:
+                break
+
+        assert cursor is None
+        assert names_received == _expected_names(get_db_session, sort_by, order)
+
+    def test_empty_page(
+        self,
+        get_db_session: sqlmodel.Session,
+        factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+    ) -> None:
+        factory_skills_in_db(2)
+
+        page = crud.get_skills_page(session=get_db_session, limit=0)
+        rows_page = crud.get_skill_rows_page(
+            session=get_db_session, fields=tuple(models.SkillField), limit=0
+        )
+
+        assert page == ([], None)
+        assert rows_page == ([], None)
+
+    def test_invalid_cursor(self, get_db_session: sqlmodel.Session) -> None:
+        cursor = pagination.encode_cursor(
+            sort_by=pagination.SortField.SKILL_NAME, key="python_0"
+        )
+
+        with pytest.raises(pagination.InvalidCursorError):
+            crud.get_skills_page(session=get_db_session, cursor=cursor)
+
+    @pytest.mark.parametrize(
+        ("sort_by", "key", "order"),
+        [
+            (pagination.SortField.SKILL_NAME, "python_0", pagination.SortOrder.DESC),
+            (
+                pagination.SortField.LEVEL_OF_CONFIDENCE,
+                "LEVEL_1",
+                pagination.SortOrder.ASC,
+            ),
+            (
+                pagination.SortField.LEVEL_OF_CONFIDENCE,
+                ("LEVEL_9", "python_0"),
+                pagination.SortOrder.ASC,
+            ),
+        ],
+    )
+    def test_cursor_not_matching_the_sort(
+        self,
+        get_db_session: sqlmodel.Session,
+        sort_by: pagination.SortField,
+        key: pagination.CursorKey,
+        order: pagination.SortOrder,
+    ) -> None:
+        # Encoded ascending, so the descending listing rejects the first one.
+        cursor = pagination.encode_cursor(sort_by=sort_by, key=key)
+
+        with pytest.raises(pagination.InvalidCursorError):
+            crud.get_skills_page(
+                session=get_db_session, cursor=cursor, sort_by=sort_by, order=order
+            )
+
+
+class TestSearchSkills:
+    @pytest.fixture
+    def _skills_to_search(self, get_db_session: sqlmodel.Session) -> None:
+        crud.create_skills(
+            session=get_db_session,
+            skills=[
+                models.SkillBase(
+                    skill_name=skill_name,
+                    level_of_confidence=models.LevelOfConfidence.LEVEL_1,
+                )
+                for skill_name in ("python", "pytest", "rust", "Django REST")
+            ],
+        )
+
+    @pytest.mark.usefixtures("_skills_to_search")
+    @pytest.mark.parametrize(
+        ("query", "expected_names"),
+        [
+            ("py", {"python", "pytest"}),
+            ("PYTH", {"python"}),
+            ("rest dj", {"Django REST"}),
+            ('"OR *', set()),
+            ("_", set()),
+        ],
+    )
+    def test_prefix_match(
+        self, get_db_session: sqlmodel.Session, query: str, expected_names: set[str]
+    ) -> None:
+        (skills_db, cursor) = crud.search_skills(session=get_db_session, query=query)
+
+        assert {skill.skill_name for skill in skills_db} == expected_names
+        assert cursor is None
+
+    @pytest.mark.usefixtures("_skills_to_search")
+    def test_walk_all_pages(self, get_db_session: sqlmodel.Session) -> None:
+        (first_page, cursor) = crud.search_skills(
+            session=get_db_session, query="py", limit=1
+        )
+        (second_page, last_cursor) = crud.search_skills(
+            session=get_db_session, query="py", cursor=cursor, limit=1
+        )
+
+        assert cursor is not None
+        assert last_cursor is None
+        assert {first_page[0].skill_name, second_page[0].skill_name} == {
+            "python",
+            "pytest",
+        }
+
+    @pytest.mark.usefixtures("_skills_to_search")
+    def test_follows_renames(self, get_db_session: sqlmodel.Session) -> None:
+        crud.update_skill(
+            session=get_db_session,
+            skill_id=3,
+            skill=models.SkillUpdate(skill_name="pyo3"),
+        )
+
+        (skills_db, _) = crud.search_skills(session=get_db_session, query="pyo")
+        (old_names, _) = crud.search_skills(session=get_db_session, query="rust")
+
+        assert [skill.skill_name for skill in skills_db] == ["pyo3"]
+        assert old_names == []
+
+
+@pytest.mark.usefixtures("_skills_with_levels")
+class TestSparseFields:
+    fields = (models.SkillField.SKILL_NAME,)
+
+    def test_get_skill_rows(self, get_db_session: sqlmodel.Session) -> None:
+        (rows, count) = crud.get_skill_rows(
+            session=get_db_session, fields=self.fields, limit=3
+        )
+
+        # The skill_id, the sort column, follows the requested one.
+        assert [tuple(row) for row in rows] == [
+            ("skill_00", 1),
+            ("skill_01", 2),
+            ("skill_02", 3),
+        ]
+        assert count == SKILLS_WITH_LEVELS
+        assert not get_db_session.identity_map
+
+    def test_walk_all_row_pages(self, get_db_session: sqlmodel.Session) -> None:
+        names_received: list[str] = []
+        cursor: Optional[str] = None
+
+        for _ in range(3):
+            (rows, cursor) = crud.get_skill_rows_page(
+                session=get_db_session,
+                fields=self.fields,
+                cursor=cursor,
+                limit=7,
+                sort_by=pagination.SortField.LEVEL_OF_CONFIDENCE,
+                order=pagination.SortOrder.DESC,
+            )
+            names_received.extend(row[0] for row in rows)
+            if cursor is None:
+                break
+
+        assert names_received == _expected_names(
+            get_db_session,
+            pagination.SortField.LEVEL_OF_CONFIDENCE,
+            pagination.SortOrder.DESC,
+        )
+
+    def test_search_skill_rows(self, get_db_session: sqlmodel.Session) -> None:
+        (rows, cursor) = crud.search_skill_rows(
+            session=get_db_session, fields=self.fields, query="skill", limit=15
+        )
+        (last_rows, _) = crud.search_skill_rows(
+            session=get_db_session,
+            fields=self.fields,
+            query="skill",
+            cursor=cursor,
+            limit=15,
+        )
+
+        assert len({row[0] for row in [*rows, *last_rows]}) == SKILLS_WITH_LEVELS
+        assert not get_db_session.identity_map
+
+    @pytest.mark.parametrize(
+        ("get_skill_fields", "key"),
+        [
+            (crud.get_skill_fields_by_id, {"skill_id": 3}),
+            (crud.get_skill_fields_by_name, {"skill_name": "skill_02"}),
+        ],
+    )
+    def test_get_skill_fields(
+        self,
+        get_db_session: sqlmodel.Session,
+        get_skill_fields: Callable[..., Optional[dict[str, Any]]],
+        key: dict[str, Any],
+    ) -> None:
+        fields = (models.SkillField.LEVEL_OF_CONFIDENCE, models.SkillField.SKILL_ID)
+
+        from_database = get_skill_fields(session=get_db_session, fields=fields, **key)
+        from_cache = get_skill_fields(session=get_db_session, fields=fields, **key)
+
+        assert from_database == from_cache
+        assert from_database == {
+            "level_of_confidence": models.LevelOfConfidence.LEVEL_3,
+            "skill_id": 3,
+        }
+        assert not get_db_session.identity_map
+
+    def test_missing_skill_fields(self, get_db_session: sqlmodel.Session) -> None:
+        assert (
+            crud.get_skill_fields_by_id(
+                session=get_db_session, skill_id=100, fields=self.fields
+            )
+            is None
+        )
+
+
+@pytest.mark.usefixtures("_skills_with_levels")
+class TestBatchLookup:
+    @pytest.fixture
+    def statements(self, get_db_session: sqlmodel.Session) -> Iterator[list[str]]:
+        statements: list[str] = []
+        engine = get_db_session.get_bind()
+
+        def record(*args: Any) -> None:
+            statements.append(args[2])
+
+        sqlalchemy.event.listen(engine, "before_cursor_execute", record)
+        yield statements
+        sqlalchemy.event.remove(engine, "before_cursor_execute", record)
+
+    def test_by_ids(
+        self, get_db_session: sqlmodel.Session, statements: list[str]
+    ) -> None:
+        chunk_size = 2
+        skill_ids = [5, 100, 1, 5, 2, 3]
+
+        (skills, missing) = crud.get_skill_fields_by_ids(
+            session=get_db_session,
+            skill_ids=skill_ids,
+            fields=(models.SkillField.SKILL_NAME,),
+            chunk_size=chunk_size,
+        )
+
+        assert [skill["skill_name"] for skill in skills] == [
+            "skill_04",
+            "skill_00",
+            "skill_01",
+            "skill_02",
+        ]
+        assert missing == [100]
+        # The distinct ids are read in chunks.
+        assert len(statements) == math.ceil(len(set(skill_ids)) / chunk_size)
+
+    def test_by_names_from_cache(
+        self, get_db_session: sqlmodel.Session, statements: list[str]
+    ) -> None:
+        skill_names = ["skill_03", "python", "skill_01"]
+        fields = tuple(models.SkillField)
+
+        first = crud.get_skill_fields_by_names(
+            session=get_db_session, skill_names=skill_names, fields=fields
+        )
+        second = crud.get_skill_fields_by_names(
+            session=get_db_session, skill_names=skill_names, fields=fields
+        )
+
+        assert first == second
+        assert [skill["skill_id"] for skill in first[0]] == [4, 2]
+        assert first[1] == ["python"]
+        assert len(statements) == 1
+        assert not get_db_session.identity_map
+
+
+class TestCountSkills:
+    @pytest.mark.parametrize("mode", list(pagination.TotalCountMode))
+    def test_modes(
+        self,
+        get_db_session: sqlmodel.Session,
+        factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+        mode: pagination.TotalCountMode,
+    ) -> None:
+        factory_skills_in_db(3)
+
+        count = crud.count_skills(session=get_db_session, mode=mode)
+
+        assert count == (None if mode is pagination.TotalCountMode.NONE else 3)
+
+    def test_counters_follow_writes(
+        self,
+        get_db_session: sqlmodel.Session,
+        factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+    ) -> None:
+        factory_skills_in_db(3)
+        skill_2 = crud.get_skill_by_id(session=get_db_session, skill_id=2)
+
+        crud.update_skill(
+            session=get_db_session,
+            skill_id=1,
+            skill=models.SkillUpdate(
+                level_of_confidence=models.LevelOfConfidence.LEVEL_3
+            ),
+        )
+        crud.delete_skill(session=get_db_session, skill=skill_2)
+
+        assert crud.count_skills_by_level(session=get_db_session) == {
+            models.LevelOfConfidence.LEVEL_1: 1,
+            models.LevelOfConfidence.LEVEL_2: 0,
+            models.LevelOfConfidence.LEVEL_3: 1,
+        }
+        assert crud.count_skills(
+            session=get_db_session, mode=pagination.TotalCountMode.CACHED
+        ) == crud.count_skills(session=get_db_session)
+        assert crud.count_skills_by_level(
+            session=get_db_session, exact=True
+        ) == crud.count_skills_by_level(session=get_db_session)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 500])
+def test_create_skills(
+    get_db_session: sqlmodel.Session,
+    factory_skills_in_db: Callable[[int], list[models.SkillBase]],
+    factory_skills_models: Callable[[int], list[models.SkillBase]],
+    chunk_size: int,
+) -> None:
+    number_of_skills = 3
+    factory_skills_in_db(1)
+    skills = factory_skills_models(number_of_skills)
+    skills.append(skills[1])
+
+    results = crud.create_skills(
+        session=get_db_session, skills=skills, chunk_size=chunk_size
+    )
+
+    assert [result.status for result in results] == [
+        models.CreationStatus.CONFLICT,
+        models.CreationStatus.CREATED,
+        models.CreationStatus.CREATED,
+        models.CreationStatus.CONFLICT,
+    ]
+    assert [result.skill_id for result in results] == [None, 2, 3, None]
+    assert crud.count_skills(session=get_db_session) == number_of_skills
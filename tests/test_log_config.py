@@ -0,0 +1,86 @@
+import types
+from typing import Any
+
+import pytest
+import sqlmodel
+
+from skillventory import log_config
+from skillventory.data import crud
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_record(level_no: int = 20, line: int = 1) -> Any:
+    return {
+        "level": types.SimpleNamespace(no=level_no),
+        "name": "skillventory.data.crud",
+        "function": "get_skill_by_id",
+        "line": line,
+        "extra": {},
+    }
+
+
+class TestCallSiteRateLimiter:
+    def test_limits_each_call_site(self) -> None:
+        clock = FakeClock()
+        rate_limiter = log_config.CallSiteRateLimiter(rate=2, clock=clock)
+
+        allowed = [rate_limiter(make_record()) for _ in range(3)]
+
+        assert allowed == [True, True, False]
+        assert rate_limiter(make_record(line=2))
+
+    def test_refills(self) -> None:
+        clock = FakeClock()
+        rate_limiter = log_config.CallSiteRateLimiter(rate=1, clock=clock)
+        rate_limiter(make_record())
+
+        blocked = rate_limiter(make_record())
+        clock.now = 1
+
+        assert not blocked
+        assert rate_limiter(make_record())
+
+    def test_never_limits_errors(self) -> None:
+        rate_limiter = log_config.CallSiteRateLimiter(rate=1, clock=FakeClock())
+
+        assert all(rate_limiter(make_record(level_no=40)) for _ in range(3))
+
+
+@pytest.mark.parametrize("hot_path", [True, False])
+def test_hot_path(
+    get_db_session: sqlmodel.Session,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: Any,
+    hot_path: bool,
+) -> None:
+    monkeypatch.setattr(log_config.log_settings, "LOG_HOT_PATH", hot_path)
+
+    crud.get_skill_by_name(session=get_db_session, skill_name="{java}")
+
+    assert ("The skill named {java} doesn't exists" in caplog.text) is hot_path
+
+
+def test_hot_path_rate_limit_skips_formatting(monkeypatch: pytest.MonkeyPatch) -> None:
+    formatted = []
+
+    class Argument:
+        def __format__(self, format_spec: str) -> str:
+            formatted.append(format_spec)
+            return "argument"
+
+    monkeypatch.setattr(
+        log_config,
+        "_rate_limiter",
+        log_config.CallSiteRateLimiter(rate=1, clock=FakeClock()),
+    )
+    for _ in range(3):
+        log_config.hot_path("INFO", "Formatted {}", Argument())
+
+    assert len(formatted) == 1
@@ -0,0 +1,18 @@
+import pytest
+from fastapi import status, testclient
+
+from skillventory import main
+from skillventory.database import config
+
+
+def test_startup(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(config._built, "get_engine", config.testing_engine)
+    monkeypatch.setitem(config._built, "get_read_engine", config.testing_engine)
+
+    with testclient.TestClient(app=main.app) as client:
+        response = client.get("/")
+        timings = main.app.state.startup_timings
+
+    assert response.status_code == status.HTTP_200_OK
+    assert main.app.openapi_schema is not None
+    assert {"import", "database", "openapi", "startup"} <= set(timings)
@@ -0,0 +1,95 @@
+import pytest
+import sqlalchemy
+from fastapi import status, testclient
+from sqlalchemy import pool
+
+from skillventory import main, metrics
+
+client = testclient.TestClient(app=main.app)
+
+
+def test_histogram_render() -> None:
+    histogram = metrics.Histogram(
+        "test_duration_seconds", "Test durations.", ("route",), buckets=(0.1, 1.0)
+    )
+
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "/v1/skills/")
+
+    assert histogram.render().splitlines() == [
+        "# HELP test_duration_seconds Test durations.",
+        "# TYPE test_duration_seconds histogram",
+        'test_duration_seconds_bucket{route="/v1/skills/",le="0.1"} 1',
+        'test_duration_seconds_bucket{route="/v1/skills/",le="1"} 3',
+        'test_duration_seconds_bucket{route="/v1/skills/",le="+Inf"} 4',
+        'test_duration_seconds_sum{route="/v1/skills/"} 4.05',
+        'test_duration_seconds_count{route="/v1/skills/"} 4',
+    ]
+
+
+def test_counter_escapes_labels() -> None:
+    counter = metrics.Counter("test_total", "Test counter.", ("name",))
+
+    counter.inc('say "hi"\n', amount=2)
+
+    assert 'test_total{name="say \\"hi\\"\\n"} 2' in counter.render()
+
+
+@pytest.mark.usefixtures("override_get_db_session")
+def test_get_metrics() -> None:
+    client.get("/v1/skills/id/1")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert (
+        'skillventory_http_request_duration_seconds_count{method="GET",'
+        'route="/v1/skills/id/{skill_id}",status="404"}'
+    ) in response.text
+    assert "# TYPE skillventory_cache_hit_ratio gauge" in response.text
+
+
+def test_get_metrics_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(metrics.metrics_settings, "METRICS_ENABLED", False)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_instrument_engine() -> None:
+    engine = sqlalchemy.create_engine("sqlite://", poolclass=pool.StaticPool)
+    metrics.instrument_engine(engine, "test")
+    metrics.instrument_engine(engine, "test")
+    queries = [0]
+    token = metrics._request_queries.set(queries)
+    try:
+        with engine.begin() as connection:
+            connection.execute(sqlalchemy.text("SELECT 1"))
+            connection.execute(sqlalchemy.text("SELECT 2"))
+    finally:
+        metrics._request_queries.reset(token)
+
+    rendered = metrics.registry.render()
+
+    assert queries == [2]
+    assert 'skillventory_db_query_duration_seconds_count{engine="test"} 2' in rendered
+    assert 'skillventory_db_commit_duration_seconds_count{engine="test"} 1' in rendered
+    assert (
+        'skillventory_db_pool_checkout_wait_seconds_count{engine="test"} 1' in rendered
+    )
+
+
+def test_instrument_engine_after_dispose() -> None:
+    engine = sqlalchemy.create_engine("sqlite://", poolclass=pool.StaticPool)
+    metrics.instrument_engine(engine, "disposed")
+    engine.dispose()
+
+    with engine.connect():
+        pass
+
+    assert (
+        'skillventory_db_pool_checkout_wait_seconds_count{engine="disposed"} 1'
+        in metrics.registry.render()
+    )
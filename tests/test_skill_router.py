@@ -1,16 +1,26 @@
-from collections.abc import Sequence
-from typing import Callable
+import json
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Callable
 
+import fastapi
 import pytest
-from fastapi import status, testclient
+import sqlalchemy
+from fastapi import responses, status, testclient
 from httpx import Response
+from sqlalchemy import pool
+from sqlalchemy.ext import asyncio as sa_asyncio
+from sqlmodel.ext.asyncio import session as sm_asyncio
 
 from skillventory import main
+from skillventory.data import dependencies
+from skillventory.database import config
 from skillventory.models import models
+from skillventory.routers import serializers
 
 client = testclient.TestClient(app=main.app)
 
 BASE_ROUTE = "/v1/skills"
+LEVEL_1 = models.LevelOfConfidence.LEVEL_1.value
 
 
 @pytest.fixture
@@ -47,6 +57,186 @@ def test_post_skill(
     assert response.json() == expected_json
 
 
+@pytest.mark.usefixtures("_post_one_skill")
+@pytest.mark.parametrize(
+    ("on_conflict", "expected_status_code", "expected_json", "expected_level"),
+    [
+        (
+            "error",
+            status.HTTP_409_CONFLICT,
+            {"detail": "Skill already added"},
+            models.LevelOfConfidence.LEVEL_1,
+        ),
+        (
+            "ignore",
+            status.HTTP_200_OK,
+            {"message": "Skill already added"},
+            models.LevelOfConfidence.LEVEL_1,
+        ),
+        (
+            "update",
+            status.HTTP_200_OK,
+            {"message": "Skill updated successfully"},
+            models.LevelOfConfidence.LEVEL_3,
+        ),
+    ],
+)
+def test_post_skill_on_conflict(
+    one_json_skill: dict[str, str],
+    on_conflict: str,
+    expected_status_code: int,
+    expected_json: dict[str, str],
+    expected_level: models.LevelOfConfidence,
+) -> None:
+    skill = one_json_skill.copy()
+    skill["level_of_confidence"] = models.LevelOfConfidence.LEVEL_3.value
+
+    response = client.post(f"{BASE_ROUTE}/?on_conflict={on_conflict}", json=skill)
+    skill_db = client.get(f"{BASE_ROUTE}/name/{skill['skill_name']}").json()
+
+    assert response.status_code == expected_status_code
+    assert response.json() == expected_json
+    assert skill_db["level_of_confidence"] == expected_level.value
+
+
+@pytest.mark.usefixtures("_post_one_skill")
+def test_post_skills_batch(
+    factory_skills_json: Callable[[int], list[dict[str, str]]],
+) -> None:
+    response = client.post(
+        f"{BASE_ROUTE}/batch?chunk_size=1", json=factory_skills_json(2)
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == [
+        {"skill_name": "python_0", "status": "conflict"},
+        {"skill_name": "python_1", "status": "created", "skill_id": 2},
+    ]
+
+
+@pytest.mark.usefixtures("_post_one_skill")
+@pytest.mark.parametrize(
+    ("export_format", "expected_media_type", "expected_lines"),
+    [
+        (
+            "ndjson",
+            "application/x-ndjson",
+            [
+                '{"skill_id": 1, "skill_name": "python_0", "level_of_confidence": '
+                f'"{models.LevelOfConfidence.LEVEL_1.value}"}}',
+                '{"skill_id": 2, "skill_name": "python_1", "level_of_confidence": '
+                f'"{models.LevelOfConfidence.LEVEL_1.value}"}}',
+            ],
+        ),
+        (
+            "csv",
+            "text/csv; charset=utf-8",
+            [
+                "skill_id,skill_name,level_of_confidence",
+                f"1,python_0,{models.LevelOfConfidence.LEVEL_1.value}",
+                f"2,python_1,{models.LevelOfConfidence.LEVEL_1.value}",
+            ],
+        ),
+    ],
+)
+def test_export_skills(
+    export_format: str,
+    expected_media_type: str,
+    expected_lines: list[str],
+    factory_skills_json: Callable[[int], list[dict[str, str]]],
+) -> None:
+    client.post(f"{BASE_ROUTE}/batch", json=factory_skills_json(2))
+
+    response = client.get(f"{BASE_ROUTE}/export?format={export_format}")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Type"] == expected_media_type
+    assert response.text.splitlines() == expected_lines
+
+
+@pytest.mark.usefixtures("_post_one_skill")
+@pytest.mark.parametrize(
+    ("import_format", "content"),
+    [
+        (
+            "ndjson",
+            "\n".join([
+                json.dumps(skill)
+                for skill in [
+                    {"skill_name": "python_0", "level_of_confidence": LEVEL_1},
+                    {"skill_name": "python_1", "level_of_confidence": LEVEL_1},
+                    {"skill_name": "python_2", "level_of_confidence": "unknown"},
+                    {"skill_name": "python_3", "level_of_confidence": LEVEL_1},
+                ]
+            ]),
+        ),
+        (
+            "csv",
+            "skill_name,level_of_confidence\n"
+            f"python_0,{LEVEL_1}\n"
+            f"python_1,{LEVEL_1}\n"
+            "python_2,unknown\n"
+            f"python_3,{LEVEL_1}\n",
+        ),
+    ],
+)
+def test_import_skills(import_format: str, content: str) -> None:
+    response = client.post(
+        f"{BASE_ROUTE}/import?format={import_format}&chunk_size=2",
+        files={"file": (f"skills.{import_format}", content.encode())},
+    )
+    job = client.get(response.headers["Location"]).json()
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert job["status"] == "succeeded"
+    assert (
+        job["rows_processed"],
+        job["rows_created"],
+        job["rows_conflicting"],
+        job["rows_invalid"],
+    ) == (4, 2, 1, 1)
+    assert [error["line"] for error in job["errors"]] == [
+        3 if import_format == "ndjson" else 4
+    ]
+    assert client.get(f"{BASE_ROUTE}/name/python_3").status_code == status.HTTP_200_OK
+
+
+@pytest.mark.usefixtures("_post_one_skill")
+def test_search_skills() -> None:
+    client.post(
+        f"{BASE_ROUTE}/", json={"skill_name": "rust", "level_of_confidence": LEVEL_1}
+    )
+
+    response = client.get(f"{BASE_ROUTE}/search?q=pyth")
+    ui_response = client.get("/api/skills/?q=pyth")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [skill["skill_name"] for skill in response.json()] == ["python_0"]
+    assert ui_response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.usefixtures("_post_one_skill")
+@pytest.mark.parametrize("exact", ["true", "false"])
+def test_get_skill_stats(exact: str) -> None:
+    response = client.get(f"{BASE_ROUTE}/stats?exact={exact}")
+    not_modified = client.get(
+        f"{BASE_ROUTE}/stats", headers={"If-None-Match": response.headers["ETag"]}
+    )
+
+    assert response.json() == {
+        "total": 1,
+        "by_level_of_confidence": {level.value: 0 for level in models.LevelOfConfidence}
+        | {LEVEL_1: 1},
+    }
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_get_unknown_import_job() -> None:
+    response = client.get(f"{BASE_ROUTE}/import/unknown")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 class TestGetSkills:
     default_limit = 15
 
@@ -105,6 +295,92 @@ class TestGetSkills:
         assert response.headers["X-Offset"] == str(offset)
         assert response.headers["X-Limit"] == str(self.default_limit)
 
+    def test_without_total(self, post_skills: Callable[[int], None]) -> None:
+        post_skills(1)
+        response = client.get(f"{BASE_ROUTE}/?total=none")
+
+        assert len(response.json()) == 1
+        assert "X-Total-Count" not in response.headers
+
+    def test_cursor(self, post_skills: Callable[[int], None]) -> None:
+        post_skills(16)
+        first_page = client.get(f"{BASE_ROUTE}/")
+        cursor = first_page.headers["X-Next-Cursor"]
+
+        response = client.get(f"{BASE_ROUTE}/?cursor={cursor}")
+
+        assert [skill["skill_id"] for skill in response.json()] == [16]
+        assert response.headers["X-Total-Count"] == "16"
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_ui_next_page_link(self, post_skills: Callable[[int], None]) -> None:
+        post_skills(16)
+        first_page = client.get("/api/skills/").json()
+        (next_page_query,) = [
+            component["onClick"]["query"]
+            for component in first_page[0]["components"]
+            if component["type"] == "Link"
+            and "cursor" in component["onClick"].get("query", {})
+        ]
+
+        second_page = client.get("/api/skills/", params=next_page_query).json()
+
+        (table,) = [
+            component
+            for component in second_page[0]["components"]
+            if component["type"] == "Table"
+        ]
+        assert [skill["skill_id"] for skill in table["data"]] == [16]
+        assert (
+            next_page_query["cursor"]
+            == client.get(f"{BASE_ROUTE}/").headers["X-Next-Cursor"]
+        )
+
+    def test_invalid_cursor(self) -> None:
+        response = client.get(f"{BASE_ROUTE}/?cursor=not-a-cursor")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize(
+        "route", [f"{BASE_ROUTE}/?limit=0", "/api/skills/?page_size=0"]
+    )
+    def test_empty_page(self, post_skills: Callable[[int], None], route: str) -> None:
+        post_skills(2)
+        cursor = client.get(f"{BASE_ROUTE}/?limit=1").headers["X-Next-Cursor"]
+
+        response = client.get(f"{route}&cursor={cursor}")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_sort_and_filter(self) -> None:
+        for number, level in enumerate([*models.LevelOfConfidence] * 2):
+            client.post(
+                f"{BASE_ROUTE}/",
+                json={
+                    "skill_name": f"skill_{number}",
+                    "level_of_confidence": level.value,
+                },
+            )
+        query = {
+            "sort": "skill_name",
+            "order": "desc",
+            "level": models.LevelOfConfidence.LEVEL_2.value,
+            "limit": 1,
+        }
+
+        first_page = client.get(f"{BASE_ROUTE}/", params=query)
+        second_page = client.get(
+            f"{BASE_ROUTE}/",
+            params={**query, "cursor": first_page.headers["X-Next-Cursor"]},
+        )
+        ui_response = client.get("/api/skills/", params=query)
+
+        assert [skill["skill_name"] for skill in first_page.json()] == ["skill_4"]
+        assert [skill["skill_name"] for skill in second_page.json()] == ["skill_1"]
+        assert second_page.headers["X-Total-Count"] == "2"
+        assert "X-Next-Cursor" not in second_page.headers
+        assert ui_response.status_code == status.HTTP_200_OK
+
 
 @pytest.mark.usefixtures("_post_one_skill")
 class TestGetSkillById:
@@ -148,6 +424,73 @@ class TestGetSkillByName:
         }
 
 
+@pytest.mark.usefixtures("_post_one_skill")
+class TestSparseFields:
+    @pytest.mark.parametrize(
+        ("route", "expected"),
+        [
+            ("/?fields=skill_name", [{"skill_name": "python_0"}]),
+            ("/search?q=pyth&fields=skill_name", [{"skill_name": "python_0"}]),
+            (
+                "/id/1?fields=level_of_confidence,skill_id",
+                {"level_of_confidence": LEVEL_1, "skill_id": 1},
+            ),
+            ("/name/python_0?fields=skill_id,skill_id", {"skill_id": 1}),
+        ],
+    )
+    def test_fields(self, route: str, expected: Any) -> None:
+        response = client.get(f"{BASE_ROUTE}{route}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == expected
+
+    @pytest.mark.parametrize(
+        ("route", "keys"),
+        [("/lookup/id", [2, 1, 1]), ("/lookup/name", ["java", "python_0"])],
+    )
+    def test_batch_lookup(self, route: str, keys: list[Any]) -> None:
+        response = client.post(f"{BASE_ROUTE}{route}?fields=skill_name", json=keys)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "skills": [{"skill_name": "python_0"}],
+            "missing": [keys[0]],
+        }
+
+    def test_unknown_field(self) -> None:
+        response = client.get(f"{BASE_ROUTE}/?fields=skill_name,password")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json() == {"detail": "Unknown fields: password"}
+
+
+@pytest.mark.usefixtures("_post_one_skill")
+class TestConditionalGet:
+    @pytest.mark.parametrize("route", ["/", "/id/1", "/name/python_0"])
+    def test_not_modified(self, route: str) -> None:
+        response = client.get(f"{BASE_ROUTE}{route}")
+        etag = response.headers["ETag"]
+
+        not_modified = client.get(
+            f"{BASE_ROUTE}{route}", headers={"If-None-Match": f"W/{etag}"}
+        )
+
+        assert response.headers["Cache-Control"] == "no-cache"
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified.headers["ETag"] == etag
+        assert not not_modified.content
+
+    def test_modified_after_write(self) -> None:
+        etag = client.get(f"{BASE_ROUTE}/id/1").headers["ETag"]
+        client.patch(f"{BASE_ROUTE}/1", json={"skill_name": "rust"})
+
+        response = client.get(f"{BASE_ROUTE}/id/1", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert response.json()["skill_name"] == "rust"
+
+
 @pytest.mark.usefixtures("_post_one_skill")
 class TestUpdateSkillName:
     @pytest.fixture
@@ -206,3 +549,141 @@ class TestUpdateSkillLevel:
         skill_received = skill_level_modified.copy()
         skill_received.update({"skill_id": skill_id})
         assert response.json() == skill_received
+
+
+@pytest.mark.usefixtures("_post_one_skill")
+class TestUpdateSkillPartially:
+    def test_partial_body(self) -> None:
+        response = client.patch(
+            f"{BASE_ROUTE}/1",
+            json={"level_of_confidence": models.LevelOfConfidence.LEVEL_3.value},
+        )
+
+        assert response.json() == {
+            "skill_id": 1,
+            "skill_name": "python_0",
+            "level_of_confidence": models.LevelOfConfidence.LEVEL_3.value,
+        }
+
+    def test_empty_body(self) -> None:
+        response = client.patch(f"{BASE_ROUTE}/1", json={})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["skill_name"] == "python_0"
+
+    def test_name_conflict(
+        self, factory_skills_json: Callable[[int], list[dict[str, str]]]
+    ) -> None:
+        client.post(f"{BASE_ROUTE}/", json=factory_skills_json(2)[1])
+
+        response = client.patch(f"{BASE_ROUTE}/2", json={"skill_name": "python_0"})
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+
+class TestAsyncSession:
+    @pytest.fixture
+    def _override_with_async_session(self) -> Iterator[None]:
+        engine = sa_asyncio.create_async_engine(
+            "sqlite+aiosqlite://",
+            poolclass=pool.StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+
+        async def get_async_db_session() -> AsyncIterator[sm_asyncio.AsyncSession]:
+            async with engine.begin() as connection:
+                await connection.run_sync(config.Base.metadata.create_all)
+            async with sm_asyncio.AsyncSession(engine) as session:
+                yield session
+
+        overrides = main.app.dependency_overrides
+        async_overrides: dict[Callable[..., Any], Callable[..., Any]] = {
+            dependencies.get_db_session: get_async_db_session,
+            dependencies.get_read_db_session: get_async_db_session,
+            dependencies.get_read_session_factory: lambda: (
+                lambda: sm_asyncio.AsyncSession(engine)
+            ),
+        }
+        previous_overrides = {
+            dependency: overrides.get(dependency) for dependency in async_overrides
+        }
+        overrides.update(async_overrides)
+        try:
+            yield
+        finally:
+            for dependency, previous_override in previous_overrides.items():
+                if previous_override is None:
+                    overrides.pop(dependency)
+                else:
+                    overrides[dependency] = previous_override
+
+    @pytest.mark.usefixtures("_override_with_async_session")
+    def test_round_trip(self, one_json_skill: dict[str, str]) -> None:
+        post_response = client.post(f"{BASE_ROUTE}/", json=one_json_skill)
+        patch_response = client.patch(
+            f"{BASE_ROUTE}/1",
+            json={"level_of_confidence": models.LevelOfConfidence.LEVEL_2.value},
+        )
+        list_response = client.get(f"{BASE_ROUTE}/")
+
+        assert post_response.status_code == status.HTTP_201_CREATED
+        assert patch_response.status_code == status.HTTP_200_OK
+        assert list_response.json() == [
+            {
+                "skill_id": 1,
+                "skill_name": one_json_skill["skill_name"],
+                "level_of_confidence": models.LevelOfConfidence.LEVEL_2.value,
+            }
+        ]
+        assert list_response.headers["X-Total-Count"] == "1"
+
+    @pytest.mark.usefixtures("_override_with_async_session")
+    def test_export(self, one_json_skill: dict[str, str]) -> None:
+        client.post(f"{BASE_ROUTE}/", json=one_json_skill)
+
+        response = client.get(f"{BASE_ROUTE}/export")
+
+        assert json.loads(response.text) == {"skill_id": 1, **one_json_skill}
+
+
+def _response_model_json(skills: list[models.Skill]) -> bytes:
+    # What FastAPI sends for a response_model of Sequence[models.Skill].
+    return responses.JSONResponse(
+        content=[skill.model_dump(mode="json") for skill in skills]
+    ).body
+
+
+@pytest.mark.usefixtures("override_get_db_session")
+def test_listing_json_matches_response_model() -> None:
+    client.post(
+        f"{BASE_ROUTE}/",
+        json={"skill_name": "Diseño de APIs 日本", "level_of_confidence": LEVEL_1},
+    )
+
+    response = client.get(f"{BASE_ROUTE}/")
+
+    assert response.content == _response_model_json([
+        models.Skill.model_validate(skill) for skill in response.json()
+    ])
+
+
+def test_serializer_matches_response_model() -> None:
+    skill = models.Skill(
+        skill_id=None,
+        skill_name="Programación ✓",
+        level_of_confidence=models.LevelOfConfidence.LEVEL_2,
+    )
+    fields = list(models.SkillField)
+    columns = sqlalchemy.inspect(models.Skill).columns
+    statement = sqlalchemy.select(
+        *(
+            sqlalchemy.literal(getattr(skill, field.value), columns[field.value].type)
+            for field in fields
+        )
+    )
+    with sqlalchemy.create_engine("sqlite://").connect() as connection:
+        rows = connection.execute(statement).all()
+
+    response = serializers.skill_rows_json_response(rows, fields, fastapi.Response())
+
+    assert response.body == _response_model_json([skill])
@@ -0,0 +1,125 @@
+import datetime
+import pathlib
+from typing import Optional
+
+import pytest
+import sqlalchemy
+from fastapi import status, testclient
+from sqlalchemy import pool
+
+from skillventory import main
+from skillventory.database import config, slow_queries
+from skillventory.models import models
+
+client = testclient.TestClient(app=main.app)
+
+SLOW_DURATION_MS = 150
+
+
+@pytest.fixture
+def slow_query_log(monkeypatch: pytest.MonkeyPatch) -> slow_queries.SlowQueryLog:
+    slow_query_log = slow_queries.SlowQueryLog(size=2)
+    monkeypatch.setattr(slow_queries, "slow_query_log", slow_query_log)
+    return slow_query_log
+
+
+def make_slow_query(duration_ms: float) -> models.SlowQuery:
+    return models.SlowQuery(
+        engine="write",
+        statement="SELECT count(*) FROM skill",
+        parameters="()",
+        duration_ms=duration_ms,
+        recorded_at=datetime.datetime.now(datetime.UTC),
+    )
+
+
+def test_slow_query_log_keeps_the_latest(
+    slow_query_log: slow_queries.SlowQueryLog,
+) -> None:
+    for duration_ms in (30, 10, 20):
+        slow_query_log.record(make_slow_query(duration_ms))
+
+    entries = slow_query_log.entries()
+
+    assert [entry.duration_ms for entry in entries] == [20, 10]
+
+
+@pytest.mark.parametrize(
+    ("threshold", "expected_statements"), [(0, 2), (float("inf"), 0)]
+)
+def test_instrument_engine(
+    slow_query_log: slow_queries.SlowQueryLog,
+    threshold: float,
+    expected_statements: int,
+) -> None:
+    engine = sqlalchemy.create_engine("sqlite://", poolclass=pool.StaticPool)
+    slow_queries.instrument_engine(engine, "test", threshold)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE skill (skill_name TEXT)")
+        connection.execute(
+            sqlalchemy.text("SELECT * FROM skill WHERE skill_name = :name"),
+            {"name": "python"},
+        )
+
+    entries = slow_query_log.entries()
+
+    assert len(entries) == expected_statements
+    if expected_statements:
+        select = next(
+            entry for entry in entries if entry.statement.startswith("SELECT")
+        )
+        assert select.parameters == "('python',)"
+        assert select.plan == ["SCAN skill"]
+
+
+def test_startup_twice(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+    engine = sqlalchemy.create_engine(
+        "sqlite://",
+        poolclass=pool.StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    monkeypatch.setitem(config._built, "get_engine", engine)
+    monkeypatch.setitem(config._built, "get_read_engine", engine)
+    monkeypatch.setattr(config.db_settings, "SLOW_QUERY_THRESHOLD", float("inf"))
+    monkeypatch.setattr(
+        config.db_settings, "SLOW_QUERY_LOG_FILE", str(tmp_path / "slow.log")
+    )
+
+    status_codes, listener_counts = [], []
+    for _ in range(2):
+        with testclient.TestClient(app=main.app) as lifespan_client:
+            status_codes.append(lifespan_client.get("/v1/skills/").status_code)
+        listener_counts.append(len(engine.dispatch.after_cursor_execute))
+    monkeypatch.setattr(config.db_settings, "SLOW_QUERY_LOG_FILE", None)
+    slow_queries.configure_log_file()
+
+    assert status_codes == [status.HTTP_200_OK, status.HTTP_200_OK]
+    assert listener_counts[0] == listener_counts[1]
+
+
+def test_get_slow_queries(
+    monkeypatch: pytest.MonkeyPatch, slow_query_log: slow_queries.SlowQueryLog
+) -> None:
+    monkeypatch.setattr(config.db_settings, "SLOW_QUERY_THRESHOLD", 100)
+    monkeypatch.setattr(config.db_settings, "SLOW_QUERY_ENDPOINT", True)
+    slow_query_log.record(make_slow_query(SLOW_DURATION_MS))
+
+    response = client.get("/admin/slow-queries")
+    cleared_response = client.delete("/admin/slow-queries")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["duration_ms"] == SLOW_DURATION_MS
+    assert cleared_response.status_code == status.HTTP_204_NO_CONTENT
+    assert slow_query_log.entries() == []
+
+
+@pytest.mark.parametrize(("threshold", "endpoint"), [(None, True), (100, False)])
+def test_get_slow_queries_disabled(
+    monkeypatch: pytest.MonkeyPatch, threshold: Optional[float], endpoint: bool
+) -> None:
+    monkeypatch.setattr(config.db_settings, "SLOW_QUERY_THRESHOLD", threshold)
+    monkeypatch.setattr(config.db_settings, "SLOW_QUERY_ENDPOINT", endpoint)
+
+    response = client.get("/admin/slow-queries")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND